@@ -0,0 +1,26 @@
+"""
+Compare scanning a fight page against the BeautifulSoup parsing it replaced
+
+    python -m benchmarks.combat
+"""
+from libkol.request.combat import combat, write_panel
+from test.request.combat_soup import scan_soup
+
+from .util import best_of, load_fixtures, report
+
+
+def main():
+    for name, html in load_fixtures("combat_*.html").items():
+        scanned = combat.scan(html)
+        assert scanned.events == scan_soup(html).events
+
+        soup = best_of(lambda: scan_soup(html))
+        scanner = best_of(lambda: combat.scan(html))
+        written = best_of(lambda: write_panel(combat.scan(html).source))
+        report(
+            name, soup, {"soup": soup, "scanner": scanner, "scanner + raw": written}
+        )
+
+
+if __name__ == "__main__":
+    main()
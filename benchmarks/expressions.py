@@ -0,0 +1,80 @@
+"""
+Compare evaluating modifier expressions one at a time against evaluating them in bulk
+
+    python -m benchmarks.expressions
+"""
+import asyncio
+
+from libkol.Stat import Stat
+from libkol.util import expression
+
+from .util import best_of, report
+
+EXPRESSIONS = [
+    "ceil(min(W,20)/2)",
+    "sqrt(MUS)+abs(L)",
+    "floor(MYS/4)+max(D,3)",
+    "W*K+H",
+    "min(11,W/2)*skill(Blood Bubble)",
+    "L^2/3+MOX",
+] * 50
+
+WEIGHTS = range(1, 41)
+
+
+class FakeSession:
+    ascensions = 3
+    inebriety = 5
+    level = 11
+    familiar_weight = 17
+    gender = "f"
+    fury = 2
+    max_hp = 150
+    reagent_potion_duration = 5
+    equipment = {}  # type: dict
+
+    def has_skill(self, skill):
+        return skill == "Blood Bubble"
+
+    def get_stat(self, stat, buffed=True):
+        return {Stat.Muscle: 100, Stat.Mysticality: 50, Stat.Moxie: 30}[stat]
+
+    @property
+    def evaluation_context(self):
+        return expression.EvaluationContext(self)
+
+
+async def one_at_a_time(kol, expressions):
+    values = []
+
+    for e in expressions:
+        values.append([await expression.evaluate(kol, e, {"W": w}) for w in WEIGHTS])
+
+    return values
+
+
+def main():
+    kol = FakeSession()
+    expressions = [expression.parse(e) for e in EXPRESSIONS]
+    loop = asyncio.get_event_loop()
+
+    def single():
+        return loop.run_until_complete(one_at_a_time(kol, expressions))
+
+    def bulk():
+        return loop.run_until_complete(
+            expression.evaluate_many(kol, expressions, {"W": WEIGHTS})
+        )
+
+    assert bulk().tolist() == single()
+
+    baseline = best_of(single, repeat=3)
+    report(
+        f"{len(EXPRESSIONS)} expressions x {len(WEIGHTS)} familiar weights",
+        baseline,
+        {"one at a time": baseline, "evaluate_many": best_of(bulk, repeat=3)},
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Compare how long each available BeautifulSoup tree builder takes to parse the request fixtures
+
+    python -m benchmarks.html_parsers
+"""
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from .util import best_of, load_fixtures, report
+
+backends = [b for b in ["html.parser", "lxml"] if builder_registry.lookup(b)]
+
+
+def main():
+    total = {b: 0.0 for b in backends}
+
+    for name, html in load_fixtures().items():
+        times = {b: best_of(lambda: BeautifulSoup(html, b)) for b in backends}
+        report(name, times["html.parser"], times)
+
+        for b, t in times.items():
+            total[b] += t
+
+    report("TOTAL", total["html.parser"], total)
+
+
+if __name__ == "__main__":
+    main()
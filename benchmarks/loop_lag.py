@@ -0,0 +1,57 @@
+"""
+Compare how long parsing large pages holds up the event loop when it runs on the loop against
+running it in a thread or process pool
+
+    python -m benchmarks.loop_lag
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+
+from libkol import LoopMonitor, Session
+from libkol.request import clan_log
+
+from .util import load_fixtures
+
+ROUNDS = 5
+
+
+async def parse_all(executor, pages):
+    kol = Session(parse_executor=executor)
+
+    try:
+        async with LoopMonitor(interval=0.005) as monitor:
+            start = perf_counter()
+
+            for _ in range(ROUNDS):
+                await asyncio.gather(
+                    *(kol.run_cpu_bound(clan_log.extract, html, None) for html in pages)
+                )
+
+            elapsed = perf_counter() - start
+    finally:
+        await kol.client.close()
+
+    return elapsed, monitor.stats
+
+
+def main():
+    pages = list(load_fixtures("clan_log_*.html").values())
+    loop = asyncio.get_event_loop()
+
+    with ThreadPoolExecutor() as threads, ProcessPoolExecutor() as processes:
+        for label, executor in (
+            ("loop", None),
+            ("threads", threads),
+            ("processes", processes),
+        ):
+            elapsed, stats = loop.run_until_complete(parse_all(executor, pages))
+            print(
+                f"  {label:<16} {elapsed * 1000:9.3f} ms total  "
+                f"{stats.max_lag * 1000:9.3f} ms max lag  "
+                f"{stats.mean_lag * 1000:9.3f} ms mean lag"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Compare extracting mall search listings with a regular expression against walking the tree
+
+    python -m benchmarks.mall_search
+"""
+from libkol.request import mall_search
+
+from .util import best_of, load_fixtures, report
+
+
+def main():
+    for name, html in load_fixtures("mall_search_*.html").items():
+        assert mall_search.parse_rows(html) == mall_search.parse_rows_soup(html)
+
+        soup = best_of(lambda: mall_search.parse_rows_soup(html))
+        regex = best_of(lambda: mall_search.parse_rows(html))
+        report(name, soup, {"soup": soup, "regex": regex})
+
+
+if __name__ == "__main__":
+    main()
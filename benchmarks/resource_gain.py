@@ -0,0 +1,48 @@
+"""
+Compare scanning a page for resource gains with the combined patterns against running each
+parser in turn
+
+    python -m benchmarks.resource_gain
+"""
+from libkol.util import parsing
+
+from .util import best_of, load_fixtures, report
+
+
+def multi_pass(html: str):
+    return {
+        "items": [
+            (int(m.group(1)), 1) for m in parsing.single_item_pattern.finditer(html)
+        ]
+        + [
+            (int(m.group(1)), parsing.to_int(m.group(2)))
+            for m in parsing.multi_item_pattern.finditer(html)
+        ],
+        "adventures": parsing.adventures(html),
+        "inebriety": parsing.inebriety(html),
+        "substats": parsing.substat(html),
+        "stats": parsing.stats(html),
+        "levels": parsing.level(html),
+        "effects": parsing.effects(html),
+        "hp": parsing.hp(html),
+        "mp": parsing.mp(html),
+        "meat": parsing.meat(html),
+    }
+
+
+def main():
+    fixtures = {}
+
+    for pattern in ["combat_*.html", "eat_*.html", "mall_purchase_*.html"]:
+        fixtures.update(load_fixtures(pattern))
+
+    for name, html in fixtures.items():
+        assert parsing.scan_resources(html) == multi_pass(html)
+
+        multi = best_of(lambda: multi_pass(html))
+        combined = best_of(lambda: parsing.scan_resources(html))
+        report(name, multi, {"each pattern": multi, "combined": combined})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from glob import glob
+from os import path
+from timeit import Timer
+from typing import Callable, Dict
+
+TEST_DATA = path.join(path.dirname(path.abspath(__file__)), "../test/request/test_data")
+
+
+def load_fixtures(pattern: str = "*.html") -> Dict[str, str]:
+    """
+    Load the request test fixtures matching a glob pattern, keyed by file name
+    """
+    fixtures = {}
+
+    for file in sorted(glob(path.join(TEST_DATA, pattern))):
+        with open(file) as f:
+            fixtures[path.basename(file)] = f.read()
+
+    return fixtures
+
+
+def best_of(func: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Return the fastest time in seconds for a single call of func
+    """
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(name: str, baseline: float, times: Dict[str, float]) -> None:
+    print(name)
+
+    for label, t in times.items():
+        print(f"  {label:<16} {t * 1000:9.3f} ms  {baseline / t:6.2f}x")
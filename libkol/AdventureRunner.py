@@ -0,0 +1,295 @@
+import asyncio
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from aiohttp import ClientResponse
+from bs4 import Tag
+
+import libkol
+
+from . import request
+from .Location import Combat
+from .request.choice import Choice, Option
+from .request.combat import CombatRound
+from .util import parsing
+
+
+@dataclass
+class TurnMetrics:
+    # Seconds from starting the turn until it was finished
+    elapsed: float = 0
+    # Seconds spent waiting for the adventure response. This is less than the round trip
+    # when the request was sent while the previous turn was being wrapped up.
+    waiting: float = 0
+    # Seconds spent parsing the adventure response
+    parsing: float = 0
+    requests: int = 0
+    rounds: int = 0
+
+
+@dataclass
+class Turn:
+    number: int
+    # The last thing that happened in the turn: a CombatRound, the results of a choice, or
+    # the HTML of a noncombat adventure
+    result: Any
+    metrics: TurnMetrics = field(default_factory=TurnMetrics)
+
+
+# Returns a reason to stop, or None to carry on
+StopCondition = Callable[["libkol.Session", Turn], Optional[str]]
+
+# An adventure request, and the task sending it
+Pending = Tuple["libkol.request.adventure", "asyncio.Future[ClientResponse]"]
+
+
+class AdventureRunner:
+    """
+    Spends many turns at a location, looping over what ``Location.visit`` does for one.
+
+    .. code-block:: python
+
+      runner = AdventureRunner(
+          kol,
+          location_id=331,
+          macro=CombatMacro().skill(saucestorm).repeat(),
+          min_hp=50,
+          until={await Item["lumber"]: 30},
+      )
+      turns = await runner.run(100)
+      print(runner.stop_reason, sum(t.metrics.elapsed for t in turns))
+
+    The state is kept up to date from each response (the meat, items, stats, HP, MP and
+    effects it mentions) rather than by reloading the character pane every turn, so it can
+    drift from the truth in corner cases. Call ``Session.refresh_state`` after a run to be
+    sure.
+
+    As soon as a turn is over and no stop condition has been met, the request for the next
+    turn is sent, and it is in flight while ``on_turn`` runs.
+
+    :param session: Logged in Session
+    :param location_id: The id of the location to adventure at
+    :param combat_function: Carries out a fight one request at a time, as for
+                            ``Location.visit``. It may return the list of rounds from
+                            ``Combat.macro``.
+    :param macro: Finish every fight with this macro instead, in a single request
+    :param choices: Either a dictionary of option to pick for each choice, or a callable that
+                    picks one
+    :param min_hp: Stop once HP falls below this
+    :param min_adventures: Stop once this many adventures are left
+    :param until: Stop once the inventory holds at least this many of each item
+    :param stop_conditions: Further conditions to check after every turn
+    :param on_turn: Called with each turn once it is over
+    """
+
+    def __init__(
+        self,
+        session: "libkol.Session",
+        location_id: int,
+        combat_function: Optional[
+            Callable[[Combat, CombatRound], Awaitable[Any]]
+        ] = None,
+        macro: Union["libkol.CombatMacro", str, None] = None,
+        choices: Union[
+            Dict[int, int], Callable[[Choice], Union[Option, int]], None
+        ] = None,
+        min_hp: Optional[int] = None,
+        min_adventures: int = 0,
+        until: Optional[Dict["libkol.Item", int]] = None,
+        stop_conditions: Optional[List[StopCondition]] = None,
+        on_turn: Optional[Callable[[Turn], Any]] = None,
+    ) -> None:
+        if combat_function is None and macro is None:
+            raise ValueError("Either a combat function or a macro is needed to fight")
+
+        self.session = session
+        self.location_id = location_id
+        self.combat_function = combat_function
+        self.macro = macro
+        self.choices = {} if choices is None else choices
+        self.min_hp = min_hp
+        self.min_adventures = min_adventures
+        self.until = {} if until is None else dict(until)
+        self.stop_conditions = [] if stop_conditions is None else list(stop_conditions)
+        self.on_turn = on_turn
+        self.turns = []  # type: List[Turn]
+        self.stop_reason = None  # type: Optional[str]
+
+    def check(self, turn: Turn) -> Optional[str]:
+        """
+        The reason to stop after this turn, if there is one
+        """
+        state = self.session.state
+
+        if isinstance(turn.result, CombatRound):
+            if not turn.result.finished:
+                # The fight is still going (e.g. the macro aborted), so adventuring again
+                # would only lead back to it
+                return "interrupted"
+
+            if turn.result.choice_follows or turn.result.fight_follows:
+                # Something has to be dealt with by hand before adventuring again
+                return "interrupted"
+
+        if self.min_hp is not None and state.current_hp < self.min_hp:
+            return "hp"
+
+        if state.adventures <= self.min_adventures:
+            return "adventures"
+
+        for item, quantity in self.until.items():
+            if state.inventory.get(item, 0) >= quantity:
+                return "items"
+
+        for condition in self.stop_conditions:
+            reason = condition(self.session, turn)
+            if reason is not None:
+                return reason
+
+        return None
+
+    def send(self) -> Pending:
+        adventure = request.adventure(self.session, self.location_id)
+        return adventure, asyncio.ensure_future(adventure.run())
+
+    async def choose(self, choice: Choice) -> Optional["libkol.request.choice"]:
+        """
+        Submit the option picked for a choice, if there is one
+        """
+        if isinstance(self.choices, dict):
+            option = self.choices.get(choice.id)  # type: Optional[Union[Option, int]]
+        else:
+            option = self.choices(choice)
+
+        if isinstance(option, Option):
+            option = option.id
+
+        if option is None:
+            return None
+
+        chosen = request.choice(self.session, choice.id, option)
+        await chosen.run()
+        return chosen
+
+    async def fight(self, round: CombatRound, metrics: TurnMetrics) -> CombatRound:
+        if self.macro is not None:
+            rounds = await request.combat_macro(self.session, self.macro).parse()
+            metrics.requests += 1
+            metrics.rounds += len(rounds)
+            return rounds[-1]
+
+        combat = Combat(self.session)
+
+        while not round.finished:
+            result = await self.combat_function(combat, round)
+
+            # A macro returns every round it played
+            if isinstance(result, list):
+                metrics.rounds += len(result)
+                result = result[-1]
+            else:
+                metrics.rounds += 1
+
+            if result is None or result is round:
+                break
+
+            round = result
+
+        metrics.requests += combat.requests
+        return round
+
+    async def take_turn(self, number: int, pending: Pending) -> Turn:
+        session = self.session
+        metrics = TurnMetrics(requests=1)
+        start = monotonic()
+
+        adventure, sending = pending
+        await sending
+        metrics.waiting = monotonic() - start
+
+        parse_start = monotonic()
+        result = await adventure.parse()
+        metrics.parsing = monotonic() - parse_start
+
+        if isinstance(result, CombatRound):
+            metrics.rounds = 1
+            if not result.finished:
+                result = await self.fight(result, metrics)
+        elif isinstance(result, Choice):
+            chosen = await self.choose(result)
+            if chosen is not None:
+                result = await chosen.parse()
+                metrics.requests += 1
+                session.state.adventures -= 1
+                if isinstance(result, Tag):
+                    # Not str(result), which rewrites the markup the patterns look for
+                    await parsing.resource_gain(await chosen.text(), session=session)
+        else:
+            # A noncombat adventure, which the adventure parser doesn't look at. Without a
+            # link to adventure again, nothing happened (e.g. the location is closed).
+            html = await adventure.text()
+            if "Adventure Again" in html:
+                result = html
+                await parsing.resource_gain(html, session=session)
+                session.state.adventures -= 1
+
+        metrics.elapsed = monotonic() - start
+        return Turn(number=number, result=result, metrics=metrics)
+
+    async def run(self, turns: int) -> List[Turn]:
+        """
+        Spend up to the given number of turns, stopping early if any stop condition is met.
+        The reason for stopping is left in ``stop_reason``: "turns" if every turn was spent,
+        otherwise "hp", "adventures", "items", "interrupted" (if a fight was left unfinished,
+        or a choice or another fight follows it), "choice" (if a choice came up that there is
+        no option for), "unavailable" (if the location could not be visited) or whatever a
+        custom stop condition returned.
+
+        :param turns: Most turns to spend
+        """
+        self.stop_reason = None
+        self.turns = []
+
+        if self.session.state.adventures <= self.min_adventures:
+            self.stop_reason = "adventures"
+            return self.turns
+
+        pending = self.send()  # type: Optional[Pending]
+
+        try:
+            for number in range(1, turns + 1):
+                current, pending = pending, None
+                assert current is not None
+                turn = await self.take_turn(number, current)
+                self.turns.append(turn)
+
+                if isinstance(turn.result, Choice):
+                    self.stop_reason = "choice"
+                elif turn.result is None:
+                    self.stop_reason = "unavailable"
+                else:
+                    self.stop_reason = self.check(turn)
+
+                # Get the next turn going while this one is wrapped up
+                if self.stop_reason is None and number < turns:
+                    pending = self.send()
+                    # Let it go out before carrying on
+                    await asyncio.sleep(0)
+
+                if self.on_turn is not None:
+                    callback = self.on_turn(turn)
+                    if asyncio.iscoroutine(callback):
+                        await callback
+
+                if self.stop_reason is not None:
+                    break
+        finally:
+            # A request sent ahead for a turn that will now never be taken
+            if pending is not None:
+                pending[1].cancel()
+
+        if self.stop_reason is None:
+            self.stop_reason = "turns"
+
+        return self.turns
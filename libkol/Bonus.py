@@ -29,12 +29,26 @@ class Bonus(Model):
     percentage: bool = BooleanField(default=False)  # type: ignore
     expression_value: Optional[str] = PickleField(null=True)  # type: ignore
 
+    @property
+    def is_static(self) -> bool:
+        """
+        Whether the value of this bonus is the same regardless of the character's state
+        """
+        if self.string_value:
+            return True
+
+        if self.numeric_value:
+            return self.percentage is False
+
+        return not self.expression_value
+
     async def get_value(
         self,
         normalise: bool = False,
         smithsness: Optional[int] = None,
         familiar_weight: Optional[int] = None,
         hobo_power: Optional[int] = None,
+        context: Optional[expression.EvaluationContext] = None,
     ):
         kol = self.kol
 
@@ -59,6 +73,8 @@ class Bonus(Model):
             if hobo_power is not None:
                 subs["H"] = hobo_power
 
-            return await expression.evaluate(kol, self.expression_value, subs)
+            return await expression.evaluate(
+                kol, self.expression_value, subs, context=context
+            )
 
         return 0
@@ -35,6 +35,16 @@ class CharacterClass(Enum):
     def has_value(cls, value: str) -> bool:
         return value in set(item.value for item in cls)
 
+    @classmethod
+    def from_id(cls, id: int) -> Optional["CharacterClass"]:
+        """
+        Find the class with the number KoL uses for it in api.php
+
+        :param id: Class number
+        :return: The class, or None if it is one libkol does not know about
+        """
+        return class_ids.get(id)
+
     @classmethod
     def from_title(cls, title: str) -> "CharacterClass":
         if cls.has_value(title):
@@ -149,3 +159,16 @@ class CharacterClass(Enum):
             return CharacterClass.AccordionThief
 
         raise UnknownError("Did not recognise player class from title {}".format(title))
+
+
+class_ids = {
+    0: CharacterClass.AstralSpirit,
+    1: CharacterClass.SealClubber,
+    2: CharacterClass.TurtleTamer,
+    3: CharacterClass.Pastamancer,
+    4: CharacterClass.Sauceror,
+    5: CharacterClass.DiscoBandit,
+    6: CharacterClass.AccordionThief,
+    12: CharacterClass.ZombieMaster,
+    24: CharacterClass.Vampyre,
+}
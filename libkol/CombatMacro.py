@@ -0,0 +1,84 @@
+from typing import List, Optional, Union
+
+import libkol
+
+
+class CombatMacro:
+    """
+    Builds a combat macro for KoL to play out server-side, so that a whole fight can be
+    finished in a single request. Every method returns the macro so that calls can be chained.
+
+    .. code-block:: python
+
+      macro = CombatMacro().pick_pocket().skill(saucestorm).repeat("!times 5").attack().repeat()
+      rounds = await request.combat_macro(kol, macro).parse()
+
+    Conditions are written in KoL's own macro syntax, e.g. ``"hppercentbelow 30"`` or
+    ``"monstername angry bugbear"``.
+    """
+
+    def __init__(self) -> None:
+        self.lines = []  # type: List[str]
+
+    def __str__(self) -> str:
+        return "".join(f"{line}; " for line in self.lines).rstrip()
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def line(self, line: str) -> "CombatMacro":
+        """
+        Add a line of macro that does not have its own method
+        """
+        self.lines.append(line.strip().rstrip(";"))
+        return self
+
+    def attack(self) -> "CombatMacro":
+        return self.line("attack")
+
+    def skill(self, skill: Union["libkol.Skill", int]) -> "CombatMacro":
+        return self.line(f"skill {getattr(skill, 'id', skill)}")
+
+    def item(
+        self,
+        item: Union["libkol.Item", int],
+        item2: Union["libkol.Item", int, None] = None,
+    ) -> "CombatMacro":
+        """
+        Use an item, or funksling two items at once
+        """
+        items = [i for i in (item, item2) if i is not None]
+        return self.line(
+            "use {}".format(",".join(str(getattr(i, "id", i)) for i in items))
+        )
+
+    def run_away(self) -> "CombatMacro":
+        return self.line("runaway")
+
+    def pick_pocket(self) -> "CombatMacro":
+        return self.line("pickpocket")
+
+    def repeat(self, condition: Optional[str] = None) -> "CombatMacro":
+        """
+        Repeat the previous action until the fight is over or, if given, the condition is
+        no longer true
+        """
+        return self.line("repeat" if condition is None else f"repeat {condition}")
+
+    def abort(self, message: Optional[str] = None) -> "CombatMacro":
+        """
+        Stop the macro and hand the fight back
+        """
+        return self.line("abort" if message is None else f'abort "{message}"')
+
+    def if_(self, condition: str) -> "CombatMacro":
+        return self.line(f"if {condition}")
+
+    def end_if(self) -> "CombatMacro":
+        return self.line("endif")
+
+    def while_(self, condition: str) -> "CombatMacro":
+        return self.line(f"while {condition}")
+
+    def end_while(self) -> "CombatMacro":
+        return self.line("endwhile")
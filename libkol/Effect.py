@@ -1,9 +1,38 @@
+from typing import List, Optional
 from .Model import Model
+from .util import IdentityMap
 from tortoise.fields import IntField, CharField
 
 
-class Effect(Model):
+class Effect(IdentityMap, Model):
     id = IntField(pk=True, generated=False)
     name = CharField(max_length=255)
     image = CharField(max_length=255)
     desc_id = CharField(max_length=255)
+
+    # Process-wide index, so that keeping track of effects as they come and go doesn't touch
+    # the database once it is warm
+    index_fields = ("id", "name", "desc_id")
+
+    @classmethod
+    async def resolve_many(
+        cls, names: Optional[List[str]] = None, desc_ids: Optional[List[str]] = None
+    ) -> List[Optional["Effect"]]:
+        """
+        Resolve many effects at once. Anything not already in the index is fetched with one
+        query per kind of key, unless the index has been preloaded.
+
+        :param names: Names of the effects to resolve
+        :param desc_ids: Description ids of the effects to resolve
+        :return: The resolved effects, in the order names, then desc_ids, were given, with None
+                 for any that are not in the database
+        """
+        names = list(names or [])
+        desc_ids = list(desc_ids or [])
+
+        for field, keys in (("name", names), ("desc_id", desc_ids)):
+            cls._unknown.update((field, k) for k in await cls.load_missing(field, keys))
+
+        return [cls._by_name.get(name) for name in names] + [
+            cls._by_desc_id.get(desc_id) for desc_id in desc_ids
+        ]
@@ -32,6 +32,10 @@ class NotLoggedInError(Error):
     pass
 
 
+class ResumeFailedError(Error):
+    pass
+
+
 class RequestGenericError(Error):
     pass
 
@@ -20,7 +20,7 @@ from .Slot import Slot
 from .Stat import Stat
 from .Model import Model
 from .Error import ItemNotFoundError, WrongKindOfItemError
-from .util import EnumField, parsing
+from .util import EnumField, IdentityMap, parsing
 from . import types
 
 
@@ -45,17 +45,16 @@ class ItemMeta(ModelMeta):
                     else:
                         result = await self.get_or_discover(id=key)
                 else:
-                    result = await self.get(name=key)
+                    result = await self.get_or_discover(name=key)
                 future.set_result(result)
-                
-            except DoesNotExist:
+            except (DoesNotExist, ItemNotFoundError):
                 future.set_exception(ItemNotFoundError(f"Cannot find an item with the token `{key}`"))
 
         asyncio.ensure_future(getitem())
         return future
 
 
-class Item(Model, metaclass=ItemMeta):
+class Item(IdentityMap, Model, metaclass=ItemMeta):
     id: int = IntField(pk=True, generated=False)  # type: ignore
     name: str = CharField(max_length=255)  # type: ignore
     desc_id: int = IntField()  # type: ignore
@@ -141,7 +140,7 @@ class Item(Model, metaclass=ItemMeta):
     # Can appear as a bounty item
     bounty: bool = BooleanField(default=False)  # type: ignore
     # 0: n/a, 1: simple, 2: complex
-    candy: int = IntField()  # type: ignore
+    candy: int = IntField(default=0)  # type: ignore
     # What is this for?
     sphere: bool = BooleanField(default=False)  # type: ignore
     # is a quest item
@@ -167,6 +166,10 @@ class Item(Model, metaclass=ItemMeta):
     # is considered pasta when consumed
     pasta: bool = BooleanField(default=False)  # type: ignore
 
+    # Process-wide identity map, so that an item is only loaded from the database once. Ids
+    # and desc_ids that could not be discovered are kept as unknown so they are not tried again.
+    index_fields = ("id", "desc_id", "name")
+
     @property
     def adventures(self):
         return (self.gained_adventures_min + self.gained_adventures_max) / 2
@@ -213,17 +216,92 @@ class Item(Model, metaclass=ItemMeta):
         else:
             raise WrongKindOfItemError("You cannot consume this item")
 
+    @classmethod
+    def from_cache(
+        cls, id: int = None, desc_id: int = None, name: str = None
+    ) -> Optional["Item"]:
+        """
+        Look up an item in the identity map without touching the database
+
+        :param id: Id of the item
+        :param desc_id: Description id of the item
+        :param name: Name of the item
+        """
+        if id is not None:
+            return cls._by_id.get(int(id))
+
+        if desc_id is not None:
+            return cls._by_desc_id.get(int(desc_id))
+
+        if name is not None:
+            return cls._by_name.get(name)
+
+        return None
+
+    @classmethod
+    async def resolve_many(
+        cls,
+        ids: Optional[List[int]] = None,
+        desc_ids: Optional[List[int]] = None,
+        names: Optional[List[str]] = None,
+    ) -> List["Item"]:
+        """
+        Resolve many items at once. Anything not already in the identity map is fetched with
+        one query per kind of key, and any ids or desc_ids still unknown after that are
+        discovered concurrently.
+
+        :param ids: Ids of the items to resolve
+        :param desc_ids: Description ids of the items to resolve
+        :param names: Names of the items to resolve
+        :return: The resolved items, in the order ids, then desc_ids, then names were given
+        """
+        ids = [int(i) for i in ids or []]
+        desc_ids = [int(d) for d in desc_ids or []]
+        names = list(names or [])
+
+        for field, keys in (("id", ids), ("desc_id", desc_ids), ("name", names)):
+            await cls.load_missing(field, keys)
+
+        discoveries = [
+            cls.discover(id=id) for id in set(ids) if cls.from_cache(id=id) is None
+        ] + [
+            cls.discover(desc_id=desc_id)
+            for desc_id in set(desc_ids)
+            if cls.from_cache(desc_id=desc_id) is None
+        ]
+
+        for item in await asyncio.gather(*discoveries):
+            cls.cache(item)
+
+        unknown = [n for n in names if cls.from_cache(name=n) is None]
+        if len(unknown) > 0:
+            raise ItemNotFoundError(f"Cannot find an item with the name `{unknown[0]}`")
+
+        return (
+            [cls._by_id[id] for id in ids]
+            + [cls._by_desc_id[desc_id] for desc_id in desc_ids]
+            + [cls._by_name[name] for name in names]
+        )
+
     @classmethod
     async def get_or_discover(cls, *args, **kwargs) -> "Item":
+        lookup = {k: kwargs[k] for k in ("id", "desc_id", "name") if k in kwargs}
+
+        if len(args) == 0 and len(lookup) == 1 and len(kwargs) == 1:
+            cached = cls.from_cache(**lookup)
+
+            if cached is not None:
+                return cached
+
         result = await cls.filter(*args, **kwargs).first()
 
         if result is None:
             id: int = kwargs.get("id", None)
             desc_id: int = kwargs.get("desc_id", None)
 
-            return await cls.discover(id=id, desc_id=desc_id)
+            return cls.cache(await cls.discover(id=id, desc_id=desc_id))
 
-        return result
+        return cls.cache(result)
 
     @classmethod
     async def discover(cls, id: int = None, desc_id: int = None):
@@ -232,21 +310,43 @@ class Item(Model, metaclass=ItemMeta):
         it provides more information, so if only an id is provided, libkol will first determine
         the desc_id.
 
-        Note that this Returns an Item object but it is not automatically committed to the database.
+        If the session saves discoveries, the item is saved to the database in the
+        background. If the item does not exist, the id or desc_id is remembered and not
+        looked up again until the cache is cleared.
 
         :param id: Id of the item to discover
         :param desc_id: Description id of the item to discover
         """
-        if id is not None:
-            desc_id = (await request.item_information(cls.kol, id).parse()).descid
-
-        if desc_id is None:
+        if desc_id is None and id is None:
             raise ItemNotFoundError(
                 "Cannot discover an item without either an id or a desc_id"
             )
 
-        info = await request.item_description(cls.kol, desc_id).parse()
-        return Item(**{k: v for k, v in info.items() if v is not None})
+        key = ("id", int(id)) if id is not None else ("desc_id", int(desc_id))
+
+        if key in cls._unknown:
+            raise ItemNotFoundError(
+                f"Could not discover an item with the {key[0]} {key[1]}"
+            )
+
+        try:
+            if id is not None:
+                desc_id = (await request.item_information(cls.kol, id).parse()).descid
+
+            info = await request.item_description(cls.kol, desc_id).parse()
+        except ItemNotFoundError as e:
+            cls._unknown.add(key)
+            raise ItemNotFoundError(
+                f"Could not discover an item with the {key[0]} {key[1]}"
+            ) from e
+
+        item = Item(
+            desc_id=int(desc_id), **{k: v for k, v in info.items() if v is not None}
+        )
+        if cls.kol.write_behind is not None:
+            cls.kol.write_behind.add(item)
+
+        return item
 
     @property
     def type(self):
@@ -356,10 +456,10 @@ class Item(Model, metaclass=ItemMeta):
 
     @property
     def amount(self):
-        return self.kol.inventory[self] + list(self.kol.equipment.values()).count(self)
+        return self.kol.inventory[self] + self.kol.get_equipped_count(self)
 
     def equipped(self):
-        return self in self.kol.equipment.values()
+        return self.kol.get_equipped_count(self) > 0
 
     async def equip(self, slot: Optional[Slot] = None) -> bool:
         actual_slot = self.slot if slot is None else slot
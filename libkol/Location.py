@@ -10,18 +10,29 @@ from .request.choice import Choice, Option
 class Combat:
     def __init__(self, session):
         self.session = session
+        self.requests = 0
 
     async def attack(self):
+        self.requests += 1
         return await request.combat(self.session, CombatAction.Attack).parse()
 
     async def item(self, items=Union["libkol.Item", List["libkol.Item"]]):
+        self.requests += 1
         return await request.combat(self.session, CombatAction.Item, item=items).parse()
 
     async def skill(self, skill: "libkol.Skill"):
+        self.requests += 1
         return await request.combat(
             self.session, CombatAction.Skill, skill=skill
         ).parse()
 
+    async def macro(self, macro: Union["libkol.CombatMacro", str]) -> List[CombatRound]:
+        """
+        Play out a macro server-side, returning every round it played
+        """
+        self.requests += 1
+        return await request.combat_macro(self.session, macro).parse()
+
 
 class Location:
     """
@@ -44,6 +55,10 @@ class Location:
                 combat = Combat(self.session)
                 combat_result = await combat_function(combat, adventure)
 
+                # A macro returns every round it played
+                if isinstance(combat_result, list):
+                    combat_result = combat_result[-1]
+
                 if combat_result.finished:
                     return combat_result
             elif isinstance(adventure, Choice):
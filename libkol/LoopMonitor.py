@@ -0,0 +1,70 @@
+import asyncio
+from dataclasses import dataclass
+from time import monotonic
+from typing import Optional
+
+
+@dataclass
+class LoopLagStats:
+    samples: int = 0
+    total_lag: float = 0
+    max_lag: float = 0
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.samples if self.samples > 0 else 0
+
+    def record(self, lag: float) -> None:
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+
+class LoopMonitor:
+    """
+    Measures how long the event loop is held up. It repeatedly sleeps for a short interval and
+    records how much later than asked it woke up, which is how long something else (such as
+    a parser) kept the loop busy.
+
+    .. code-block:: python
+
+      async with LoopMonitor() as monitor:
+          await kol.clan.get_raid_log(raid_id)
+
+      print(monitor.stats.max_lag)
+
+    :param interval: Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.stats = LoopLagStats()
+        self.task = None  # type: Optional[asyncio.Future]
+
+    async def run(self) -> None:
+        while True:
+            start = monotonic()
+            await asyncio.sleep(self.interval)
+            self.stats.record(max(monotonic() - start - self.interval, 0))
+
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+            self.task = None
+
+    async def __aenter__(self) -> "LoopMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
@@ -1,16 +1,219 @@
-from aioitertools import iter
+import asyncio
+import threading
 from collections import defaultdict
 from libkol import Bonus
-from pulp import LpProblem, LpVariable, LpMaximize, lpSum, LpStatus, LpStatusOptimal
+from pulp import (
+    LpProblem,
+    LpSolver,
+    LpVariable,
+    LpMaximize,
+    lpSum,
+    LpStatus,
+    LpStatusOptimal,
+    PULP_CBC_CMD,
+    getSolver,
+    listSolvers,
+)
 from tortoise.query_utils import Q
-from typing import DefaultDict, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import libkol
+from .Item import Item
+from .util import expression
+
+
+class MatrixEntry(NamedTuple):
+    bonus: "libkol.Bonus"
+    value: Optional[float]  # None if the value depends on the character's state
+
+
+class ModifierMatrix:
+    """
+    Sparse matrix of the bonuses that equippable items, familiars, enthroned familiars and
+    outfits give to each Modifier. Rows are loaded from the database the first time a
+    Modifier is asked for and then shared by every Maximizer.
+
+    Static values are stored as they are. Values that depend on the character's state
+    (expressions and percentages) are left as None to be evaluated once per solve.
+    """
+
+    rows = {}  # type: Dict[libkol.Modifier, List[MatrixEntry]]
+    item_rows = {}  # type: Dict[libkol.Modifier, List[MatrixEntry]]
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls.rows.clear()
+        cls.item_rows.clear()
+
+    @staticmethod
+    async def make_entry(bonus: "libkol.Bonus") -> MatrixEntry:
+        return MatrixEntry(
+            bonus=bonus, value=await bonus.get_value() if bonus.is_static else None
+        )
+
+    @classmethod
+    async def load(
+        cls, modifiers: Iterable["libkol.Modifier"]
+    ) -> Dict["libkol.Modifier", List[MatrixEntry]]:
+        """
+        Rows of equipment bonuses for the given modifiers
+
+        :param modifiers: Modifiers to load
+        """
+        from libkol import Item, Outfit
+
+        modifiers = list(modifiers)
+        missing = [m for m in modifiers if m not in cls.rows]
+
+        if len(missing) > 0:
+            grouped = {
+                m: [] for m in missing
+            }  # type: Dict[libkol.Modifier, List[libkol.Bonus]]
+
+            async for b in (
+                Bonus.filter(effect_id__isnull=True, modifier__in=missing)
+                .filter(
+                    Q(item_id__isnull=True)
+                    | Q(item__hat=True)
+                    | Q(item__shirt=True)
+                    | Q(item__weapon=True)
+                    | Q(item__offhand=True)
+                    | Q(item__pants=True)
+                    | Q(item__accessory=True)
+                    | Q(item__familiar_equipment=True)
+                )
+                .prefetch_related(
+                    "familiar",
+                    "item",
+                    "outfit__variants__pieces",
+                    "outfit__variants",
+                    "outfit",
+                    "throne_familiar",
+                )
+            ):
+                grouped[b.modifier].append(b)
+
+            for m, bonuses in grouped.items():
+                items = [b.item for b in bonuses if isinstance(b.item, Item)]
+
+                # Outfit bonuses only count if the outfit can be made from the rest of the row
+                cls.rows[m] = [
+                    await cls.make_entry(b)
+                    for b in bonuses
+                    if not isinstance(b.outfit, Outfit)
+                    or await b.outfit.is_fulfilled(items)
+                ]
+
+        return {m: cls.rows[m] for m in modifiers}
+
+    @classmethod
+    async def load_items(cls, modifier: "libkol.Modifier") -> List[MatrixEntry]:
+        """
+        Bonuses that any item (equippable or not) gives to the given modifier
+
+        :param modifier: Modifier to load
+        """
+        if modifier not in cls.item_rows:
+            cls.item_rows[modifier] = [
+                await cls.make_entry(b)
+                async for b in (
+                    Bonus.filter(
+                        modifier=modifier, item_id__not_isnull=True
+                    ).prefetch_related("item")
+                )
+            ]
+
+        return cls.item_rows[modifier]
+
+    @staticmethod
+    async def values(
+        entries: List[MatrixEntry], context: expression.EvaluationContext, **kwargs
+    ) -> List[float]:
+        """
+        Values of a row of the matrix
+
+        :param entries: Row to evaluate
+        :param context: Snapshot of the state to evaluate against
+        :param kwargs: Any other arguments for ``Bonus.get_value``
+        """
+        return [
+            e.value
+            if e.value is not None
+            else await e.bonus.get_value(context=context, **kwargs)
+            for e in entries
+        ]
+
+
+# The rows hold items from the identity map, so they go when it is cleared
+Item.on_clear(ModifierMatrix.clear_cache)
+
+
+# Solvers that PuLP drives through their Python API rather than temporary files, best first
+in_process_solvers = ["CPLEX_PY", "GUROBI", "MOSEK", "COINMP_DLL", "PYGLPK"]
+
+
+def get_default_solver(**kwargs) -> LpSolver:
+    """
+    The best solver available, preferring one that runs in process over spawning CBC.
+    The CBC fallback still runs as a subprocess and exchanges the problem with it through
+    temporary files on every solve.
+
+    :param kwargs: Options for the solver, e.g. ``timeLimit``
+    """
+    available = listSolvers(onlyAvailable=True)
+    name = next((s for s in in_process_solvers if s in available), None)
+
+    if name is None:
+        return PULP_CBC_CMD(**kwargs)
+
+    return getSolver(name, **kwargs)
 
 
 class Maximizer:
-    def __init__(self, session):
+    """
+    Finds the equipment and familiar that best satisfy a set of modifier constraints.
+
+    Problems are solved in an executor so the event loop keeps running. A solver that runs in
+    process is used when one is installed, otherwise PuLP's bundled CBC, which runs as a
+    subprocess and goes through temporary files. Solves on the same Maximizer take turns,
+    as they share its solver and warm start.
+
+    :param session: Session to maximize for
+    :param solver: Name of a PuLP solver (e.g. ``"GLPK_CMD"``) or a configured LpSolver
+    :param time_limit: Seconds the solver may spend before returning its best solution
+    :param keep_warm: Reuse the same solver object between solves and give each solve the last
+                      solution as a starting point. No solver process stays running: a
+                      command-line solver such as CBC is still started afresh every time.
+    :param dump_lp: Path to write each problem to in LP format, for debugging
+    """
+
+    def __init__(
+        self,
+        session,
+        solver: Union[str, LpSolver, None] = None,
+        time_limit: Optional[float] = None,
+        keep_warm: bool = False,
+        dump_lp: Optional[str] = None,
+    ):
         self.session = session
+        self.solver = solver
+        self.time_limit = time_limit
+        self.keep_warm = keep_warm
+        self.dump_lp = dump_lp
+        self.warm_solver = None  # type: Optional[LpSolver]
+        self.warm_start = {}  # type: Dict[str, float]
+        # Held by the executor thread for the whole of a solve
+        self.lock = threading.Lock()
         self.maximize = []
         self.minimize = []
         self.must_equip = []
@@ -77,6 +280,47 @@ class Maximizer:
     def enthroned_repr(familiar: "libkol.Familiar") -> str:
         return f"<Familiar(Enthroned): {familiar.id}>"
 
+    def get_solver(self) -> LpSolver:
+        if self.warm_solver is not None:
+            return self.warm_solver
+
+        options = {"msg": False}  # type: Dict[str, Any]
+
+        if self.time_limit is not None:
+            options["timeLimit"] = self.time_limit
+
+        if self.keep_warm:
+            options["warmStart"] = True
+
+        if isinstance(self.solver, LpSolver):
+            solver = self.solver
+        elif isinstance(self.solver, str):
+            solver = getSolver(self.solver, **options)
+        else:
+            solver = get_default_solver(**options)
+
+        if self.keep_warm:
+            self.warm_solver = solver
+
+        return solver
+
+    def run_solver(self, prob: LpProblem) -> int:
+        with self.lock:
+            if self.dump_lp is not None:
+                prob.writeLP(self.dump_lp)
+
+            if self.keep_warm:
+                for v in prob.variables():
+                    if v.name in self.warm_start:
+                        v.setInitialValue(self.warm_start[v.name])
+
+            status = prob.solve(self.get_solver())
+
+            if self.keep_warm and status == LpStatusOptimal:
+                self.warm_start = {v.name: v.varValue for v in prob.variables()}
+
+            return status
+
     def summarise(self) -> str:
         return ", ".join(
             [
@@ -104,23 +348,24 @@ class Maximizer:
         crown = await Item["Crown of Thrones"]
         bjorn = await Item["Buddy Bjorn"]
 
+        # Every state-dependent value in this solve is evaluated against the same snapshot
+        context = self.session.evaluation_context
+
         # Load smithsness bonuses for tracking
+        smithsness_rows = await ModifierMatrix.load_items(Modifier.Smithsness)
         smithsness_bonuses = {
-            s.item.id: await s.get_value()
-            async for s in (
-                Bonus.filter(
-                    modifier=Modifier.Smithsness, item_id__not_isnull=True
-                ).prefetch_related("item")
+            e.bonus.item.id: v
+            for e, v in zip(
+                smithsness_rows, await ModifierMatrix.values(smithsness_rows, context)
             )
         }
 
         # Load hobo power bonuses for tracking
+        hobo_power_rows = await ModifierMatrix.load_items(Modifier.HoboPower)
         hobo_power_bonuses = {
-            s.item.id: await s.get_value()
-            async for s in (
-                Bonus.filter(
-                    modifier=Modifier.HoboPower, item_id__not_isnull=True
-                ).prefetch_related("item")
+            e.bonus.item.id: v
+            for e, v in zip(
+                hobo_power_rows, await ModifierMatrix.values(hobo_power_rows, context)
             )
         }
 
@@ -132,34 +377,12 @@ class Maximizer:
             + list(self.minimum.keys())
         )
 
-        bonuses = [
-            b
-            async for b in (
-                Bonus.filter(effect_id__isnull=True, modifier__in=modifiers)
-                .filter(
-                    Q(item_id__isnull=True)
-                    | Q(item__hat=True)
-                    | Q(item__shirt=True)
-                    | Q(item__weapon=True)
-                    | Q(item__offhand=True)
-                    | Q(item__pants=True)
-                    | Q(item__accessory=True)
-                    | Q(item__familiar_equipment=True)
-                )
-                .prefetch_related(
-                    "familiar",
-                    "item",
-                    "outfit__variants__pieces",
-                    "outfit__variants",
-                    "outfit",
-                    "throne_familiar",
-                )
-            )
-        ]
-
-        grouped_bonuses = {}  # type: Dict[libkol.Modifier, List[libkol.Bonus]]
-        for b in bonuses:
-            grouped_bonuses[b.modifier] = grouped_bonuses.get(b.modifier, []) + [b]
+        rows = {
+            m: entries
+            for m, entries in (await ModifierMatrix.load(modifiers)).items()
+            if len(entries) > 0
+        }
+        bonuses = [e.bonus for entries in rows.values() for e in entries]
 
         possible_items = (
             [b.item for b in bonuses if isinstance(b.item, Item)]
@@ -175,13 +398,12 @@ class Maximizer:
             if isinstance(b.throne_familiar, Familiar)
         ]
 
-
-
         # Define the problem
         prob = LpProblem(self.summarise(), LpMaximize)
         solution = LpVariable.dicts(
             "outfit",
-            {repr(i) for i in possible_items + possible_familiars} | { self.enthroned_repr(f) for f in possible_throne_familiars },
+            {repr(i) for i in possible_items + possible_familiars}
+            | {self.enthroned_repr(f) for f in possible_throne_familiars},
             0,
             3,
             cat="Integer",
@@ -198,58 +420,49 @@ class Maximizer:
             (f.weight for f in possible_familiars if solution[repr(f)] == 1), 0
         )
 
+        # Evaluate every cell of the matrix that depends on our state
+        values = {}  # type: Dict[libkol.Modifier, List[float]]
+        for m, entries in rows.items():
+            values[m] = await ModifierMatrix.values(
+                entries,
+                context,
+                smithsness=smithsness,
+                familiar_weight=familiar_weight,
+                hobo_power=hobo_power,
+            )
+
+        def coefficient(b: "libkol.Bonus"):
+            return (
+                (solution[repr(b.item)] if isinstance(b.item, Item) else 1)
+                * (
+                    solution[repr(b.familiar)]
+                    if isinstance(b.familiar, Familiar)
+                    else 1
+                )
+                * (
+                    solution[self.enthroned_repr(b.throne_familiar)]
+                    if isinstance(b.throne_familiar, Familiar)
+                    else 1
+                )
+            )
+
         # Objective
         prob += lpSum(
             [
-                m.sum(
-                    [
-                        await b.get_value(
-                            smithsness=smithsness,
-                            familiar_weight=familiar_weight,
-                            hobo_power=hobo_power,
-                        )
-                        * (solution[repr(b.item)] if isinstance(b.item, Item) else 1)
-                        * (
-                            solution[repr(b.familiar)]
-                            if isinstance(b.familiar, Familiar)
-                            else 1
-                        )
-                        * (
-                            solution[self.enthroned_repr(b.throne_familiar)]
-                            if isinstance(b.throne_familiar, Familiar)
-                            else 1
-                        )
-                        for b in bonuses
-                        if b.outfit is None
-                        or (
-                            b.outfit
-                            and await b.outfit.is_fulfilled(
-                                [
-                                    sb.item
-                                    for sb in bonuses
-                                    if isinstance(sb.item, Item)
-                                    and solution[repr(sb.item)] >= 1
-                                ]
-                            )
-                        )
-                    ]
-                )
+                m.sum([v * coefficient(e.bonus) for e, v in zip(entries, values[m])])
                 * self.weight[m]
                 * (1 if m in self.maximize else -1 if m in self.minimize else 0)
-                async for m, bonuses in iter(grouped_bonuses.items())
+                for m, entries in rows.items()
             ]
         )
 
         # Add minima and maxima
-        for m, bonuses in grouped_bonuses.items():
+        for m, entries in rows.items():
             total = lpSum(
                 [
-                    await b.get_value(
-                        smithsness=smithsness, familiar_weight=familiar_weight
-                    )
-                    * solution[repr(b.item)]
-                    for b in bonuses
-                    if b.item
+                    v * solution[repr(e.bonus.item)]
+                    for e, v in zip(entries, values[m])
+                    if isinstance(e.bonus.item, Item)
                 ]
             )
             if self.minimum.get(m) is not None:
@@ -326,8 +539,8 @@ class Maximizer:
         for i in self.must_not_equip:
             prob += solution[repr(i)] == 0
 
-        prob.writeLP("maximizer.lp")
-        prob.solve()
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.run_solver, prob)
 
         if prob.status is not LpStatusOptimal:
             raise ValueError(LpStatus[prob.status])
@@ -351,7 +564,9 @@ class Maximizer:
                 continue
 
             if index_parts[1] == "<Familiar(Enthroned):":
-                throne_familiars += next(f for f in possible_throne_familiars if f.id == id)
+                throne_familiars += next(
+                    f for f in possible_throne_familiars if f.id == id
+                )
                 continue
 
             item = next(i for i in possible_items if i.id == id)
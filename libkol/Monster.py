@@ -1,16 +1,17 @@
 import libkol
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from tortoise.fields import CharField, IntField, BooleanField
 
-from .util import EnumField, PickleField, expression
+from .util import EnumField, IdentityMap, PickleField, expression
+from .util.PickleField import Pickled
 from .Model import Model
 from .Element import Element
 from .Phylum import Phylum
 from .Stat import Stat
 
 
-class Monster(Model):
+class Monster(IdentityMap, Model):
     id = IntField(pk=True, generated=False)
     name = CharField(max_length=255)
 
@@ -29,17 +30,17 @@ class Monster(Model):
     ghost = BooleanField(default=False)
 
     # Variable Stats
-    _attack = PickleField()
-    _cap = PickleField(default=10000)
-    _defence = PickleField()
-    _experience = PickleField(default=0)
-    _floor = PickleField(default=10)
-    _hp = PickleField()
-    _initiative = PickleField()
-    _ml_factor = PickleField(default=1)
-    _scale = PickleField(default=0)
-    _sprinkle_max = PickleField(default=0)
-    _sprinkle_min = PickleField(default=0)
+    _attack = PickleField(lazy=True)
+    _cap = PickleField(default=10000, lazy=True)
+    _defence = PickleField(lazy=True)
+    _experience = PickleField(default=0, lazy=True)
+    _floor = PickleField(default=10, lazy=True)
+    _hp = PickleField(lazy=True)
+    _initiative = PickleField(lazy=True)
+    _ml_factor = PickleField(default=1, lazy=True)
+    _scale = PickleField(default=0, lazy=True)
+    _sprinkle_max = PickleField(default=0, lazy=True)
+    _sprinkle_min = PickleField(default=0, lazy=True)
 
     # Static stats
     attack_element = EnumField(enum_type=Element, null=True)
@@ -48,46 +49,158 @@ class Monster(Model):
     phylum = EnumField(enum_type=Phylum, null=True)
     physical_resistance = IntField(default=0)
 
-    async def get_cap(self) -> int:
-        return await expression.evaluate(self.kol, self._cap)
+    # Process-wide index, so that identifying a monster at the start of a fight doesn't
+    # touch the database once it is warm
+    index_fields = ("id", "name")
+    _by_image = {}  # type: Dict[str, Monster]
 
-    async def get_floor(self) -> int:
-        return await expression.evaluate(self.kol, self._floor)
-
-    async def get_scale(self) -> int:
-        return await expression.evaluate(self.kol, self._scale)
-
-    async def get_attack(self) -> int:
-        return await expression.evaluate(self.kol, self._attack)
+    async def evaluate(
+        self, value: Any, context: Optional[expression.EvaluationContext] = None
+    ) -> int:
+        return await expression.evaluate(
+            self.kol, Pickled.unwrap(value), context=context
+        )
 
-    async def get_defence(self) -> int:
-        return await expression.evaluate(self.kol, self._defence)
+    async def get_cap(
+        self, context: Optional[expression.EvaluationContext] = None
+    ) -> int:
+        return await self.evaluate(self._cap, context)
+
+    async def get_floor(
+        self, context: Optional[expression.EvaluationContext] = None
+    ) -> int:
+        return await self.evaluate(self._floor, context)
+
+    async def get_scale(
+        self, context: Optional[expression.EvaluationContext] = None
+    ) -> int:
+        return await self.evaluate(self._scale, context)
+
+    async def get_attack(
+        self, context: Optional[expression.EvaluationContext] = None
+    ) -> int:
+        return await self.evaluate(self._attack, context)
+
+    async def get_defence(
+        self, context: Optional[expression.EvaluationContext] = None
+    ) -> int:
+        return await self.evaluate(self._defence, context)
+
+    async def get_hp(
+        self, context: Optional[expression.EvaluationContext] = None
+    ) -> int:
+        if context is None:
+            context = self.kol.evaluation_context
 
-    async def get_hp(self) -> int:
         if self._hp is not None:
-            return max(await expression.evaluate(self.kol, self._hp), 1)
+            return max(await self.evaluate(self._hp, context), 1)
 
-        if self.get_scale() is None:
+        if await self.get_scale(context) is None:
             return -1
 
         hp = min(
-            self.get_cap(),
-            max(self.get_floor(), self.kol.get_stat(Stat.Muscle, buffed=True)),
+            await self.get_cap(context),
+            max(await self.get_floor(context), context["MUS"]),
         )
 
         return max(hp // (4 / 3), 1)
 
     @classmethod
-    async def identify(cls, name: str, image: Optional[str] = None) -> "Monster":
+    def clear_cache(cls) -> None:
+        """
+        Empty the index, including the images, for example after switching to a different
+        database
+        """
+        cls._by_image.clear()
+        super().clear_cache()
+
+    @classmethod
+    async def preload(cls) -> int:
+        """
+        Fill the index with every monster and monster image in the database, in two queries.
+        Their stat expressions are left pickled until they are first evaluated.
+
+        :return: Number of monsters in the index
+        """
+        from .MonsterImage import MonsterImage
+
+        images = await MonsterImage.all().values_list("image", "monster_id")
+        count = await super().preload()
+
+        for image, monster_id in images:
+            if monster_id in cls._by_id:
+                cls._by_image.setdefault(image, cls._by_id[monster_id])
+
+        return count
+
+    @classmethod
+    async def identify(
+        cls, name: str, image: Optional[str] = None, id: Optional[int] = None
+    ) -> "Monster":
+        """
+        Find a monster by its image or, failing that, its name. Monsters that have been seen
+        before are found in the index without touching the database, as is everything once
+        the index has been preloaded, when a monster that isn't in the index is new. If the
+        session saves discoveries, monsters and images that are not in the database yet are
+        saved to it in the background, provided the monster's id is known.
+
+        :param name: Name of the monster, optionally with its article
+        :param image: Filename of the monster's image
+        :param id: Id of the monster
+        """
+        from .MonsterImage import MonsterImage
+
         if image is not None:
-            from .MonsterImage import MonsterImage
+            monster = cls._by_image.get(image)
+
+            if monster is not None:
+                return monster
 
-            monster_image = await MonsterImage.get(image=image).prefetch_related(
-                "monster"
-            )
-            return monster_image.monster
+            if not cls._preloaded:
+                monster_image = (
+                    await MonsterImage.filter(image=image)
+                    .prefetch_related("monster")
+                    .first()
+                )
+
+                if monster_image is not None:
+                    monster = cls.cache(monster_image.monster)
+                    cls._by_image[image] = monster
+                    return monster
+
+        if name.startswith(("a ", "an ")):
+            name = name[name.find(" ") + 1 :]
+
+        monster = cls._by_name.get(name)
+
+        if monster is None and not cls._preloaded:
+            monster = await cls.filter(name=name).first()
+
+        if monster is None and id is None:
+            if not cls._preloaded:
+                return await cls.get(name=name)
+
+            # Everything in the database is in the index, so this is a new monster
+            monster = Monster(name=name)
+        elif monster is None:
+            monster = cls._by_id.get(id)
+
+            if monster is None and not cls._preloaded:
+                monster = await cls.filter(id=id).first()
+
+            if monster is None:
+                monster = Monster(id=id, name=name)
+
+            if not monster._saved_in_db and cls.kol.write_behind is not None:
+                cls.kol.write_behind.add(monster)
+
+        monster = cls.cache(monster)
+
+        if image is not None:
+            cls._by_image[image] = monster
 
-        if name.startswith(("a ", "an")):
-            name = name[name.find(" ") :]
+            # A monster can only be saved once its id is known
+            if monster.id is not None and cls.kol.write_behind is not None:
+                cls.kol.write_behind.add(MonsterImage(image=image, monster=monster))
 
-        return await cls.get(name=name)
+        return monster
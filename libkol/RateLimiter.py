@@ -0,0 +1,152 @@
+import asyncio
+from dataclasses import dataclass
+from time import monotonic
+from typing import Dict, Optional, Tuple, Union
+
+
+class TokenBucket:
+    """
+    A token bucket that refills at a steady rate up to a maximum burst size.
+
+    Tokens can be borrowed against the future, so each caller reserves its slot as soon as it
+    asks and callers are served in the order they arrived.
+
+    :param rate: Tokens added to the bucket per second
+    :param capacity: Maximum number of tokens the bucket can hold, i.e. the largest burst
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = monotonic()
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket
+
+        :return: Number of seconds until the token is actually available
+        """
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self) -> float:
+        """
+        Wait until a token is available
+
+        :return: Number of seconds spent waiting
+        """
+        wait = self.reserve()
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        return wait
+
+
+@dataclass
+class RateLimitStats:
+    requests: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests > 0 else 0
+
+    def record(self, wait: float) -> None:
+        self.requests += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+Budget = Union[TokenBucket, Tuple[float, float], float]
+
+
+class RateLimiter:
+    """
+    Smooths out requests made by a Session. Every request takes a token from the bucket for
+    its path (if one is configured) and then from the global bucket (if one is configured).
+
+    .. code-block:: python
+
+      limiter = RateLimiter(rate=5, paths={"mall.php": (1, 3), "api.php": 10})
+      async with Session(rate_limiter=limiter) as kol:
+          ...
+
+    Any object with an ``async acquire(path: str)`` method can be used in its place.
+
+    :param rate: Requests per second allowed across all paths, or None for no global limit
+    :param capacity: Largest burst allowed across all paths. Defaults to one second's worth.
+    :param paths: Budgets for individual paths, keyed by path (e.g. ``"mall.php"``). Each is a
+                  TokenBucket, a ``(rate, capacity)`` tuple or just a rate.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        capacity: Optional[float] = None,
+        paths: Optional[Dict[str, Budget]] = None,
+    ) -> None:
+        self.bucket = TokenBucket(rate, capacity) if rate is not None else None
+        self.buckets = {
+            self.normalise(path): self.make_bucket(budget)
+            for path, budget in (paths or {}).items()
+        }  # type: Dict[str, TokenBucket]
+        self.stats = {}  # type: Dict[str, RateLimitStats]
+
+    @staticmethod
+    def normalise(path: str) -> str:
+        return path.lstrip("/")
+
+    @staticmethod
+    def make_bucket(budget: Budget) -> TokenBucket:
+        if isinstance(budget, TokenBucket):
+            return budget
+
+        if isinstance(budget, tuple):
+            return TokenBucket(*budget)
+
+        return TokenBucket(budget)
+
+    async def acquire(self, path: str) -> float:
+        """
+        Wait until a request to the given path is allowed
+
+        :param path: Path of the URL being requested
+        :return: Number of seconds spent waiting
+        """
+        path = self.normalise(path)
+        wait = 0.0
+
+        bucket = self.buckets.get(path)
+        if bucket is not None:
+            wait += await bucket.acquire()
+
+        if self.bucket is not None:
+            wait += await self.bucket.acquire()
+
+        self.stats.setdefault(path, RateLimitStats()).record(wait)
+
+        return wait
+
+    @property
+    def total(self) -> RateLimitStats:
+        """
+        Wait time statistics summed across every path
+        """
+        total = RateLimitStats()
+
+        for s in self.stats.values():
+            total.requests += s.requests
+            total.total_wait += s.total_wait
+            total.max_wait = max(total.max_wait, s.max_wait)
+
+        return total
@@ -0,0 +1,248 @@
+import asyncio
+import json
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+
+from aiohttp import ClientResponse
+from yarl import URL
+
+import libkol
+
+
+class CachedResponse:
+    """
+    A response served from a ResponseCache. It has just enough of the ClientResponse interface
+    for a Request to parse it.
+    """
+
+    history = ()  # type: Tuple[ClientResponse, ...]
+    status = 200
+
+    def __init__(self, url: str, body: bytes, encoding: str) -> None:
+        self.url = URL(url)
+        self.body = body
+        self.encoding = encoding
+
+    @classmethod
+    async def from_response(cls, response: ClientResponse) -> "CachedResponse":
+        return cls(str(response.url), await response.read(), response.get_encoding())
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self, encoding: Optional[str] = None) -> str:
+        return self.body.decode(encoding or self.encoding)
+
+    async def json(
+        self,
+        encoding: Optional[str] = None,
+        loads: Callable[[str], Any] = json.loads,
+        content_type: Optional[str] = None,
+    ) -> Any:
+        return loads(await self.text(encoding))
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0
+
+
+# When an entry expires, and the response itself
+Entry = Tuple[float, CachedResponse]
+
+
+class ResponseCache:
+    """
+    Remembers the responses to requests whose results rarely change, so that they are not
+    fetched again until they expire. Only requests that have a TTL are cached. Each Request
+    class can declare a default TTL with its ``cache_ttl`` attribute, and those can be
+    overridden here.
+
+    .. code-block:: python
+
+      cache = ResponseCache(ttls={request.player_profile: 600}, store="responses.db")
+      async with Session(response_cache=cache) as kol:
+          ...
+
+    Entries are kept in memory up to ``max_entries``, evicting the least recently used. If a
+    store is given, entries are also written to a SQLite database there so that they survive
+    from one run to the next. Whatever has expired is deleted from it when it is opened, and
+    after that it is only touched from a worker thread, so that it doesn't hold up the event
+    loop.
+
+    Pages that change as you play or at rollover, like the quest log, the hermit's stock or
+    the cafe menus, have no TTL of their own. Give them one here only if serving them stale
+    is acceptable.
+
+    :param max_entries: Number of responses to keep in memory
+    :param ttls: Seconds to keep the responses to each Request class for, overriding the
+                 class's own ``cache_ttl``. A TTL of None turns caching off for that class.
+    :param store: Path to a SQLite database to keep responses in between runs
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttls: Optional[Dict[Type["libkol.request.Request"], Optional[float]]] = None,
+        store: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttls = {} if ttls is None else dict(ttls)
+        self.entries = OrderedDict()  # type: OrderedDict[str, Entry]
+        self.stats = {}  # type: Dict[str, CacheStats]
+        self.evictions = 0
+        self.store = None  # type: Optional[sqlite3.Connection]
+        self.store_thread = None  # type: Optional[ThreadPoolExecutor]
+
+        if store is not None:
+            # A single thread, so that the connection is only ever used by one at a time
+            self.store_thread = ThreadPoolExecutor(max_workers=1)
+            self.store = sqlite3.connect(store, check_same_thread=False)
+            self.store.execute(
+                "CREATE TABLE IF NOT EXISTS response "
+                "(key TEXT PRIMARY KEY, expires REAL, url TEXT, encoding TEXT, body BLOB)"
+            )
+            # Drop whatever expired since the last run, so that the store doesn't keep growing
+            self.write("DELETE FROM response WHERE expires <= ?", time())
+
+    def get_ttl(self, request: Type["libkol.request.Request"]) -> Optional[float]:
+        """
+        Number of seconds to cache the responses to a Request class for, or None if they
+        should not be cached
+        """
+        return self.ttls.get(request, request.cache_ttl)
+
+    async def run_in_store(self, function: Callable[..., Any], *args) -> Any:
+        """
+        Run a function that uses the store on the store's thread
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.store_thread, function, *args)
+
+    def read(self, key: str) -> Optional[Entry]:
+        assert self.store is not None
+        row = self.store.execute(
+            "SELECT expires, url, encoding, body FROM response WHERE key = ?", (key,)
+        ).fetchone()
+
+        return None if row is None else (row[0], CachedResponse(row[1], row[3], row[2]))
+
+    def write(self, query: str, *parameters: Any) -> None:
+        assert self.store is not None
+        with self.store:
+            self.store.execute(query, parameters)
+
+    async def get(
+        self, request: Type["libkol.request.Request"], key: Hashable
+    ) -> Optional[CachedResponse]:
+        """
+        Look up a response that has not expired yet
+
+        :param request: Request class the response is for, used to group the statistics
+        :param key: Identifies the request
+        """
+        stats = self.stats.setdefault(request.__name__, CacheStats())
+        key = repr(key)
+        now = time()
+
+        entry = self.entries.get(key)
+
+        if entry is None and self.store is not None:
+            entry = await self.run_in_store(self.read, key)
+
+            if entry is not None:
+                self.remember(key, entry)
+
+        if entry is None or entry[0] <= now:
+            if entry is not None:
+                await self.forget(key)
+
+            stats.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        stats.hits += 1
+        return entry[1]
+
+    async def put(self, key: Hashable, response: CachedResponse, ttl: float) -> None:
+        """
+        Store a response
+
+        :param key: Identifies the request
+        :param response: Response to store
+        :param ttl: Seconds until the response expires
+        """
+        key = repr(key)
+        entry = (time() + ttl, response)
+        self.remember(key, entry)
+
+        if self.store is not None:
+            await self.run_in_store(
+                self.write,
+                "REPLACE INTO response VALUES (?, ?, ?, ?, ?)",
+                key,
+                entry[0],
+                str(response.url),
+                response.encoding,
+                response.body,
+            )
+
+    def remember(self, key: str, entry: Entry) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def forget(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+        if self.store is not None:
+            await self.run_in_store(
+                self.write, "DELETE FROM response WHERE key = ?", key
+            )
+
+    async def clear(self) -> None:
+        """
+        Throw away every cached response
+        """
+        self.entries.clear()
+
+        if self.store is not None:
+            await self.run_in_store(self.write, "DELETE FROM response")
+
+    def close(self) -> None:
+        """
+        Close the backing store, if there is one
+        """
+        if self.store_thread is not None:
+            self.store_thread.shutdown()
+            self.store_thread = None
+
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    @property
+    def total(self) -> CacheStats:
+        """
+        Hit and miss counts summed across every Request class
+        """
+        total = CacheStats()
+
+        for s in self.stats.values():
+            total.hits += s.hits
+            total.misses += s.misses
+
+        return total
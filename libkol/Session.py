@@ -1,28 +1,60 @@
-from aiohttp import ClientResponse, ClientSession
-from collections import defaultdict
+import asyncio
+from aiohttp import ClientResponse, ClientSession, TCPConnector
+from collections import Counter, defaultdict
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
-from os import path
+from http.cookies import SimpleCookie
+from os import path, replace
+import pickle
 from time import time
 from tortoise import Tortoise
-from typing import Any, Callable, DefaultDict, Dict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Counter as CounterType,
+    DefaultDict,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 from urllib.parse import urlparse
+from yarl import URL
 
 import libkol
 from libkol import Clan, Kmail, Chat, request, Item, Bonus, Familiar
 
 from .request.combat import CombatRound
+from .request.request import freeze
 from .request.choice import Choice, Option
 from .CharacterClass import CharacterClass
+from .Effect import Effect
 from .Element import Element
 from .Location import Location, Combat
 from .Model import Model
+from .Monster import Monster
+from .RateLimiter import RateLimiter
+from .ResponseCache import CachedResponse, ResponseCache
 from .Skill import Skill
 from .Slot import Slot
 from .Stat import Stat
 from .Trophy import Trophy
 
 from .types import FamiliarState
+from .util import snapshot
 from .util.decorators import logged_in
+from .util.expression import EvaluationContext
+from .util.WriteBehind import WriteBehind
+from .Error import ResumeFailedError
 
 models = [
     "libkol.Bonus",
@@ -41,6 +73,8 @@ models = [
     "libkol.ZapGroup",
 ]
 
+T = TypeVar("T")
+
 
 @dataclass
 class Stats:
@@ -62,7 +96,9 @@ class State:
     current_mp: int = 0
     custom_title: Optional[str] = None
     effects: Dict[str, int] = field(default_factory=dict)
+    effect_durations: Dict[int, int] = field(default_factory=dict)
     equipment: Dict[Slot, Optional[Item]] = field(default_factory=dict)
+    equipment_counts: CounterType[Item] = field(default_factory=Counter)
     familiar: Optional[Familiar] = None
     familiars: Dict[Familiar, FamiliarState] = field(default_factory=defaultdict)
     fullness: int = 0
@@ -80,6 +116,8 @@ class State:
     pwd: str = ""
     rollover: int = 0
     skills: List[Skill] = field(default_factory=list)
+    skill_ids: Set[int] = field(default_factory=set)
+    skill_names: Set[str] = field(default_factory=set)
     spleenhit: int = 0
     stats: Dict[Stat, Stats] = field(
         default_factory=lambda: {
@@ -91,6 +129,97 @@ class State:
     title: Optional[str] = None
     user_id: int = 0
     username: str = ""
+    evaluation_context: Optional[EvaluationContext] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def add_item(self, item: Item, quantity: int = 1) -> None:
+        """
+        Add (or with a negative quantity, remove) items from the inventory
+        """
+        quantity += self.inventory[item]
+
+        if quantity > 0:
+            self.inventory[item] = quantity
+        else:
+            del self.inventory[item]
+
+    def set_inventory(self, inventory: Dict[Item, int]) -> None:
+        self.inventory = defaultdict(
+            int,
+            {item: quantity for item, quantity in inventory.items() if quantity > 0},
+        )
+
+    def equip(self, slot: Slot, item: Optional[Item]) -> None:
+        """
+        Put an item (or nothing) in an equipment slot, keeping the equipment counts up to date
+        """
+        previous = self.equipment.get(slot)
+
+        if previous is not None:
+            self.equipment_counts[previous] -= 1
+
+            if self.equipment_counts[previous] <= 0:
+                del self.equipment_counts[previous]
+
+        self.equipment[slot] = item
+
+        if item is not None:
+            self.equipment_counts[item] += 1
+
+    def set_equipment(self, equipment: Dict[Slot, Optional[Item]]) -> None:
+        self.equipment = equipment
+        self.equipment_counts = Counter(
+            item for item in equipment.values() if item is not None
+        )
+
+    def set_skills(self, skills: List[Skill]) -> None:
+        self.skills = skills
+        self.skill_ids = {s.id for s in skills}
+        self.skill_names = {s.name for s in skills}
+
+    def set_effects(
+        self, effects: Dict[str, int], ids: Optional[Dict[str, int]] = None
+    ) -> None:
+        """
+        Replace the active effects
+
+        :param effects: Turns remaining keyed by effect name
+        :param ids: Effect id for each name, where known
+        """
+        ids = ids or {}
+        self.effects = effects
+        self.effect_durations = {
+            ids[name]: turns for name, turns in effects.items() if name in ids
+        }
+
+    def add_effect(self, name: str, turns: int, id: Optional[int] = None) -> None:
+        self.effects[name] = self.effects.get(name, 0) + turns
+
+        if id is not None:
+            self.effect_durations[id] = self.effect_durations.get(id, 0) + turns
+
+
+class InventoryView(Mapping):
+    """
+    Read-only view of the inventory in a State. Lookups go straight to the underlying
+    dictionary, so nothing is copied and an item you don't have counts as 0.
+    """
+
+    def __init__(self, state: State) -> None:
+        self.state = state
+
+    def __getitem__(self, item: Item) -> int:
+        return self.state.inventory.get(item, 0)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.state.inventory
+
+    def __iter__(self) -> Iterator[Item]:
+        return iter(self.state.inventory)
+
+    def __len__(self) -> int:
+        return len(self.state.inventory)
 
 
 class Session:
@@ -98,9 +227,71 @@ class Session:
 
     user_agent = "libkol"
 
-    def __init__(self, db_file=None):
+    # Parts of the state loaded after login, as the method that loads each one and the other
+    # parts that must be loaded before it
+    hydration_steps = {
+        "status": ("refresh_state", []),
+        "profile": ("refresh_profile", ["status"]),
+        "inventory": ("refresh_inventory", []),
+        "familiars": ("refresh_familiars", []),
+        "gender": ("refresh_gender", ["status"]),
+        "skills": ("get_skills", ["status"]),
+    }  # type: Dict[str, Tuple[str, List[str]]]
+
+    def __init__(
+        self,
+        db_file=None,
+        preload: bool = False,
+        max_concurrent_requests: int = 8,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
+        parse_executor: Optional[Executor] = None,
+        save_discoveries: bool = False,
+    ):
+        """
+        :param db_file: Path to the libkol database. Defaults to the one shipped with libkol
+        :param preload: Whether to load static game data into memory as soon as the database
+                        is opened, rather than lazily as it is needed
+        :param max_concurrent_requests: Maximum number of requests that may be in flight at once.
+                                        Any more will wait for an earlier one to finish.
+        :param limit_per_host: Maximum number of open connections to a single host
+        :param keepalive_timeout: Seconds to keep an idle connection open for reuse
+        :param dns_cache_ttl: Seconds to cache DNS lookups for
+        :param rate_limiter: RateLimiter (or anything with an ``async acquire(path)`` method)
+                             that every request must pass through before it is sent
+        :param response_cache: ResponseCache to serve the responses to idempotent requests
+                               from until they expire
+        :param parse_executor: Thread or process pool to run the CPU-heavy part of parsing
+                               large pages in, so that it doesn't hold up the event loop.
+                               By default it runs on the loop.
+        :param save_discoveries: Whether to save items and monsters discovered at runtime to
+                                 the database, so that they needn't be discovered again. This
+                                 needs a db_file of your own, as the database shipped with
+                                 libkol is never written to.
+        """
+        if save_discoveries and db_file is None:
+            raise ValueError("Saving discoveries needs a db_file of your own")
+
         super().__init__()
-        self.client = ClientSession()
+        connector = TCPConnector(
+            limit=max(max_concurrent_requests, limit_per_host),
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=dns_cache_ttl,
+        )
+        self.client = ClientSession(connector=connector)
+        self.request_slots = asyncio.Semaphore(max_concurrent_requests)
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.parse_executor = parse_executor
+        self.write_behind = (
+            WriteBehind() if save_discoveries else None
+        )  # type: Optional[WriteBehind]
+        self.in_flight = {}  # type: Dict[Hashable, asyncio.Future]
         self.opener = self.client
         self.is_connected = False
         self.state = State()
@@ -108,16 +299,29 @@ class Session:
         self.kmail = Kmail(self)
         self.chat = Chat(self)
         self.db_file = db_file or path.join(path.dirname(__file__), "libkol.db")
+        self.preload = preload
+        self.session_file = None  # type: Optional[str]
 
     async def __aenter__(self) -> "Session":
         db_url = "sqlite://{}".format(self.db_file)
         await Tortoise.init(db_url=db_url, modules={"models": models})
         Model.kol = self
+
+        if self.preload:
+            await Item.preload()
+            await Monster.preload()
+            await Effect.preload()
+
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
         if self.is_connected:
-            await self.logout()
+            if self.session_file is not None:
+                self.save()
+            else:
+                await self.logout()
+        if self.write_behind is not None:
+            await self.write_behind.close()
         await self.client.close()
         await Tortoise.close_connections()
 
@@ -129,7 +333,9 @@ class Session:
         pwd: bool = False,
         ajax: bool = False,
         json: bool = False,
-        **kwargs
+        coalesce: bool = False,
+        cache: Optional[Type["libkol.request.Request"]] = None,
+        **kwargs,
     ) -> ClientResponse:
         """
         Make an HTTP request. This is mostly proxied through to ClientRequest
@@ -140,9 +346,23 @@ class Session:
         :param pwd: Whether to inject the pwd into the request
         :param ajax: Whether to inject the necessary ajax params into the request
         :param json: Whether to parse the response as JSON instead of HTML
+        :param coalesce: Whether this request is idempotent, so that it may share a response
+                         with an identical request (same method, URL, params and data) that
+                         is already in flight rather than being sent again
+        :param cache: Request class this request is made for. If the Session has a response
+                      cache and that class has a TTL, the response may be served from (and
+                      will be stored in) the cache.
+
+        At most ``max_concurrent_requests`` requests are in flight at any time. The response body
+        is read before the request gives up its slot, so fanning out with ``asyncio.gather`` is
+        bounded all the way through. If the Session has a rate limiter, the request waits on it
+        (keyed by the URL path) before taking a slot.
         """
-        if urlparse(url).netloc == "":
+        parsed = urlparse(url)
+
+        if parsed.netloc == "":
             url = "{}/{}".format(self.server_url, url)
+            parsed = urlparse(url)
 
         if "params" not in kwargs:
             kwargs["params"] = {}
@@ -154,10 +374,97 @@ class Session:
             kwargs["params"]["_"] = int(time() * 1000)
             kwargs["params"]["ajax"] = 1
 
-        return await self.client.request(method, url, **kwargs)
+        ttl = None  # type: Optional[float]
+
+        if cache is not None and self.response_cache is not None:
+            ttl = self.response_cache.get_ttl(cache)
+
+        if ttl is not None:
+            # Leave the pwd out of the key so that cached responses outlive the session
+            params = {k: v for k, v in kwargs["params"].items() if k != "pwd"}
+            cache_key = (
+                self.user_id,
+                method.upper(),
+                url,
+                freeze({**kwargs, "params": params}),
+            )
+            cached = await self.response_cache.get(cache, cache_key)
+
+            if cached is not None:
+                return cached
+
+        if coalesce:
+            key = ("request", method.upper(), url, freeze(kwargs))
+            response = await self.single_flight(
+                key, lambda: self.send(method, url, **kwargs)
+            )
+        else:
+            response = await self.send(method, url, **kwargs)
+
+        # Don't cache anything that was redirected elsewhere, like to the login page
+        if (
+            ttl is not None
+            and response.status == 200
+            and response.url.path == parsed.path
+        ):
+            await self.response_cache.put(
+                cache_key, await CachedResponse.from_response(response), ttl
+            )
+
+        return response
+
+    async def send(self, method: str, url: str, **kwargs) -> ClientResponse:
+        """
+        Send a prepared request once the rate limiter and the concurrency limit allow it
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(urlparse(url).path)
+
+        async with self.request_slots:
+            response = await self.client.request(method, url, **kwargs)
+            await response.read()
+
+        return response
+
+    async def run_cpu_bound(self, function: Callable[..., T], *args) -> T:
+        """
+        Run a CPU-heavy function in the parse executor, or right here if there isn't one
+
+        :param function: Function to run. It must be picklable to use a process pool.
+        """
+        if self.parse_executor is None:
+            return function(*args)
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.parse_executor, function, *args)
+
+    async def single_flight(
+        self, key: Hashable, start: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Run a coroutine unless one with the same key is already running, in which case wait
+        for that one and share its result (or exception) instead.
+
+        :param key: Identifies equivalent work
+        :param start: Starts the work if nothing with the same key is in flight
+        """
+        future = self.in_flight.get(key)
+
+        if future is None:
+            future = asyncio.ensure_future(start())
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+        # One caller giving up should not cancel the work for everyone else
+        return await asyncio.shield(future)
 
     async def login(
-        self, username: str, password: str, server_number: int = 0, stealth: bool = True
+        self,
+        username: str,
+        password: str,
+        server_number: int = 0,
+        stealth: bool = True,
+        hydrate: Optional[Iterable[str]] = None,
     ) -> bool:
         """
         Perform a KoL login given a username and password. A server number may also be specified
@@ -168,6 +475,8 @@ class Session:
         :param password: Your password
         :param server_number: Which server number to use
         :param stealth: Whether to announce your login
+        :param hydrate: Parts of the state to load once logged in (see ``hydration_steps``).
+                        Defaults to all of them.
         """
 
         # Grab the KoL homepage.
@@ -186,16 +495,168 @@ class Session:
         await request.main(self).parse()
         await request.charpane(self).parse()
 
-        await self.get_status()
-        await self.refresh_profile()
-        await self.refresh_inventory()
-        await self.refresh_equipment()
-        await self.refresh_familiars()
-        await self.refresh_gender()
-        await self.get_skills()
+        await self.hydrate(hydrate)
 
         return True
 
+    @logged_in
+    async def hydrate(self, parts: Optional[Iterable[str]] = None) -> bool:
+        """
+        Load parts of the state, running each refresh as soon as the ones it depends on have
+        finished so that independent refreshes run concurrently.
+
+        :param parts: Names of the parts of the state to load (see ``hydration_steps``).
+                      Anything they depend on is loaded too. Defaults to all of them.
+        """
+        if parts is None:
+            parts = self.hydration_steps.keys()
+
+        unknown = set(parts) - self.hydration_steps.keys()
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown state to hydrate: {', '.join(sorted(unknown))}")
+
+        tasks = {}  # type: Dict[str, asyncio.Future]
+
+        def schedule(name: str) -> asyncio.Future:
+            if name not in tasks:
+                method, dependencies = self.hydration_steps[name]
+                waiting_on = [schedule(d) for d in dependencies]
+
+                async def run():
+                    await asyncio.gather(*waiting_on)
+                    await getattr(self, method)()
+
+                tasks[name] = asyncio.ensure_future(run())
+
+            return tasks[name]
+
+        for name in parts:
+            schedule(name)
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            # Don't leave the other steps running once one has failed
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        return True
+
+    @logged_in
+    def save(self, file: Optional[str] = None) -> None:
+        """
+        Write the cookies, server and state of this session to a file so that a later process
+        can pick it up with ``resume`` instead of logging in again. Once a session has been
+        saved it is saved again on exit rather than being logged out.
+
+        :param file: Path to write to. Defaults to the file the session was last saved to or
+                     resumed from.
+        """
+        file = file or self.session_file
+
+        if file is None:
+            raise ValueError("No file to save the session to")
+
+        temporary = f"{file}.tmp"
+
+        with open(temporary, "wb") as f:
+            pickle.dump(snapshot.dump(self), f)
+
+        replace(temporary, file)
+        self.session_file = file
+
+    async def resume(
+        self,
+        file: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        server_number: int = 0,
+        stealth: bool = True,
+        hydrate: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        Pick up a session saved with ``save``. The saved session is checked with a single
+        ``api.php`` status request, and if it is missing, has expired or can't be restored for
+        any other reason, a full login is performed instead (provided a username and password
+        were given). The session only counts as connected once the check has passed.
+
+        The file is read with ``pickle``, which can run arbitrary code, so only resume from
+        files that you trust.
+
+        :param file: Path the session was saved to
+        :param username: Your username
+        :param password: Your password
+        :param server_number: Which server number to use if logging in
+        :param stealth: Whether to announce your login if logging in
+        :param hydrate: Parts of the state to load if logging in (see ``hydration_steps``)
+        :return: Whether the session is now logged in. False if there is no saved session
+                 and no username and password to log in with instead.
+        :raises ResumeFailedError: If there is a saved session that could not be resumed
+                                   and no username and password to log in with instead
+        """
+        self.session_file = file
+        error = None  # type: Optional[Exception]
+
+        try:
+            await self.restore(file)
+        except FileNotFoundError:
+            pass
+        except asyncio.CancelledError:
+            self.forget()
+            raise
+        except Exception as e:
+            error = e
+        else:
+            self.is_connected = True
+            return True
+
+        self.forget()
+
+        if username is not None and password is not None:
+            return await self.login(username, password, server_number, stealth, hydrate)
+
+        if error is not None:
+            raise ResumeFailedError(
+                f"Could not resume the saved session: {error}"
+            ) from error
+
+        return False
+
+    async def restore(self, file: str) -> None:
+        """
+        Load a session saved with ``save`` and check with the server that it is still good,
+        without marking it as connected
+        """
+        with open(file, "rb") as f:
+            saved = pickle.load(f)
+
+        if saved["version"] != snapshot.version:
+            raise ValueError("Saved session is from a different version of libkol")
+
+        self.server_url = saved["server_url"]
+
+        # Loading the state can discover items, which needs the session's cookies
+        for key, value, domain, cookie_path in saved["cookies"]:
+            cookie = SimpleCookie()  # type: SimpleCookie
+            cookie[key] = value
+            cookie[key]["domain"] = domain
+            cookie[key]["path"] = cookie_path
+            self.client.cookie_jar.update_cookies(cookie, URL(self.server_url))
+
+        self.state = await snapshot.load_state(self, saved)
+
+        # The status is cheap and refreshes the pwd and whatever changed since the save
+        await self.load_status()
+
+    def forget(self) -> None:
+        """
+        Throw away a partly restored session
+        """
+        self.is_connected = False
+        self.state = State()
+        self.client.cookie_jar.clear()
+
     @logged_in
     async def join_clan(self, id: int = None, name: str = None) -> bool:
         """
@@ -266,6 +727,17 @@ class Session:
     def skills(self):
         return self.state.skills
 
+    def has_skill(self, skill: Union[Skill, int, str]) -> bool:
+        """
+        Whether the character knows a skill
+
+        :param skill: Skill, or its id or name
+        """
+        if isinstance(skill, str):
+            return skill in self.state.skill_names
+
+        return (skill if isinstance(skill, int) else skill.id) in self.state.skill_ids
+
     @property
     def pwd(self):
         return self.state.pwd
@@ -275,12 +747,28 @@ class Session:
         return self.state.fury
 
     @logged_in
-    async def get_status(self) -> bool:
+    async def refresh_state(self) -> bool:
+        """
+        Load as much of the state as possible from a single api.php status request. This
+        covers HP/MP, stats, meat, adventures, consumption, effects, equipment, the current
+        familiar, the pwd and the rollover time. Pages are only scraped for anything else.
         """
-        Load the current username, user_id, pwd and rollover time into the state
+        return await self.load_status()
+
+    async def load_status(self) -> bool:
+        """
+        Send the api.php status request behind ``refresh_state``, whether or not the session
+        is known to be connected yet
         """
         return await request.status(self).parse()
 
+    @logged_in
+    async def get_status(self) -> bool:
+        """
+        Load the current state from api.php (see ``refresh_state``)
+        """
+        return await self.refresh_state()
+
     @logged_in
     async def refresh_profile(self) -> bool:
         """
@@ -337,6 +825,18 @@ class Session:
     def effects(self) -> Dict[str, int]:
         return self.state.effects
 
+    def get_effect_duration(self, effect: Union["libkol.Effect", int, str]) -> int:
+        """
+        Turns remaining of an effect, or 0 if it is not active
+
+        :param effect: Effect, or its id or name
+        """
+        if isinstance(effect, str):
+            return self.state.effects.get(effect, 0)
+
+        id = effect if isinstance(effect, int) else effect.id
+        return self.state.effect_durations.get(id, 0)
+
     @property
     def ascensions(self) -> int:
         return self.state.ascensions
@@ -363,15 +863,28 @@ class Session:
     def familiar_weight(self) -> int:
         return self.state.familiars[self.familiar].weight
 
-    @logged_in
-    async def get_reagent_potion_duration(self) -> int:
-        from . import Skill
-
+    @property
+    def reagent_potion_duration(self) -> int:
         duration = 5
         duration += 5 if self.get_character_class() == CharacterClass.Sauceror else 0
-        duration += 5 if (await Skill["Impetuous Sauciness"]).have() else 0
+        duration += 5 if self.has_skill("Impetuous Sauciness") else 0
         return duration
 
+    @logged_in
+    async def get_reagent_potion_duration(self) -> int:
+        return self.reagent_potion_duration
+
+    @property
+    def evaluation_context(self) -> EvaluationContext:
+        """
+        Snapshot of the current state for evaluating expressions. The same snapshot is
+        returned until the next request is parsed.
+        """
+        if self.state.evaluation_context is None:
+            self.state.evaluation_context = EvaluationContext(self)
+
+        return self.state.evaluation_context
+
     @logged_in
     async def refresh_equipment(self) -> bool:
         await request.equipment(self).parse()
@@ -381,6 +894,12 @@ class Session:
     def equipment(self) -> Dict["libkol.Slot", Optional[Item]]:
         return self.state.equipment
 
+    def get_equipped_count(self, item: Item) -> int:
+        """
+        Number of the given item currently equipped
+        """
+        return self.state.equipment_counts[item]
+
     @logged_in
     async def refresh_familiars(self) -> bool:
         await request.familiar(self).parse()
@@ -400,8 +919,8 @@ class Session:
         return True
 
     @property
-    def inventory(self) -> DefaultDict[Item, int]:
-        return defaultdict(int, self.state.inventory)
+    def inventory(self) -> Mapping[Item, int]:
+        return InventoryView(self.state)
 
     @logged_in
     async def mine(
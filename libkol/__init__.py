@@ -2,9 +2,11 @@ import asyncio
 from typing import Callable
 
 from . import types
+from .AdventureRunner import AdventureRunner
 from .Bonus import Bonus
 from .CharacterClass import CharacterClass
 from .Clan import Clan
+from .CombatMacro import CombatMacro
 from .Chat import Chat
 from .Element import Element
 from .Effect import Effect
@@ -13,6 +15,7 @@ from .Familiar import Familiar
 from .FoldGroup import FoldGroup
 from .Item import Item
 from .Kmail import Kmail
+from .LoopMonitor import LoopMonitor
 from .Maximizer import Maximizer
 from .Modifier import Modifier
 from .Monster import Monster
@@ -21,6 +24,8 @@ from .MonsterImage import MonsterImage
 from .Outfit import Outfit
 from .OutfitVariant import OutfitVariant
 from .Phylum import Phylum
+from .RateLimiter import RateLimiter
+from .ResponseCache import ResponseCache
 from .Session import Session, models
 from .Skill import Skill
 from .Store import Store
@@ -37,9 +42,11 @@ def run(func: Callable):
 
 
 __all__ = [
+    "AdventureRunner",
     "Bonus",
     "CharacterClass",
     "Clan",
+    "CombatMacro",
     "Element",
     "Effect",
     "Error",
@@ -47,6 +54,7 @@ __all__ = [
     "FoldGroup",
     "Item",
     "Kmail",
+    "LoopMonitor",
     "Maximizer",
     "Monster",
     "MonsterDrop",
@@ -56,6 +64,8 @@ __all__ = [
     "Outfit",
     "OutfitVariant",
     "Phylum",
+    "RateLimiter",
+    "ResponseCache",
     "Session",
     "Skill",
     "Store",
@@ -43,6 +43,7 @@ from .closet_item_add import closet_item_add
 from .closet_meat_add import closet_meat_add
 from .closet_meat_remove import closet_meat_remove
 from .combat import combat
+from .combat_macro import combat_macro
 from .craft import craft
 from .craft_paste import craft_paste
 from .curse import curse
@@ -144,6 +145,7 @@ __all__ = [
     "closet_meat_add",
     "closet_meat_remove",
     "combat",
+    "combat_macro",
     "craft",
     "craft_paste",
     "curse",
@@ -58,18 +58,24 @@ class ascension_history(Request[List[Ascension]]):
     :params pre_ns13: Whether to include pre NS13 ascension history
     """
 
+    cache_ttl = 60 * 60
+
     def __init__(
         self, session: "libkol.Session", player_id: int, pre_ns13: bool = False
     ) -> None:
+        super().__init__(session)
+
         params = {"back": "other", "who": player_id, "prens13": 1 if pre_ns13 else 0}
-        self.request = session.request("ascensionhistory.php", params=params)
+        self.request = session.request(
+            "ascensionhistory.php", params=params, cache=type(self)
+        )
 
     @staticmethod
     async def parser(content: str, **kwargs) -> List[Ascension]:
         """
         Parses through the response and constructs an array of ascensions.
         """
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
         end_dates = soup.find_all("td", height="30")
 
         ascensions = []  # type: List[Ascension]
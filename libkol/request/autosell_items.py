@@ -34,6 +34,8 @@ class autosell_items(Request[Response]):
         all: bool = False,
         keep_one: bool = False,
     ):
+        super().__init__(session)
+
         params = {"action": "sell"}
 
         if keep_one:
@@ -20,6 +20,8 @@ class cafe_consume(Request[parsing.ResourceGain]):
     def __init__(
         self, session: "libkol.Session", cafe: Cafe, item: "libkol.Item"
     ) -> None:
+        super().__init__(session)
+
         params = {"action": "CONSUME!", "cafeid": cafe, "whichitem": item.id}
         self.request = session.request("cafe.php", pwd=True, params=params)
 
@@ -26,8 +26,12 @@ class cafe_menu(Request[List["libkol.Item"]]):
     """
 
     def __init__(self, session: "libkol.Session", cafe: Cafe):
+        super().__init__(session)
+
         params = {"cafeid": cafe}
-        self.request = session.request("cafe.php", pwd=True, params=params)
+        self.request = session.request(
+            "cafe.php", pwd=True, params=params, cache=type(self)
+        )
 
     @staticmethod
     async def parser(content: str, **kwargs) -> List["libkol.Item"]:
@@ -36,19 +40,13 @@ class cafe_menu(Request[List["libkol.Item"]]):
         if cannot_go_pattern.search(content):
             raise InvalidLocationError("You cannot reach that cafe.")
 
-        items = []  # type: List[libkol.Item]
-        for match in menu_item_pattern.finditer(content):
-            desc_id = match.group(2)
-            if desc_id.isdigit() is False:
-                continue
-
-            item = await Item.get_or_discover(desc_id=int(desc_id))
-
-            if item is None:
-                print("Unrecognised item with descid {}".format(desc_id))
-                continue
-
-            items += [item]
+        items = await Item.resolve_many(
+            desc_ids=[
+                int(match.group(2))
+                for match in menu_item_pattern.finditer(content)
+                if match.group(2).isdigit()
+            ]
+        )  # type: List[libkol.Item]
 
         if len(items) == 0:
             raise RequestGenericError("Retrieved an Empty Menu")
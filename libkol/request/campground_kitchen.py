@@ -23,6 +23,8 @@ class campground_kitchen(Request[Response]):
     """
 
     def __init__(self, session: "libkol.Session"):
+        super().__init__(session)
+
         params = {"action": "inspectkitchen"}
         self.request = session.request("campground.php", pwd=True, params=params)
 
@@ -11,5 +11,7 @@ class campground_rest(Request):
     """
 
     def __init__(self, session: "libkol.Session"):
+        super().__init__(session)
+
         params = {"action": "rest"}
         self.request = session.request("campground.php", params=params)
@@ -11,6 +11,8 @@ invalid_turns_pattern = PatternManager.getOrCompilePattern("invalidAdvInstitute"
 
 class canadia_gym(Request[parsing.ResourceGain]):
     def __init__(self, session: "libkol.Session", turns: int):
+        super().__init__(session)
+
         params = {"action": "institute", "numturns": turns}
         self.request = session.request("canadia.php", params=params)
 
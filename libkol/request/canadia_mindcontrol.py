@@ -6,6 +6,8 @@ from .request import Request
 
 class canadia_mindcontrol(Request[bool]):
     def __init__(self, session: "libkol.Session", level: int) -> None:
+        super().__init__(session)
+
         params = {"action": "changedial", "whichlevel": level}
         self.request = session.request("canadia.php", params=params)
 
@@ -1,6 +1,6 @@
 import re
 from typing import Tuple
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 
 import libkol
 
@@ -30,7 +30,7 @@ current_familiar = re.compile(
     r"href=\"familiar.php\"(?:[^>]+)>(?:<b>)?<font size=[0-9]+>(.*?)</a>(?:</b>)?, the  <b>([0-9]+)<\/b> pound (.*?)<(?:table|\/)"
 )
 characterEffect = re.compile(
-    r"eff\(\"[a-fA-F0-9]+\"\);\'.*?></td><td valign=center><font size=[0-9]+>(.*?) ?\(([0-9]+)\)</font><br></td>"
+    r"eff\(\"([a-fA-F0-9]+)\"\);\'.*?></td><td valign=center><font size=[0-9]+>(.*?) ?\(([0-9]+)\)</font><br></td>"
 )
 characterRonin = re.compile(r">Ronin</a>: <b>([0-9]+)</b>")
 characterMindControl = re.compile(r">Mind Control</a>: <b>([0-9]{1,2})</b>")
@@ -67,11 +67,11 @@ class charpane(Request[bool]):
         if pwd_matcher is None or username_matcher is None or user_id_matcher is None:
             raise UnknownError("Failed to parse basic information from charpane")
 
-        from libkol import Familiar, Stat
+        from libkol import Effect, Familiar, Stat
 
         session = kwargs["session"]  # type: "libkol.Session"
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         session.state.pwd = pwd_matcher.group(1)
         session.state.username = username_matcher.group(1)
@@ -121,14 +121,18 @@ class charpane(Request[bool]):
             familiar = await Familiar[str(match.group(3))]
             session.state.familiar = familiar
 
-        session.state.effects = {
-            str(match.group(1)): int(match.group(2))
-            for match in (
-                match
-                for match in characterEffect.finditer(content)
-                if match is not None
-            )
+        effects = {
+            str(match.group(2)): (str(match.group(1)), int(match.group(3)))
+            for match in characterEffect.finditer(content)
         }
+        names = list(effects.keys())
+        known = await Effect.resolve_many(
+            desc_ids=[desc_id for desc_id, _ in effects.values()]
+        )
+        session.state.set_effects(
+            {name: turns for name, (_, turns) in effects.items()},
+            {name: e.id for name, e in zip(names, known) if e is not None},
+        )
 
         session.state.stats[Stat.Muscle].from_tuple(cls.get_stat(soup, "Muscle:"))
         session.state.stats[Stat.Moxie].from_tuple(cls.get_stat(soup, "Moxie:"))
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from typing import Any, Dict, List, Union
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 import libkol
 
 from ..Error import UnknownError
@@ -45,7 +45,7 @@ class choice(Request[Union[Tag, Choice]]):
     @staticmethod
     async def parser(content: str, **kwargs) -> Union[Tag, Choice]:
         session = kwargs["session"]  # type: libkol.Session
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         choice = Choice(session, 0, [])
 
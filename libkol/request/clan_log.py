@@ -2,8 +2,8 @@ from enum import Enum, auto
 from datetime import datetime
 from dataclasses import dataclass
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
 import re
+from yarl import URL
 
 import libkol
 from libkol.util import parsing
@@ -54,7 +54,11 @@ class clan_log(Request[List[ClanLog]]):
     Retrieves the clan activity log.
     """
 
+    cpu_bound = True
+
     def __init__(self, session: "libkol.Session"):
+        super().__init__(session)
+
         self.request = session.request("clan_log.php")
 
     log_patterns = {
@@ -135,7 +139,12 @@ class clan_log(Request[List[ClanLog]]):
 
     @classmethod
     async def parser(cls, content: str, **kwargs) -> List[ClanLog]:
-        soup = BeautifulSoup(content, "html.parser")
+        extracted = kwargs.get("extracted")
+        return extracted if extracted is not None else cls.extract(content)
+
+    @classmethod
+    def extract(cls, content: str, url: Optional[URL] = None) -> List[ClanLog]:
+        soup = parsing.soup(content)
 
         raw_logs = [
             log.get_text()
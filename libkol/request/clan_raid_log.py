@@ -2,7 +2,7 @@ import re
 from enum import Enum
 from typing import Dict, List, Optional, Tuple
 from datetime import date
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 from yarl import URL
 from dataclasses import dataclass
 import libkol
@@ -145,6 +145,8 @@ class clan_raid_log(Request[Raid]):
     Retrieves on a previous raid.
     """
 
+    cpu_bound = True
+
     def __init__(self, session: "libkol.Session", raid_id: int) -> None:
         super().__init__(session)
 
@@ -531,8 +533,14 @@ class clan_raid_log(Request[Raid]):
 
     @classmethod
     async def parser(cls, content: str, **kwargs) -> Raid:
-        url = kwargs["url"]  # type: URL
-        soup = BeautifulSoup(content, "html.parser")
+        extracted = kwargs.get("extracted")
+        return (
+            extracted if extracted is not None else cls.extract(content, kwargs["url"])
+        )
+
+    @classmethod
+    def extract(cls, content: str, url: URL) -> Raid:
+        soup = parsing.soup(content)
 
         title = soup.find("b", text=previous_run_pattern)
 
@@ -1,12 +1,13 @@
 from typing import List, Tuple
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 
 import libkol
 
 from ..Error import ClanPermissionsError
 from .clan_raid_log import clan_raid_log, Raid
 from .request import Request
+from ..util import parsing
 
 
 class clan_raids(Request[List[Raid]]):
@@ -31,7 +32,7 @@ class clan_raids(Request[List[Raid]]):
         ) in content or content == "":
             raise ClanPermissionsError("You do not have dungeon access for this clan")
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         current = soup.find("b", text="Current Clan Dungeons:")
 
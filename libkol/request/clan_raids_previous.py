@@ -3,13 +3,13 @@ from datetime import datetime
 from typing import List
 from dataclasses import dataclass
 
-from bs4 import BeautifulSoup
 from yarl import URL
 
 import libkol
 
 from ..Error import ClanRaidsNotFoundError, UnknownError
 from .request import Request
+from ..util import parsing
 from .clan_raid_log import Raid
 
 summary_pattern = re.compile(r"Showing [0-9]+-[0-9]+ of ([0-9]+)")
@@ -38,7 +38,7 @@ class clan_raids_previous(Request[Response]):
         if "(No previous Clan Dungeon records found)" in content:
             raise ClanRaidsNotFoundError("Page of old clan raids not found")
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
         summary = soup.find(text=summary_pattern)
         m = summary_pattern.search(summary.string)
 
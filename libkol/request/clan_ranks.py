@@ -1,10 +1,11 @@
 from typing import Any, Dict, List
 
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 
 import libkol
 
 from .request import Request
+from ..util import parsing
 
 
 class clan_ranks(Request[List[Dict[str, Any]]]):
@@ -34,7 +35,7 @@ class clan_ranks(Request[List[Dict[str, Any]]]):
 
     @classmethod
     async def parser(cls, content: str, **kwargs) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         ranks = [
             {
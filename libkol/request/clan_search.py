@@ -15,6 +15,8 @@ class clan_search(Request[List["Clan"]]):
     def __init__(
         self, session: "libkol.Session", query: str, nameonly: bool = True
     ) -> None:
+        super().__init__(session)
+
         data = {
             "action": "search",
             "searchstring": query,
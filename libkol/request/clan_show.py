@@ -1,11 +1,11 @@
 from typing import Any, Dict
 
-from bs4 import BeautifulSoup
 from yarl import URL
 
 import libkol
 
 from .request import Request
+from ..util import parsing
 
 
 class clan_show(Request[Dict[str, Any]]):
@@ -13,13 +13,20 @@ class clan_show(Request[Dict[str, Any]]):
     Get information about a clan
     """
 
+    cache_ttl = 60 * 60
+    coalesce = True
+
     def __init__(self, session: "libkol.Session", id: int):
+        super().__init__(session)
+
         params = {"recruiter": 1, "whichclan": id}
-        self.request = session.request("showclan.php", params=params)
+        self.request = session.request(
+            "showclan.php", params=params, coalesce=self.coalesce, cache=type(self)
+        )
 
     @staticmethod
     async def parser(content: str, **kwargs) -> Dict[str, Any]:
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
         leader_link = soup.find("a")
         return {
             "name": soup.find("td", bgcolor="blue").string,
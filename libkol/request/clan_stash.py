@@ -24,11 +24,14 @@ class clan_stash(Request[List[Dict[str, Any]]]):
     async def parser(content: str, **kwargs) -> List[Dict[str, Any]]:
         from libkol import Item
 
+        rows = [m.groupdict() for m in stashItemsPattern.finditer(content)]
+        items = await Item.resolve_many(ids=[int(i["id"]) for i in rows])
+
         return [
             {
-                "item": await Item.get_or_discover(id=int(i["id"])),
+                "item": item,
                 "quantity": int(i["quantity"] or 1),
                 "cost": int(i["cost"] or 0),
             }
-            for i in (m.groupdict() for m in stashItemsPattern.finditer(content))
+            for item, i in zip(items, rows)
         ]
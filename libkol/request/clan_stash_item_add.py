@@ -13,6 +13,8 @@ class clan_stash_item_add(Request):
     def __init__(
         self, session: "libkol.Session", items: List["libkol.types.ItemQuantity"]
     ) -> None:
+        super().__init__(session)
+
         params = {"action": "addgoodies"}
 
         for i, iq in enumerate(items):
@@ -1,11 +1,11 @@
 import re
 from typing import Any, Dict, List
 
-from bs4 import BeautifulSoup
 
 import libkol
 
 from .request import Request
+from ..util import parsing
 
 rank_pattern = re.compile(r"(.*?) \(°([0-9]+)\)")
 
@@ -24,7 +24,7 @@ class clan_whitelist(Request[List[Dict[str, Any]]]):
     async def parser(
         content: str, include_rank: bool = False, only_rank: bool = False, **kwargs
     ) -> List[Dict[str, Any]]:
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         # Get rid of stupid forms everywhere
         for f in soup.find_all("form"):
@@ -18,6 +18,8 @@ class clan_whitelist_add(Request[Response]):
         rank: int = 0,
         title: str = "",
     ) -> None:
+        super().__init__(session)
+
         payload = {"action": "add", "addwho": user, "level": rank, "title": title}
         self.request = session.request("clan_whitelist.php", data=payload, pwd=True)
 
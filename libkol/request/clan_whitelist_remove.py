@@ -7,6 +7,8 @@ from .request import Request
 
 class clan_whitelist_remove(Request[bool]):
     def __init__(self, session: "libkol.Session", user: Union[int, str]) -> None:
+        super().__init__(session)
+
         payload = {"action": "updatewl", "who": user, "remove": "Remove"}
         self.request = session.request("clan_whitelist.php", data=payload, pwd=True)
 
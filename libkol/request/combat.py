@@ -1,7 +1,8 @@
 from enum import Enum
-from typing import List, Optional, Union
-from dataclasses import dataclass
-from bs4 import Tag, NavigableString
+from html import unescape
+from typing import Any, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
+from bs4 import BeautifulSoup
 from yarl import URL
 import re
 
@@ -20,6 +21,27 @@ class CombatEvent:
     damage: int
 
 
+@dataclass
+class CombatPage:
+    """
+    What a CombatRound needs from a fight.php page
+    """
+
+    turn: int = 0
+    monster_id: Optional[int] = None
+    monster_name: Optional[str] = None
+    monster_image: Optional[str] = None
+    # The round each event happened in (which only matters for macros) and its text
+    events: List[Tuple[int, str]] = field(default_factory=list)
+    # Source HTML of the combat panel, or None if the page has no panel
+    source: Optional[str] = None
+    # Where the panel starts and ends in the page
+    start: int = 0
+    end: int = 0
+    # Where each macroaction comment in the panel starts in the page
+    macroactions: List[int] = field(default_factory=list)
+
+
 @dataclass
 class CombatRound:
     monster: Monster
@@ -30,7 +52,20 @@ class CombatRound:
     finished: bool
     choice_follows: bool
     fight_follows: bool
-    raw: str
+    # Source HTML of the combat panel, or for a macro the part of it covering this round
+    source: str = field(repr=False)
+    _raw: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def raw(self) -> str:
+        """
+        HTML of the combat panel, without the action interface or the intro, as
+        BeautifulSoup writes it. It is only built the first time it is asked for.
+        """
+        if self._raw is None:
+            self._raw = write_panel(self.source)
+
+        return self._raw
 
 
 class CombatAction(Enum):
@@ -39,9 +74,41 @@ class CombatAction(Enum):
     Skill = "skill"
     RunAway = "runaway"
     PickPocket = "steal"
+    Macro = "macro"
 
 
 turn_pattern = re.compile(r"<script>\s*var onturn = (\d+);\s*</script>")
+monster_id_pattern = re.compile(r"<!-- ?MONSTERID: ?(\d+) ?-->")
+panel_pattern = re.compile(
+    r"<b>Combat!</b>.*?</tr>\s*<tr[^>]*>\s*(?P<td><td[^>]*>)", re.IGNORECASE | re.DOTALL
+)
+token_pattern = re.compile(
+    r"<!--(?P<comment>.*?)-->|"
+    r"<(?P<end>/?)(?P<name>[a-zA-Z][^\s/>]*)(?P<attrs>(?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.DOTALL,
+)
+attribute_pattern = re.compile(
+    r"([^\s=/]+)(?:\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+)))?"
+)
+# Tags that html.parser closes as soon as they open
+void_elements = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+raw_text_elements = {"script", "style"}
+ascii_spaces = "\x20\x0a\x09\x0c\x0d"
 physical_damage_pattern = re.compile(
     r"(?P<prefix>your blood, to the tune of|stabs you for|sown|You lose|You gain|strain your neck|approximately|roughly)?\s*"
     r"#?(?P<damage>\d[\d,]*) (?P<bonus>\([^.]*\) |)(?P<suffix>(?:[^\s]+ ){0,3})"
@@ -54,6 +121,9 @@ elemental_damage_pattern = re.compile(
 bonus_damage_pattern = re.compile(r"\+(?P<damage>[\d,]+)")
 
 
+digit_pattern = re.compile(r"\d")
+
+
 class combat(Request[CombatRound]):
     """
     A request used for a single round of combat. The user may attack, use an item or skill, or
@@ -71,14 +141,20 @@ class combat(Request[CombatRound]):
     :param skill: If the action is CombatAction.Skill, specifies the skill to use
     :param item: If the action is CombatAction.Item, either specifies an item to use, or an array of
                  items to funksling
+    :param macro: If the action is CombatAction.Macro, the macro to play out. The parsed round
+                  then covers every round the macro played; use combat_macro to get them one
+                  by one.
     """
 
+    cpu_bound = True
+
     def __init__(
         self,
         session: "libkol.Session",
         action: CombatAction,
         skill: Optional[Skill] = None,
         item: Union["libkol.Item", List["libkol.Item"]] = None,
+        macro: Union["libkol.CombatMacro", str, None] = None,
     ) -> None:
         super().__init__(session)
 
@@ -86,6 +162,14 @@ class combat(Request[CombatRound]):
 
         params = {"action": action.value}
 
+        if action == CombatAction.Macro:
+            if macro is None or len(str(macro)) == 0:
+                raise InvalidActionError("You must specify a macro to play out")
+
+            data = {**params, "macrotext": str(macro)}
+            self.request = session.request("fight.php", data=data)
+            return
+
         if action == CombatAction.Item:
             if item is None:
                 raise InvalidActionError("You must specify at least one item to use")
@@ -117,6 +201,10 @@ class combat(Request[CombatRound]):
 
         This is entirely modeled on FightRequest.java from KoLmafia
         """
+        # Neither pattern can match without a number
+        if digit_pattern.search(log) is None:
+            return 0
+
         m = None
 
         physical_match = physical_damage_pattern.search(log)
@@ -144,10 +232,88 @@ class combat(Request[CombatRound]):
             ]
         )
 
+    @staticmethod
+    def get_outcome(content: str) -> Tuple[bool, bool, bool]:
+        """
+        Whether the fight is finished, and if so whether a choice or another fight follows
+        """
+        finished = "<!--WINWINWIN-->" in content or "action=fight.php" not in content
+        choice_follows = finished and 'href="choice.php' in content
+        fight_follows = finished and 'href="fight.php' in content
+        return finished, choice_follows, fight_follows
+
+    @staticmethod
+    def get_turn(content: str) -> int:
+        turn_match = turn_pattern.search(content)
+        return int(turn_match.group(1)) if turn_match else 0
+
     @classmethod
-    def parse_event(cls, line: Tag) -> CombatEvent:
-        log = line.get_text()
-        return CombatEvent(log=log, damage=cls.parse_damage(log))
+    def scan(cls, content: str) -> CombatPage:
+        """
+        Pick out everything a CombatRound needs from the page without building a tree. The
+        panel is the cell after the one holding the header. Its tags are nested as
+        html.parser nests them, so that an unclosed paragraph holds everything up to the end
+        of its parent. The events are the paragraphs that start with text or a font tag,
+        outside the intro and the action interface.
+        """
+        page = CombatPage(turn=cls.get_turn(content))
+
+        monster_id = monster_id_pattern.search(content)
+        page.monster_id = int(monster_id.group(1)) if monster_id else None
+
+        panel = panel_pattern.search(content)
+
+        if panel is None:
+            return page
+
+        page.start = panel.start("td")
+        tree = PanelTree(content, panel.end())
+        page.end = tree.end
+        page.source = content[page.start : page.end]
+
+        # Take out the action interface (unless it sits directly in the panel, in which
+        # case the whole panel is kept) and then the first blockquote, which is the intro
+        removed = []  # type: List[int]
+        end = tree.find("a", removed, "name", "end")
+        if end is not None and tree.parents[end] != 0:
+            removed.append(tree.parents[end])
+
+        intro = tree.find("blockquote", removed)
+        if intro is not None:
+            removed.append(intro)
+
+        image = tree.find("img", removed, "id", "monpic")
+        if image is not None:
+            src = tree.attribute(image, "src") or ""
+            page.monster_image = URL(src).parts[-1]
+
+        name = tree.find("span", removed, "id", "monname")
+        if name is not None:
+            page.monster_name = tree.text(name, removed)
+
+        # Macros mark the start of each round they play with a comment
+        macroactions = [
+            (token, offset)
+            for token, offset in tree.comments
+            if tree.tokens[token][1].strip().startswith("macroaction")
+            and not tree.is_removed(token, removed)
+        ]
+        page.macroactions = [offset for _, offset in macroactions]
+
+        for e in tree.elements_named("p"):
+            if tree.is_removed(tree.firsts[e], removed) or not tree.starts_with_text(
+                e, removed
+            ):
+                continue
+
+            round = sum(1 for token, _ in macroactions if token < tree.firsts[e])
+            page.events.append((max(round - 1, 0), tree.text(e, removed)))
+
+        return page
+
+    @classmethod
+    def extract(cls, content: str, url: URL) -> CombatPage:
+        return cls.scan(content)
 
     @classmethod
     async def parser(cls, content: str, **kwargs) -> CombatRound:
@@ -156,52 +322,29 @@ class combat(Request[CombatRound]):
         if "<b>Not in a Fight</b>" in content:
             raise NotFightingError("You are not in a fight")
 
-        turn_match = turn_pattern.search(content)
-        turn = int(turn_match.group(1)) if turn_match else 0
+        page = kwargs.get("extracted") or cls.scan(content)
 
         resource_gain = await parsing.resource_gain(
             content, session=session, combat=True
         )
 
-        panel = parsing.panel(content, "Combat!")
-
-        if panel is None:
+        if page.source is None:
             raise UnknownError("Couldn't parse combat")
 
-        # Remove action interface, just intercase
-        panel.find("a", attrs={"name": "end"}).parent.extract()
-
-        # Intro
-        intro = panel.find("blockquote")
-        if intro:
-            intro.extract()
-
-        # Monster Info
-        monster_info = panel.table.table
-
-        img = monster_info.find("img", id="monpic")
-        image = URL(img["src"]).parts[-1]
-
         monster = await Monster.identify(
-            name=monster_info.find("span", id="monname"), image=image
+            name=page.monster_name or "", image=page.monster_image, id=page.monster_id
         )
 
-        # Events
         events = [
-            cls.parse_event(e)
-            for e in panel.find_all("p")
-            if isinstance(e.contents[0], NavigableString)
-            or e.contents[0].name == "font"
+            CombatEvent(log=log, damage=cls.parse_damage(log)) for _, log in page.events
         ]
 
         damage = sum(e.damage for e in events)
 
-        finished = "<!--WINWINWIN-->" in content or "action=fight.php" not in content
-        choice_follows = finished and 'href="choice.php' in content
-        fight_follows = finished and 'href="fight.php' in content
+        finished, choice_follows, fight_follows = cls.get_outcome(content)
 
         return CombatRound(
-            turn=turn,
+            turn=page.turn,
             monster=monster,
             events=events,
             damage=damage,
@@ -209,5 +352,187 @@ class combat(Request[CombatRound]):
             finished=finished,
             choice_follows=choice_follows,
             fight_follows=fight_follows,
-            raw=str(panel),
+            source=page.source,
         )
+
+
+def write_panel(source: str) -> str:
+    """
+    Write the combat panel, or part of one, out as BeautifulSoup would, without the action
+    interface or the intro
+
+    :param source: Source HTML of the panel
+    """
+    soup = BeautifulSoup(source, "html.parser")
+    panel = soup.contents[0] if len(soup.contents) > 0 else None
+
+    end = soup.find("a", attrs={"name": "end"})
+    if end is not None and end.parent is not soup and end.parent is not panel:
+        end.parent.extract()
+
+    intro = soup.find("blockquote")
+    if intro is not None:
+        intro.extract()
+
+    return str(soup)
+
+
+class PanelTree:
+    """
+    The tags, strings and comments of a combat panel, nested as BeautifulSoup's html.parser
+    tree builder would nest them but kept as a flat list of tokens. Each element covers the
+    tokens from its start tag up to where it was closed.
+
+    :param content: Page the panel is in
+    :param start: Where the panel's contents start, just after its opening td tag
+    """
+
+    def __init__(self, content: str, start: int) -> None:
+        # Kind ("tag", "text" or "comment") and value (element index or string) of each token
+        self.tokens = []  # type: List[Tuple[str, Any]]
+        # The element each token is directly inside
+        self.token_parents = []  # type: List[int]
+        # Each element's name, attributes, parent, first token and the token after its last
+        self.names = ["td"]  # type: List[str]
+        self.attrs = [""]  # type: List[str]
+        self.parents = [-1]  # type: List[int]
+        self.firsts = [0]  # type: List[int]
+        self.lasts = [0]  # type: List[int]
+        # Token index and position in the page of each comment
+        self.comments = []  # type: List[Tuple[int, int]]
+        self.tokens.append(("tag", 0))
+        self.token_parents.append(-1)
+
+        stack = [0]
+        already_closed = []  # type: List[str]
+        position = start
+
+        while len(stack) > 0:
+            m = token_pattern.search(content, position)
+            text_end = len(content) if m is None else m.start()
+
+            if text_end > position:
+                self.add_text(content[position:text_end], stack[-1])
+
+            if m is None:
+                position = len(content)
+                break
+
+            position = m.end()
+
+            if m.group("comment") is not None:
+                self.comments.append((len(self.tokens), m.start()))
+                self.add("comment", m.group("comment"), stack[-1])
+                continue
+
+            name = m.group("name").lower()
+
+            if m.group("end") == "/":
+                if name in already_closed:
+                    # The end of a void element that has already been closed
+                    already_closed.remove(name)
+                    continue
+
+                # An end tag with no matching start tag empties the stack, as in BeautifulSoup
+                while len(stack) > 0:
+                    e = stack.pop()
+                    self.lasts[e] = len(self.tokens)
+                    if self.names[e] == name:
+                        break
+
+                continue
+
+            e = len(self.names)
+            self.names.append(name)
+            self.attrs.append(m.group("attrs"))
+            self.parents.append(stack[-1])
+            self.firsts.append(len(self.tokens))
+            self.lasts.append(len(self.tokens) + 1)
+            self.add("tag", e, stack[-1])
+
+            if m.group("attrs").rstrip().endswith("/"):
+                continue
+
+            if name in void_elements:
+                already_closed.append(name)
+                continue
+
+            if name in raw_text_elements:
+                close = re.compile(f"</{name}", re.IGNORECASE).search(content, position)
+                text_end = len(content) if close is None else close.start()
+                self.add_text(content[position:text_end], e)
+                position = text_end
+                self.lasts[e] = len(self.tokens)
+
+            stack.append(e)
+
+        for e in stack:
+            self.lasts[e] = len(self.tokens)
+
+        self.end = position
+
+    def add(self, kind: str, value: Any, parent: int) -> None:
+        self.tokens.append((kind, value))
+        self.token_parents.append(parent)
+
+    def add_text(self, text: str, parent: int) -> None:
+        text = unescape(text)
+
+        # BeautifulSoup replaces any string of nothing but whitespace
+        if text.strip(ascii_spaces) == "":
+            text = "\n" if "\n" in text else " "
+
+        self.add("text", text, parent)
+
+    def attribute(self, e: int, key: str) -> Optional[str]:
+        for m in attribute_pattern.finditer(self.attrs[e]):
+            if m.group(1).lower() == key:
+                return next((v for v in m.groups()[1:] if v is not None), "")
+
+        return None
+
+    def is_removed(self, token: int, removed: List[int]) -> bool:
+        return any(self.firsts[e] <= token < self.lasts[e] for e in removed)
+
+    def elements_named(self, name: str) -> List[int]:
+        return [e for e, n in enumerate(self.names) if n == name and e != 0]
+
+    def find(
+        self,
+        name: str,
+        removed: List[int],
+        key: Optional[str] = None,
+        value: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        The first element in the panel with the name, and the attribute if one is given
+        """
+        return next(
+            (
+                e
+                for e in self.elements_named(name)
+                if (key is None or self.attribute(e, key) == value)
+                and not self.is_removed(self.firsts[e], removed)
+            ),
+            None,
+        )
+
+    def text(self, e: int, removed: List[int]) -> str:
+        return "".join(
+            self.tokens[i][1]
+            for i in range(self.firsts[e] + 1, self.lasts[e])
+            if self.tokens[i][0] == "text" and not self.is_removed(i, removed)
+        )
+
+    def starts_with_text(self, e: int, removed: List[int]) -> bool:
+        """
+        Whether the element's first child is a string (or comment) or a font tag
+        """
+        for i in range(self.firsts[e] + 1, self.lasts[e]):
+            if self.token_parents[i] != e or self.is_removed(i, removed):
+                continue
+
+            kind, value = self.tokens[i]
+            return kind != "tag" or self.names[value] == "font"
+
+        return False
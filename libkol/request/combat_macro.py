@@ -0,0 +1,105 @@
+from typing import List, Tuple, Union
+from yarl import URL
+
+import libkol
+
+from ..util import parsing
+from ..Error import InvalidActionError, NotFightingError, UnknownError
+from ..Monster import Monster
+from .combat import CombatAction, CombatEvent, CombatPage, CombatRound, combat
+from .request import Request
+
+
+class combat_macro(Request[List[CombatRound]]):
+    """
+    Play out a combat macro server-side. KoL runs as many rounds as the macro asks for (or
+    until the fight is over) in a single request, and the response is split back into one
+    CombatRound per round played.
+
+    :param session: KoL session
+    :param macro: The macro to play out, built with CombatMacro or written by hand
+    """
+
+    cpu_bound = True
+
+    def __init__(
+        self, session: "libkol.Session", macro: Union["libkol.CombatMacro", str]
+    ) -> None:
+        super().__init__(session)
+
+        if len(str(macro)) == 0:
+            raise InvalidActionError("You must specify a macro to play out")
+
+        data = {"action": CombatAction.Macro.value, "macrotext": str(macro)}
+        self.request = session.request("fight.php", data=data)
+
+    @staticmethod
+    def split(content: str, page: CombatPage) -> List[Tuple[int, int]]:
+        """
+        Split a response into where each round played starts and ends. KoL marks the start
+        of each action with a ``macroaction`` comment in the combat panel; anything before
+        the first one belongs to the first round and anything after the last to the last.
+        """
+        bounds = [0] + page.macroactions[1:] + [len(content)]
+        return list(zip(bounds, bounds[1:]))
+
+    @classmethod
+    def extract(cls, content: str, url: URL) -> CombatPage:
+        return combat.scan(content)
+
+    @classmethod
+    async def parser(cls, content: str, **kwargs) -> List[CombatRound]:
+        session = kwargs["session"]  # type: "libkol.Session"
+
+        if "<b>Not in a Fight</b>" in content:
+            raise NotFightingError("You are not in a fight")
+
+        page = kwargs.get("extracted") or combat.scan(content)
+
+        if page.source is None:
+            raise UnknownError("Couldn't parse combat")
+
+        sections = cls.split(content, page)
+
+        # Resource gains are counted round by round, which keeps the state up to date in
+        # the same way as sending each round separately
+        resource_gains = [
+            await parsing.resource_gain(content[a:b], session=session)
+            for a, b in sections
+        ]
+
+        # Apart from the adventure the fight costs, which depends on how the whole fight
+        # went, as the free fight and win markers may be in different rounds
+        cost = parsing.fight_cost(content)
+        resource_gains[-1].adventures -= cost
+        session.state.adventures -= cost
+
+        monster = await Monster.identify(
+            name=page.monster_name or "", image=page.monster_image, id=page.monster_id
+        )
+
+        events = [[] for _ in sections]  # type: List[List[CombatEvent]]
+
+        for round, log in page.events:
+            events[min(round, len(sections) - 1)].append(
+                CombatEvent(log=log, damage=combat.parse_damage(log))
+            )
+
+        last_turn = page.turn
+        finished, choice_follows, fight_follows = combat.get_outcome(content)
+        last = len(sections) - 1
+
+        return [
+            CombatRound(
+                turn=max(last_turn - (last - i), 0),
+                monster=monster,
+                events=events[i],
+                damage=sum(e.damage for e in events[i]),
+                resource_gain=resource_gains[i],
+                finished=finished and i == last,
+                choice_follows=choice_follows and i == last,
+                fight_follows=fight_follows and i == last,
+                source=content[max(a, page.start) : min(b, page.end)],
+            )
+            for i, (a, b) in enumerate(sections)
+        ]
@@ -35,6 +35,8 @@ class craft(Request[Response]):
         quantity: int = 1,
         max: bool = False,
     ) -> None:
+        super().__init__(session)
+
         params = {
             "action": "craft",
             "mode": mode,
@@ -20,6 +20,8 @@ class curse(Request[bool]):
     def __init__(
         self, session: "libkol.Session", player: Union[str, int], item: "libkol.Item"
     ) -> None:
+        super().__init__(session)
+
         params = {"action": "use", "whichitem": item.id, "targetplayer": player}
 
         self.request = session.request("curse.php", pwd=True, params=params)
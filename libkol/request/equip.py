@@ -1,10 +1,10 @@
-from bs4 import BeautifulSoup
 from yarl import URL
 
 import libkol
 
 from ..Error import ItemNotFoundError, WrongKindOfItemError, RequirementError
 from .request import Request
+from ..util import parsing
 
 
 class equip(Request):
@@ -45,7 +45,7 @@ class equip(Request):
         if "You must have at least" in content:
             raise RequirementError("Inadequate stats or level")
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
         session = kwargs["session"]  # type: libkol.Session
         url = kwargs["url"]  # type: URL
 
@@ -61,7 +61,7 @@ class equip(Request):
             unequipped = first
             equipped_onclick = items[0]["onclick"]
             equipped = await Item[int(equipped_onclick[9 : equipped_onclick.find(",")])]
-            session.state.inventory[unequipped] += 1
+            session.state.add_item(unequipped)
 
         query_slot = url.query.get("slot")
         slot = (
@@ -69,6 +69,7 @@ class equip(Request):
             if query_slot is not None
             else equipped.slot
         )
-        session.state.equipment[slot] = equipped
+        session.state.add_item(equipped, -1)
+        session.state.equip(slot, equipped)
 
         return True
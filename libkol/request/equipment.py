@@ -1,10 +1,11 @@
 from typing import Dict, Optional
 from dataclasses import dataclass
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 
 import libkol
 
 from .request import Request
+from ..util import parsing
 
 
 class equipment(Request):
@@ -46,7 +47,7 @@ class equipment(Request):
 
         session = kwargs["session"]  # type: libkol.Session
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
         current = soup.find(id="curequip")
 
         eq = {
@@ -62,5 +63,5 @@ class equipment(Request):
             Slot.FamiliarEquipment: (await cls.slot_to_item(current, "Familiar")),
         }
 
-        session.state.equipment = eq
+        session.state.set_equipment(eq)
         return eq
@@ -1,6 +1,6 @@
 from typing import List
 import re
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 
 import libkol
 
@@ -45,7 +45,7 @@ class familiar(Request):
 
     @classmethod
     async def parser(cls, content: str, **kwargs) -> List["libkol.types.FamiliarState"]:
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         familiar_states = []  # type: List["libkol.types.FamiliarState"]
 
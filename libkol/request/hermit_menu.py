@@ -1,22 +1,24 @@
 from typing import List
 
-from bs4 import BeautifulSoup
 
 import libkol
 
 from .request import Request
+from ..util import parsing
 
 
 class hermit_menu(Request):
     def __init__(self, session: "libkol.Session") -> None:
-        self.request = session.request("hermit.php")
+        super().__init__(session)
+
+        self.request = session.request("hermit.php", cache=type(self))
 
     @staticmethod
     async def parser(content: str, **kwargs) -> List["libkol.types.ItemQuantity"]:
         from libkol import Item
         from libkol.types import ItemQuantity
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         menu = []  # type: List[libkol.types.ItemQuantity]
         for item_image in soup.find_all("img", class_="hand"):
@@ -11,6 +11,8 @@ class hermit_trade(Request):
     def __init__(
         self, session: "libkol.Session", item: "libkol.Item", quantity: int = 1
     ) -> None:
+        super().__init__(session)
+
         data = {"action": "trade", "quantity": quantity, "whichitem": item.id}
         self.request = session.request("hermit.php", data=data)
 
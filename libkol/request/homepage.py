@@ -1,11 +1,11 @@
 from typing import NamedTuple, Optional
 
-from bs4 import BeautifulSoup
 from yarl import URL
 
 import libkol
 
 from .request import Request
+from ..util import parsing
 
 
 class Response(NamedTuple):
@@ -34,7 +34,7 @@ class homepage(Request[Response]):
     async def parser(content: str, **kwargs) -> Response:
         url = kwargs["url"]  # type: URL
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         challenge_input = soup.find("input", attrs={"name": "challenge"})
         challenge = str(challenge_input["value"]) if challenge_input else None
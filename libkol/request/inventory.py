@@ -1,5 +1,4 @@
 from typing import Any, Dict
-from collections import defaultdict
 
 import libkol
 
@@ -13,17 +12,22 @@ class inventory(Request[Dict["libkol.Item", int]]):
     Get a list of items in the user's inventory.
     """
 
+    coalesce = True
+
     def __init__(self, session: "libkol.Session") -> None:
         super().__init__(session)
         data = {"for": session.user_agent, "what": "inventory"}
 
-        self.request = session.request("api.php", json=True, data=data)
+        self.request = session.request(
+            "api.php", json=True, data=data, coalesce=self.coalesce
+        )
 
     @staticmethod
     async def parser(content: Dict[str, Any], **kwargs) -> Dict["libkol.Item", int]:
         from libkol import Item
 
         session = kwargs["session"]  # type: "libkol.Session"
-        inv = {await Item[int(id)]: int(quantity) for id, quantity in content.items()}
-        session.state.inventory = defaultdict(int, inv)
+        items = await Item.resolve_many(ids=[int(id) for id in content.keys()])
+        inv = {item: int(quantity) for item, quantity in zip(items, content.values())}
+        session.state.set_inventory(inv)
         return inv
@@ -1,7 +1,8 @@
-from bs4 import BeautifulSoup, Comment
+from bs4 import Comment
 from yarl import URL
 from typing import Optional, List
 
+from ..Error import ItemNotFoundError
 from ..util import parsing
 from .request import Request
 
@@ -11,18 +12,27 @@ class item_description(Request):
     Gets the description of an item and then parses various information from the response.
     """
 
+    cache_ttl = 7 * 24 * 60 * 60
+    coalesce = True
+
     def __init__(self, session, descid):
         super().__init__(session)
 
         params = {"whichitem": descid}
 
-        self.request = session.request("desc_item.php", params=params)
+        self.request = session.request(
+            "desc_item.php", params=params, coalesce=self.coalesce, cache=type(self)
+        )
 
     @staticmethod
     async def parser(content: str, **kwargs):
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         container = soup.find(id="description")
+
+        if container is None or container.blockquote is None:
+            raise ItemNotFoundError("Item description not found")
+
         main = container.blockquote
         lines = parsing.split_by_br(container.blockquote)
 
@@ -5,5 +5,7 @@ from .request import Request
 
 class item_discard(Request):
     def __init__(self, session: "libkol.Session", item: "libkol.Item") -> None:
+        super().__init__(session)
+
         params = {"action": "discard", "whichitem": item.id}
         self.request = session.request("inventory.php", params=params)
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 
 import libkol
 
+from ..Error import ItemNotFoundError
 from .request import Request
 
 
@@ -33,16 +34,24 @@ class item_information(Request[Response]):
     Get information about a particular item.
     """
 
+    cache_ttl = 7 * 24 * 60 * 60
+
     returns_json = True
+    coalesce = True
 
     def __init__(self, session: "libkol.Session", item_id) -> None:
         super().__init__(session)
 
         data = {"what": "item", "id": item_id, "for": session.user_agent}
-        self.request = session.request("api.php", json=True, data=data)
+        self.request = session.request(
+            "api.php", json=True, data=data, coalesce=self.coalesce, cache=type(self)
+        )
 
     @staticmethod
     async def parser(content: Dict[str, Any], **kwargs) -> Response:
+        if not isinstance(content, dict) or "descid" not in content:
+            raise ItemNotFoundError("Item information not found")
+
         return Response(
             descid=int(content["descid"]),
             name=content["name"],
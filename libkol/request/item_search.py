@@ -1,9 +1,9 @@
 from enum import Enum
 from typing import List, Union
-from bs4 import BeautifulSoup
 import libkol
 
 from .request import Request
+from ..util import parsing
 
 
 class Category(Enum):
@@ -90,6 +90,8 @@ class item_search(Request[List["libkol.Item"]]):
                   of results is to be returned first.
     """
 
+    coalesce = True
+
     def __init__(
         self,
         session: "libkol.Session",
@@ -133,15 +135,21 @@ class item_search(Request[List["libkol.Item"]]):
                     1 if tier in tiers else 0
                 )
 
-        self.request = session.request("mall.php", params=params)
+        self.request = session.request(
+            "mall.php", params=params, coalesce=self.coalesce
+        )
 
     @staticmethod
     async def parser(content: str, **kwargs) -> List["libkol.Item"]:
         from libkol import Item
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
-        return [
-            await Item.get_or_discover(id=int(str(item["id"])[5:]))
-            for item in soup.find_all("tr", id=lambda i: i and i.startswith("item_"))
-        ]
+        return await Item.resolve_many(
+            ids=[
+                int(str(item["id"])[5:])
+                for item in soup.find_all(
+                    "tr", id=lambda i: i and i.startswith("item_")
+                )
+            ]
+        )
@@ -42,7 +42,7 @@ class item_use(Request[Union[Choice, Tuple[str, parsing.ResourceGain]]]):
             return await choice.parser(content, **kwargs)
 
         used = await Item[int(url.query["whichitem"])]
-        session.state.inventory[used] -= 1
+        session.state.add_item(used, -1)
 
         result = str(parsing.panel(content))
 
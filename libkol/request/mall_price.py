@@ -1,6 +1,5 @@
 from typing import List
 
-from bs4 import BeautifulSoup
 from dataclasses import dataclass
 
 import libkol
@@ -27,17 +26,21 @@ class mall_price(Request[Response]):
     :param item: Item for which to get prices
     """
 
+    coalesce = True
+
     def __init__(self, session: "libkol.Session", item: "libkol.Item") -> None:
         super().__init__(session)
 
         data = {"action": "prices", "iid": item.id}
-        self.request = session.request("backoffice.php", data=data, pwd=True)
+        self.request = session.request(
+            "backoffice.php", data=data, pwd=True, coalesce=self.coalesce
+        )
 
     @staticmethod
     async def parser(content: str, **kwargs) -> Response:
         from libkol.types import Listing
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         unlimited = soup.find("td", text="unlimited:")
         limited = soup.find("td", text="limited:")
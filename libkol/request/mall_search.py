@@ -1,7 +1,8 @@
+import re
 from enum import Enum
-from typing import List, Union
+from html import unescape
+from typing import List, NamedTuple, Optional, Union
 
-from bs4 import BeautifulSoup
 from yarl import URL
 
 import libkol
@@ -68,6 +69,24 @@ sortable_categories = [
 ]
 
 
+stock_row_pattern = re.compile(
+    r'<tr class="(?P<class>[^"]*)" id="stock_[0-9_]+"><td[^>]*>[^<]*</td>'
+    r'<td class="small store"><a [^>]*href="mallstore\.php\?whichstore=(?P<store_id>[0-9]+)'
+    r'&searchitem=(?P<item_id>[0-9]+)&searchprice=(?P<price>[0-9]+)"><b>(?P<store_name>[^<]*)</b></a>'
+    r'[^<]*</td><td class="small stock">(?P<stock>[0-9,]+)</td><td class="small">(?P<limit>[^<]*)</td>'
+)
+
+
+class StockRow(NamedTuple):
+    item_id: int
+    price: int
+    store_id: int
+    store_name: Optional[str]
+    stock: int
+    limit: int
+    limit_reached: bool
+
+
 class mall_search(Request[List["libkol.types.Listing"]]):
     """
     Searches for an item at the mall
@@ -101,6 +120,9 @@ class mall_search(Request[List["libkol.types.Listing"]]):
                   of results is to be returned first.
     """
 
+    cpu_bound = True
+    coalesce = True
+
     def __init__(
         self,
         session: "libkol.Session",
@@ -152,43 +174,96 @@ class mall_search(Request[List["libkol.types.Listing"]]):
                     1 if tier in tiers else 0
                 )
 
-        self.request = session.request("mall.php", params=params)
+        self.request = session.request(
+            "mall.php", params=params, coalesce=self.coalesce
+        )
 
     @staticmethod
-    async def parser(content: str, **kwargs) -> List["libkol.types.Listing"]:
+    def parse_limit(limit: str) -> int:
+        return (
+            0 if limit == "\xa0" else int(limit.replace("\xa0", "").replace("/day", ""))
+        )
+
+    @classmethod
+    def parse_rows_soup(cls, content: str) -> List[StockRow]:
+        """
+        Extract the listings from a mall search by walking a BeautifulSoup tree
+        """
+        soup = parsing.soup(content)
+
+        return [
+            StockRow(
+                item_id=int(url.query["searchitem"]),
+                price=int(url.query["searchprice"]),
+                store_id=int(url.query["whichstore"]),
+                store_name=row.contents[1].a.string,
+                stock=parsing.to_int(row.contents[2].string),
+                limit=cls.parse_limit(row.contents[3].string),
+                limit_reached="limited" in row["class"],
+            )
+            for row, url in (
+                (row, URL(row.contents[1].a["href"]))
+                for row in soup.find_all(
+                    "tr", id=lambda i: i and i.startswith("stock_")
+                )
+            )
+        ]
+
+    @classmethod
+    def extract(cls, content: str, url: URL) -> List[StockRow]:
+        return cls.parse_rows(content)
+
+    @classmethod
+    def parse_rows(cls, content: str) -> List[StockRow]:
+        """
+        Extract the listings from a mall search with a single regular expression, without
+        building a tree. If the markup doesn't match what we expect, fall back to the tree.
+        """
+        rows = [
+            StockRow(
+                item_id=int(m.group("item_id")),
+                price=int(m.group("price")),
+                store_id=int(m.group("store_id")),
+                store_name=unescape(m.group("store_name")),
+                stock=parsing.to_int(m.group("stock")),
+                limit=cls.parse_limit(unescape(m.group("limit"))),
+                limit_reached="limited" in m.group("class").split(),
+            )
+            for m in stock_row_pattern.finditer(content)
+        ]
+
+        if len(rows) != content.count('id="stock_'):
+            return cls.parse_rows_soup(content)
+
+        return rows
+
+    @classmethod
+    async def parser(cls, content: str, **kwargs) -> List["libkol.types.Listing"]:
         from libkol import Item
         from libkol.types import Listing
 
         include_limit_reached = kwargs.get("include_limit_reached", False)
 
-        soup = BeautifulSoup(content, "html.parser")
-        rows = soup.find_all("tr", id=lambda i: i and i.startswith("stock_"))
+        extracted = kwargs.get("extracted")
+        rows = [
+            r
+            for r in (extracted if extracted is not None else cls.parse_rows(content))
+            if include_limit_reached or r.limit_reached is False
+        ]
+
+        items = await Item.resolve_many(ids=[r.item_id for r in rows])
 
         return [
             Listing(
-                item=await Item.get_or_discover(id=int(url.query["searchitem"])),
-                price=int(url.query["searchprice"]),
-                store_id=int(url.query["whichstore"]),
-                store_name=store_name,
-                stock=parsing.to_int(stock),
-                limit=(
-                    0
-                    if limit == "\xa0"
-                    else int(limit.replace("\xa0", "").replace("/day", ""))
-                ),
-                limit_reached=limit_reached,
-            )
-            for url, store_name, stock, limit, limit_reached in (
-                (
-                    URL(row.contents[1].a["href"]),
-                    row.contents[1].a.string,
-                    row.contents[2].string,
-                    row.contents[3].string,
-                    "limited" in row["class"],
-                )
-                for row in rows
+                item=item,
+                price=r.price,
+                store_id=r.store_id,
+                store_name=r.store_name,
+                stock=r.stock,
+                limit=r.limit,
+                limit_reached=r.limit_reached,
             )
-            if include_limit_reached or limit_reached is False
+            for item, r in zip(items, rows)
         ]
 
 
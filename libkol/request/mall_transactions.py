@@ -2,7 +2,6 @@ import re
 from datetime import datetime
 from typing import List, NamedTuple
 
-from bs4 import BeautifulSoup
 from yarl import URL
 
 import libkol
@@ -40,7 +39,7 @@ class mall_transactions(Request):
     async def parser(content: str, **kwargs) -> List[Transaction]:
         from libkol import Item
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         container = soup.find("span", class_="small")
 
@@ -1,7 +1,6 @@
 from enum import Enum
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
-from bs4 import BeautifulSoup
 
 import libkol
 
@@ -54,7 +53,7 @@ class mining(Request[Response]):
 
     @staticmethod
     def parse_mine(content: str) -> List[List[MiningSpotType]]:
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         m = [[MiningSpotType.Open] * 6 for i in range(6)]
 
@@ -35,6 +35,8 @@ class npc_buy(Request):
         item: "libkol.Item",
         quantity: int = 1,
     ) -> None:
+        super().__init__(session)
+
         if item.store_id != store.id:
             raise WrongKindOfItemError("This item cannot be purchased in that store")
 
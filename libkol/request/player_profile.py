@@ -1,7 +1,6 @@
 import re
 from typing import List, Optional, Tuple
 from dataclasses import dataclass
-from bs4 import BeautifulSoup
 
 import libkol
 
@@ -30,10 +29,15 @@ class Profile:
 
 
 class player_profile(Request[Profile]):
+    cache_ttl = 60 * 60
+    coalesce = True
+
     def __init__(self, session: "libkol.Session", player_id: int) -> None:
         super().__init__(session)
         payload = {"who": player_id}
-        self.request = session.request("showplayer.php", data=payload)
+        self.request = session.request(
+            "showplayer.php", data=payload, coalesce=self.coalesce, cache=type(self)
+        )
 
     @staticmethod
     async def parser(content: str, **kwargs) -> Profile:
@@ -44,7 +48,7 @@ class player_profile(Request[Profile]):
         if user_match is None:
             raise UnknownError("Cannot match username")
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         # Ascensions
         ascensions_cell = parsing.get_value(soup, "Ascensions")
@@ -2,13 +2,13 @@ from enum import Enum
 from typing import List, Optional
 from dataclasses import dataclass
 
-from bs4 import BeautifulSoup
 from yarl import URL
 
 import libkol
 
 from ..Error import UnknownError
 from .request import Request
+from ..util import parsing
 
 
 class QueryType(Enum):
@@ -29,6 +29,8 @@ class Player:
 
 
 class player_search(Request[List[Player]]):
+    coalesce = True
+
     def __init__(
         self,
         session: "libkol.Session",
@@ -57,11 +59,13 @@ class player_search(Request[List[Player]]):
         if pvp_only:
             data["pvponly"] = 1
 
-        self.request = session.request("searchplayer.php", data=data)
+        self.request = session.request(
+            "searchplayer.php", data=data, coalesce=self.coalesce
+        )
 
     @staticmethod
     async def parser(content: str, **kwargs) -> List[Player]:
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         table = soup.find("table")
 
@@ -11,6 +11,8 @@ class pulverize(Request):
     def __init__(
         self, session: "libkol.Session", item: "libkol.Item", quantity: int = 1
     ) -> None:
+        super().__init__(session)
+
         params = {
             "action": "pulverize",
             "mode": "smith",
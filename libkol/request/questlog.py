@@ -31,8 +31,10 @@ class questlog(Request):
     def __init__(
         self, session: "libkol.Session", page: QuestPage = QuestPage.Current
     ) -> None:
+        super().__init__(session)
+
         params = {"which": page.value}
-        self.request = session.request("questlog.php", params=params)
+        self.request = session.request("questlog.php", params=params, cache=type(self))
 
     @staticmethod
     async def parser(content: str, **kwargs) -> Dict[str, str]:
@@ -1,4 +1,4 @@
-from typing import Any, Coroutine, Dict, Generic, Optional, TypeVar
+from typing import Any, Coroutine, Dict, Generic, Hashable, Optional, TypeVar
 from yarl import URL
 from time import time
 import re
@@ -9,17 +9,48 @@ from aiohttp import ClientResponse
 import libkol
 from libkol.Error import UnknownError, InCombatError
 
+# Use a faster JSON decoder where one is installed
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 ParserReturn = TypeVar("ParserReturn")
 
 
 js_redirect = re.compile(r"<script type=\"text\/javascript\">top.mainpane.document.location = \"(?P<url>.*?)\";<\/script>")
 
+def freeze(value: Any) -> Hashable:
+    """
+    Turn the arguments of a request into something that can be used as a dictionary key
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+
+    return value
+
+
 class Request(Generic[ParserReturn]):
     session: "libkol.Session"
     request: Coroutine[Any, Any, ClientResponse]
     response: Optional[ClientResponse] = None
     returns_json: bool = False
 
+    # Whether the request is idempotent, so that identical ones in flight at the same time
+    # may share a response (which it passes to ``Session.request``) and a parsed result
+    coalesce: bool = False
+
+    # Seconds a ResponseCache may keep the response for, if the request passes ``cache``
+    cache_ttl: Optional[float] = None
+
+    # Set by parsers that spend a long time working through the page. They do that work in
+    # ``extract``, which the Session may run in its parse executor, and ``parser`` receives
+    # the result as ``extracted`` to finish off (e.g. with database lookups) on the loop
+    cpu_bound: bool = False
+
     fight: bool = False
 
     def __init__(self, session: "libkol.Session"):
@@ -36,13 +67,34 @@ class Request(Generic[ParserReturn]):
     async def json(self) -> Dict[str, Any]:
         response = self.response or await self.run()
 
-        return await response.json(content_type=None)
+        return await response.json(content_type=None, loads=json_loads)
+
+    @classmethod
+    def extract(cls, content: Any, url: URL) -> Any:
+        """
+        The CPU-heavy part of parsing a response, for requests that are ``cpu_bound``. This may
+        run in another thread or process, so it must not touch the session or the database
+        and it must return something that can be pickled.
+        """
+        return None
 
     @staticmethod
     async def parser(content, **kwargs) -> ParserReturn:
         return content
 
     async def parse(self, **kwargs) -> ParserReturn:
+        if not self.coalesce:
+            return await self.parse_response(**kwargs)
+
+        response = self.response or await self.run()
+
+        # Coalesced requests share a response, so they can share the parsed result too
+        key = ("parse", type(self), response, freeze(kwargs))
+        return await self.session.single_flight(
+            key, lambda: self.parse_response(**kwargs)
+        )
+
+    async def parse_response(self, **kwargs) -> ParserReturn:
         content = await self.json() if self.returns_json else await self.text()
 
         assert self.response is not None
@@ -65,6 +117,11 @@ class Request(Generic[ParserReturn]):
                 raise InCombatError("Player is currently in combat")
 
         try:
+            if self.cpu_bound:
+                kwargs["extracted"] = await self.session.run_cpu_bound(
+                    type(self).extract, content, url
+                )
+
             return await self.parser(content, url=url, session=self.session, **kwargs)
         except (TypeError, UnknownError) as e:
             package = {
@@ -76,3 +133,6 @@ class Request(Generic[ParserReturn]):
                 json.dump(package, log)
 
             raise e
+        finally:
+            # The parser may have changed the state, so expressions must take a new snapshot
+            self.session.state.evaluation_context = None
@@ -1,11 +1,11 @@
 import asyncio
 from typing import List
-from bs4 import BeautifulSoup
 
 import libkol
 
 from ..Skill import Skill
 from .request import Request
+from ..util import parsing
 
 
 class skills(Request[List[Skill]]):
@@ -19,10 +19,10 @@ class skills(Request[List[Skill]]):
     async def parser(content: str, **kwargs) -> List[Skill]:
         session = kwargs["session"]  # type: "libkol.Session"
 
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         tasks = [Skill[int(box["rel"])] for box in soup.find_all("div", class_="skill")]
         knowledge = await asyncio.gather(*tasks)
 
-        session.state.skills = knowledge
+        session.state.set_skills(knowledge)
         return knowledge
@@ -1,32 +1,97 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import libkol
 
+from ..CharacterClass import CharacterClass
+from ..Slot import Slot
 from .request import Request
 
+# api.php names a few equipment slots differently to the equipment page
+equipment_slots = {"container": Slot.Back, "familiarequip": Slot.FamiliarEquipment}
+
 
 class status(Request[bool]):
     returns_json = True
+    coalesce = True
 
     def __init__(self, session: "libkol.Session") -> None:
         """
-        Fetch status from KoL API
+        Fetch status from KoL API. This fills in as much of the state as the API exposes.
         """
         super().__init__(session)
         payload = {"for": session.user_agent, "what": "status"}
-        self.request = session.request("api.php", json=True, data=payload)
+        self.request = session.request(
+            "api.php", json=True, data=payload, coalesce=self.coalesce
+        )
 
     @staticmethod
-    async def parser(content: Dict[str, Any], **kwargs) -> bool:
+    def get_slot(key: str) -> Optional[Slot]:
+        if key in equipment_slots:
+            return equipment_slots[key]
+
+        try:
+            return Slot(key)
+        except ValueError:
+            return None
+
+    @classmethod
+    async def parser(cls, content: Dict[str, Any], **kwargs) -> bool:
+        from libkol import Familiar, Item, Stat
+
         session = kwargs["session"]  # type: "libkol.Session"
+        state = session.state
+
+        state.pwd = content["pwd"]
+        state.username = content["name"]
+        state.user_id = int(content["playerid"])
+        state.rollover = int(content["rollover"])
+        state.inebriety = int(content["drunk"])
+        state.fullness = int(content["full"])
+        state.spleenhit = int(content["spleen"])
+        state.fury = int(content.get("fury", 0))
+
+        state.level = int(content["level"])
+        # Keep the class we had if libkol doesn't know this one
+        state.character_class = (
+            CharacterClass.from_id(int(content["class"])) or state.character_class
+        )
+        state.current_hp = int(content["hp"])
+        state.max_hp = int(content["maxhp"])
+        state.current_mp = int(content["mp"])
+        state.max_mp = int(content["maxmp"])
+        state.meat = int(content["meat"])
+        state.adventures = int(content["adventures"])
+        state.ascensions = int(content["ascensions"])
+
+        for stat, key in (
+            (Stat.Muscle, "muscle"),
+            (Stat.Mysticality, "mysticality"),
+            (Stat.Moxie, "moxie"),
+        ):
+            state.stats[stat].from_tuple(
+                (int(content[key]), int(content["base" + key]))
+            )
+
+        # PHP encodes an empty dictionary as an empty list
+        effects = content.get("effects") or {}
+        state.set_effects(
+            {e[0]: int(e[1]) for e in effects.values()},
+            {e[0]: int(e[4]) for e in effects.values() if len(e) > 4},
+        )
+
+        equipment = {}  # type: Dict[Slot, int]
+        for key, id in (content.get("equipment") or {}).items():
+            slot = cls.get_slot(key)
+            if slot is not None and int(id) > 0:
+                equipment[slot] = int(id)
+
+        items = await Item.resolve_many(ids=list(equipment.values()))
+        worn = dict(zip(equipment.keys(), items))
+        state.set_equipment({slot: worn.get(slot) for slot in Slot})
 
-        session.state.pwd = content["pwd"]
-        session.state.username = content["name"]
-        session.state.user_id = int(content["playerid"])
-        session.state.rollover = int(content["rollover"])
-        session.state.inebriety = int(content["drunk"])
-        session.state.fullness = int(content["full"])
-        session.state.spleenhit = int(content["spleen"])
-        session.state.fury = int(content.get("fury", 0))
+        familiar_id = int(content.get("familiar", 0))
+        state.familiar = (
+            await Familiar.filter(id=familiar_id).first() if familiar_id > 0 else None
+        )
 
         return True
@@ -35,14 +35,17 @@ class store_inventory(Request):
         """
         from libkol import Item
 
+        matches = list(store_inventory_pattern.finditer(content))
+        items = await Item.resolve_many(ids=[int(m.group(7)) for m in matches])
+
         return [
             Listing(
-                item=await Item.get_or_discover(id=int(match.group(7))),
+                item=item,
                 order=int(match.group(2)),
                 quantity=int(match.group(5)),
                 price=int(match.group(8)),
                 limit=int(match.group(10)),
                 cheapest=int(match.group(12)),
             )
-            for match in store_inventory_pattern.finditer(content)
+            for item, match in zip(items, matches)
         ]
@@ -12,6 +12,8 @@ price_not_updated_pattern = PatternManager.getOrCompilePattern("mallPriceNotUpda
 
 class store_item_update(Request[bool]):
     def __init__(self, session: "libkol.Session", listings: List[Listing]) -> None:
+        super().__init__(session)
+
         params = {"action": "updateinv", "ajax": 1, "_": int(time.time() * 1000)}
 
         for listing in listings:
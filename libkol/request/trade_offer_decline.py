@@ -8,6 +8,8 @@ from .request import Request
 
 class trade_offer_decline(Request[bool]):
     def __init__(self, session: "libkol.Session", trade_id: int) -> None:
+        super().__init__(session)
+
         params = {"action": "decline", "whichoffer": trade_id}
         self.request = session.request("makeoffer.php", pwd=True, params=params)
 
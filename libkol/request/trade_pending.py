@@ -63,6 +63,8 @@ class Trade(NamedTuple):
 
 class trade_pending(Request[List[Trade]]):
     def __init__(self, session: "libkol.Session") -> None:
+        super().__init__(session)
+
         self.request = session.request("makeoffer.php")
 
     @staticmethod
@@ -73,16 +75,14 @@ class trade_pending(Request[List[Trade]]):
         if content is None:
             return []
 
+        matches = list(item_pattern.finditer(content))
+        items = await Item.resolve_many(
+            desc_ids=[int(i.group("itemdescid")) for i in matches]
+        )
+
         return [
-            ItemQuantity(item, quantity)
-            for item, quantity in (
-                (
-                    (await Item.get_or_discover(desc_id=int(i.group("itemdescid")))),
-                    int(i.group("quantity")),
-                )
-                for i in item_pattern.finditer(content)
-            )
-            if item is not None
+            ItemQuantity(item, int(i.group("quantity")))
+            for item, i in zip(items, matches)
         ]
 
     @classmethod
@@ -23,6 +23,8 @@ class trade_propose(Request[bool]):
         meat: int = 0,
         message: str = "",
     ) -> None:
+        super().__init__(session)
+
         params = {
             "action": "proposeoffer",
             "towho": user_id,
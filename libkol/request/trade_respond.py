@@ -16,6 +16,8 @@ class trade_respond(Request[bool]):
         meat: int = 0,
         message: str = "",
     ) -> None:
+        super().__init__(session)
+
         params = {
             "action": "counter",
             "whichoffer": trade_id,
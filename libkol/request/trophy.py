@@ -1,9 +1,9 @@
 import libkol
-from bs4 import BeautifulSoup
 from typing import List
 
 from ..Trophy import Trophy
 from .request import Request
+from ..util import parsing
 
 
 class trophy(Request[List[Trophy]]):
@@ -14,7 +14,7 @@ class trophy(Request[List[Trophy]]):
 
     @staticmethod
     async def parser(content: str, **kwargs) -> List[Trophy]:
-        soup = BeautifulSoup(content, "html.parser")
+        soup = parsing.soup(content)
 
         ids = [
             trophy["value"]
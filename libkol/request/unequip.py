@@ -1,9 +1,9 @@
-from bs4 import BeautifulSoup
 from yarl import URL
 from typing import List
 import libkol
 
 from .request import Request
+from ..util import parsing
 
 
 class unequip(Request):
@@ -37,9 +37,13 @@ class unequip(Request):
             return []
 
         if "All items unequipped." in content:
-            unequipped = session.state.equipment
+            unequipped = {
+                slot: item
+                for slot, item in session.state.equipment.items()
+                if item is not None
+            }
         else:
-            soup = BeautifulSoup(content, "html.parser")
+            soup = parsing.soup(content)
             img = soup.find("img", class_="hand")
 
             item = await Item[int(img["onclick"][9:-1])]
@@ -47,7 +51,7 @@ class unequip(Request):
             unequipped = {slot: item}
 
         for slot, item in unequipped.items():
-            session.state.equipment[slot] = None
-            session.state.inventory[item] += 1
+            session.state.equip(slot, None)
+            session.state.add_item(item)
 
         return unequipped.values()
@@ -0,0 +1,125 @@
+from typing import Any, Callable, Iterable, List, Set, Tuple
+
+
+class IdentityMap:
+    """
+    Process-wide identity map for a model, so that each row is only loaded from the database
+    once and every lookup shares one object. Mix it into a model ahead of ``Model`` and name
+    the fields to index in ``index_fields``, primary key first. Each gets a ``_by_<field>``
+    dict of its own on the model.
+    """
+
+    index_fields = ("id",)  # type: Tuple[str, ...]
+
+    # Keys as (field, value) that are not in the database, so that they are not looked up again
+    _unknown = set()  # type: Set[Tuple[str, Any]]
+
+    # Whether the map holds everything in the database, so that a miss is a miss
+    _preloaded = False
+
+    # Called whenever the map is cleared
+    _clear_hooks = []  # type: List[Callable[[], None]]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore
+
+        for field in cls.index_fields:
+            setattr(cls, f"_by_{field}", {})
+
+        cls._unknown = set()
+        cls._preloaded = False
+        cls._clear_hooks = []
+
+    @classmethod
+    def cache(cls, instance):
+        """
+        Add an instance to the identity map. If one with the same primary key is already known,
+        that instance is returned instead. An instance without a primary key is not in the
+        database yet, so it can only be found by its other fields.
+
+        :param instance: Instance to add to the identity map
+        """
+        primary, *others = cls.index_fields
+        key = getattr(instance, primary)
+
+        if key is None:
+            for field in others:
+                existing = getattr(cls, f"_by_{field}").get(getattr(instance, field))
+
+                if existing is not None:
+                    return existing
+        else:
+            index = getattr(cls, f"_by_{primary}")
+            existing = index.get(key)
+
+            if existing is not None:
+                return existing
+
+            index[key] = instance
+
+        for field in others:
+            getattr(cls, f"_by_{field}").setdefault(getattr(instance, field), instance)
+
+        return instance
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """
+        Empty the identity map, for example after switching to a different database
+        """
+        for field in cls.index_fields:
+            getattr(cls, f"_by_{field}").clear()
+
+        cls._unknown.clear()
+        cls._preloaded = False
+
+        for hook in cls._clear_hooks:
+            hook()
+
+    @classmethod
+    def on_clear(cls, hook: Callable[[], None]) -> None:
+        """
+        Call a function whenever the identity map is cleared, for example to drop anything
+        else holding instances from the old one
+
+        :param hook: Function to call
+        """
+        cls._clear_hooks.append(hook)
+
+    @classmethod
+    async def preload(cls) -> int:
+        """
+        Fill the identity map with every row in the database in a single query
+
+        :return: Number of instances in the identity map
+        """
+        for instance in await cls.all():  # type: ignore
+            cls.cache(instance)
+
+        cls._preloaded = True
+        return len(getattr(cls, f"_by_{cls.index_fields[0]}"))
+
+    @classmethod
+    async def load_missing(cls, field: str, keys: Iterable[Any]) -> List[Any]:
+        """
+        Fetch everything with one of the given values of a field that is not in the identity
+        map yet, in as few queries as possible. Nothing is fetched once the map is preloaded,
+        and keys already known not to be in the database are skipped.
+
+        :param field: Indexed field to look up
+        :param keys: Values of that field
+        :return: Keys that are still not in the identity map
+        """
+        index = getattr(cls, f"_by_{field}")
+        missing = list(
+            {k for k in keys if k not in index and (field, k) not in cls._unknown}
+        )
+
+        if not cls._preloaded:
+            # Keep under SQLite's limit on the number of variables in a statement
+            for start in range(0, len(missing), 500):
+                chunk = missing[start : start + 500]
+                for instance in await cls.filter(**{f"{field}__in": chunk}):  # type: ignore
+                    cls.cache(instance)
+
+        return [k for k in missing if k not in index]
@@ -1,4 +1,5 @@
 from typing import Any
+from weakref import WeakValueDictionary
 import dill
 import base64
 
@@ -11,24 +12,76 @@ def save_function(pickler, obj):
     pickler.save_reduce(Function, (repr(obj),), obj=obj)
 
 
+class Pickled:
+    """
+    A pickled value read from the DB that is only unpickled the first time it is needed.
+    Identical blobs share a single instance, so each distinct value is only unpickled once,
+    for as long as some model still holds it.
+    """
+
+    __slots__ = ("blob", "_value", "_loaded", "__weakref__")
+
+    _shared = WeakValueDictionary()  # type: WeakValueDictionary[str, Pickled]
+
+    def __init__(self, blob: str) -> None:
+        self.blob = blob
+        self._value = None  # type: Any
+        self._loaded = False
+
+    @classmethod
+    def of(cls, blob: str) -> "Pickled":
+        pickled = cls._shared.get(blob)
+
+        if pickled is None:
+            pickled = cls._shared[blob] = cls(blob)
+
+        return pickled
+
+    @property
+    def value(self) -> Any:
+        if not self._loaded:
+            self._value = PickleField.decode(self.blob)
+            self._loaded = True
+
+        return self._value
+
+    @staticmethod
+    def unwrap(value: Any) -> Any:
+        """
+        The value itself, whether or not it has been through a lazy PickleField
+        """
+        return value.value if isinstance(value, Pickled) else value
+
+
 class PickleField(CharField):
     """
     An extension to CharField that pickles objects
     to and from a str representation in the DB.
+
+    If lazy, values are read from the DB as Pickled and only unpickled when asked for.
     """
 
-    def __init__(self, *args, default=None, **kwargs):
+    def __init__(self, *args, default=None, lazy: bool = False, **kwargs):
         super().__init__(*args, max_length=255, default=default, **kwargs)
+        self.lazy = lazy
 
     @staticmethod
     def encode(value: Any) -> str:
         if value is None:
             return ""
 
+        if isinstance(value, Pickled):
+            return value.blob
+
         p = dill.dumps(value)
 
         return base64.b64encode(p).decode("ascii")
 
+    @staticmethod
+    def decode(value: str) -> Any:
+        p = base64.b64decode(value.encode("ascii"))
+        return dill.loads(p)
+
     def to_db_value(self, value: Any, instance) -> str:
         return self.encode(value)
 
@@ -36,5 +89,7 @@ class PickleField(CharField):
         if value == "":
             return None
 
-        p = base64.b64decode(value.encode("ascii"))
-        return dill.loads(p)
+        if self.lazy:
+            return Pickled.of(value)
+
+        return self.decode(value)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import List, Optional
+from tortoise.exceptions import IntegrityError
+from tortoise.transactions import in_transaction
+
+import libkol
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """
+    Saves models to the database in the background. Models are collected for a short while
+    and then written in batches, one transaction per batch, so that discovering things at
+    runtime never waits on the database.
+
+    :param delay: Seconds to collect models for before writing them
+    :param batch_size: Most models to write in a single transaction. A full batch is written
+                       straight away.
+    """
+
+    def __init__(self, delay: float = 1, batch_size: int = 100) -> None:
+        self.delay = delay
+        self.batch_size = batch_size
+        self.pending = []  # type: List[libkol.Model]
+        self.task = None  # type: Optional[asyncio.Future]
+        # Set to stop waiting and write straight away
+        self.wake = None  # type: Optional[asyncio.Event]
+        self.written = 0
+        self.skipped = 0
+        # Batches that can never be written, such as those breaking a constraint
+        self.failed = []  # type: List[List[libkol.Model]]
+
+    def add(self, *models: "libkol.Model") -> None:
+        """
+        Queue models to be saved. They are saved in the order they were added, so add
+        anything a model refers to before the model itself.
+        """
+        self.pending.extend(models)
+
+        if self.task is None or self.task.done():
+            self.wake = asyncio.Event()
+            self.task = asyncio.ensure_future(self.run())
+
+        if len(self.pending) >= self.batch_size and self.wake is not None:
+            self.wake.set()
+
+    async def run(self) -> None:
+        if self.wake is not None:
+            try:
+                await asyncio.wait_for(self.wake.wait(), self.delay)
+            except asyncio.TimeoutError:
+                pass
+
+        try:
+            await self.flush()
+        except Exception:
+            # The batch is still queued and is tried again by the next flush
+            logger.exception("Could not save %d models", len(self.pending))
+
+    async def flush(self) -> None:
+        """
+        Save everything that is queued right now. Models that are already in the database are
+        skipped. A batch that breaks any other constraint is moved to ``failed``, since it can
+        never be written. If a batch cannot be written for any other reason, it is put back at
+        the front of the queue and the error is raised.
+        """
+        while len(self.pending) > 0:
+            batch = self.pending[: self.batch_size]
+            self.pending = self.pending[self.batch_size :]
+            written = skipped = 0
+
+            try:
+                async with in_transaction() as connection:
+                    for model in batch:
+                        try:
+                            await model.save(using_db=connection)
+                            written += 1
+                        except IntegrityError:
+                            if not await self.is_saved(model, connection):
+                                raise
+
+                            # Something else has already saved it
+                            skipped += 1
+            except IntegrityError:
+                logger.exception("Dropping a batch of %d models", len(batch))
+                self.failed.append(batch)
+                continue
+            except Exception:
+                self.pending[:0] = batch
+                raise
+
+            self.written += written
+            self.skipped += skipped
+
+    @staticmethod
+    async def is_saved(model: "libkol.Model", connection) -> bool:
+        """
+        Whether a row with the model's primary key is already in the database
+        """
+        if model.pk is None:
+            return False
+
+        query = type(model).filter(pk=model.pk).using_db(connection)
+        return await query.count() > 0
+
+    async def close(self) -> None:
+        """
+        Stop waiting and save anything still queued
+        """
+        if self.wake is not None:
+            self.wake.set()
+
+        if self.task is not None:
+            await self.task
+
+        await self.flush()
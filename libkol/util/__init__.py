@@ -2,5 +2,6 @@ from . import parsing
 from . import expression
 from .EnumField import EnumField
 from .PickleField import PickleField
+from .IdentityMap import IdentityMap
 
-__all__ = ["EnumField", "parsing", "PickleField", "expression"]
+__all__ = ["EnumField", "IdentityMap", "parsing", "PickleField", "expression"]
@@ -1,9 +1,29 @@
-from sympy import functions, Expr, Function, Symbol
+from sympy import functions, lambdify, Basic, Dummy, Expr, Symbol
+from sympy.core.function import AppliedUndef
 from sympy.parsing.sympy_parser import parse_expr
+from sympy.printing.pycode import NumPyPrinter
+from functools import reduce
+import math
 import re
-from typing import Callable, Dict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 import base64
 
+# NumPy is only needed to evaluate expressions in bulk
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 import libkol
 from ..Stat import Stat
 from ..koldate import koldate
@@ -18,9 +38,9 @@ state_functions = {
     "mod": lambda kol, mod: 0,
     "path": lambda kol, path: 0,
     "pref": lambda kol, pref: 0,
-    "skill": lambda kol, name: next((1 for s in kol.skills if s.name == name), 0),
+    "skill": lambda kol, name: 1 if kol.has_skill(name) else 0,
     "zone": lambda kol, zone: 0,
-    "equipped": lambda kol, item: 1 if item in kol.equipment.values() else 0,
+    "equipped": lambda kol, item: 1 if kol.get_equipped_count(item) > 0 else 0,
 }  # type: Dict[str, Callable[[libkol.Session, str], int]]
 
 sympy_replacements = {
@@ -70,45 +90,267 @@ def parse(expression_string: str) -> Expr:
         return None
 
 
+# Python implementations for the functions lambdify can't map onto the math module itself
+lambdify_modules = [
+    {"Min": min, "Max": max, "ceiling": math.ceil, "floor": math.floor},
+    "math",
+]
+
+
+class VectorisedPrinter(NumPyPrinter):
+    """
+    NumPyPrinter turns Min and Max into reductions over a tuple of their arguments, which
+    breaks as soon as one argument is an array and another is a scalar. Use the elementwise
+    ufuncs instead so the arguments broadcast against each other.
+    """
+
+    def _print_elementwise(self, ufunc: str, expr: Expr) -> str:
+        return reduce(
+            lambda a, b: f"numpy.{ufunc}({a}, {b})", (self._print(a) for a in expr.args)
+        )
+
+    def _print_Min(self, expr: Expr) -> str:
+        return self._print_elementwise("minimum", expr)
+
+    def _print_Max(self, expr: Expr) -> str:
+        return self._print_elementwise("maximum", expr)
+
+
+class CompiledExpression(NamedTuple):
+    function: Callable[..., Any]
+    symbols: List[str]
+    state_calls: List[Tuple[str, str]]
+
+
+compiled_expressions = {}  # type: Dict[Tuple[Expr, bool], CompiledExpression]
+
+
+def compile_expression(
+    expression: Expr, vectorised: bool = False
+) -> CompiledExpression:
+    """
+    Compile an expression into a plain Python function. The function takes the expression's
+    symbols (in the order given by ``symbols``) followed by the results of each of its state
+    function calls (in the order given by ``state_calls``).
+
+    Compiled expressions are memoized, so each expression is only ever compiled once.
+
+    :param expression: Expression to compile
+    :param vectorised: Compile to NumPy so that symbols can be given as arrays of values
+    """
+    key = (expression, vectorised)
+    compiled = compiled_expressions.get(key)
+
+    if compiled is not None:
+        return compiled
+
+    # Replace each state function call with a placeholder argument
+    calls = sorted(
+        (
+            call
+            for call in expression.atoms(AppliedUndef)
+            if str(call.func) in state_functions
+        ),
+        key=str,
+    )
+    placeholders = [Dummy() for _ in calls]
+    expr = expression.xreplace(dict(zip(calls, placeholders)))
+
+    symbols = sorted((s for s in expr.free_symbols if s not in placeholders), key=str)
+
+    if vectorised:
+        function = lambdify(
+            symbols + placeholders, expr, modules="numpy", printer=VectorisedPrinter()
+        )
+    else:
+        function = lambdify(symbols + placeholders, expr, modules=lambdify_modules)
+
+    compiled = CompiledExpression(
+        function=function,
+        symbols=[str(s) for s in symbols],
+        state_calls=[(str(c.func), arg_decode(str(c.args[0]))) for c in calls],
+    )
+
+    compiled_expressions[key] = compiled
+    return compiled
+
+
+symbol_getters = {
+    "A": lambda kol: kol.ascensions,
+    "D": lambda kol: kol.inebriety,
+    "G": lambda kol: koldate.today().grimace_darkness,
+    "H": lambda kol: 0,  # hobopower
+    "J": lambda kol: 1 if koldate.today().jarlsberg else 0,
+    "K": lambda kol: 0,  # smithsness,
+    "L": lambda kol: kol.level,
+    "M": lambda kol: koldate.today().moonlight,
+    "N": lambda kol: 0,  # audience
+    "R": lambda kol: kol.reagent_potion_duration,
+    "W": lambda kol: kol.familiar_weight,
+    "X": lambda kol: 1 if kol.gender == "f" else 0,
+    "Y": lambda kol: kol.fury,
+    "MUS": lambda kol: kol.get_stat(Stat.Muscle, buffed=True),
+    "MYS": lambda kol: kol.get_stat(Stat.Mysticality, buffed=True),
+    "MOX": lambda kol: kol.get_stat(Stat.Moxie, buffed=True),
+    "ML": lambda kol: 0,  # Total +ML Modifier
+    "MCD": lambda kol: 0,  # mind-control
+    "HP": lambda kol: kol.max_hp,
+    "BL": lambda kol: 0,  # basement level
+}  # type: Dict[str, Callable[[libkol.Session], Any]]
+
+
+class EvaluationContext(Mapping):
+    """
+    Immutable snapshot of the values of the symbols (and state functions) that can appear in
+    an expression. Each value is only worked out the first time an expression needs it and is
+    remembered for the lifetime of the snapshot, so evaluating many expressions against the
+    same context costs no more than evaluating one.
+
+    ``Session.evaluation_context`` keeps one of these for the current state and discards it
+    whenever a request is parsed.
+
+    :param kol: Session to take the values from
+    :param subs: Values that override the session's
+    """
+
+    def __init__(
+        self,
+        kol: "libkol.Session",
+        subs: Optional[Mapping[str, Any]] = None,
+        values: Optional[Dict[Any, Any]] = None,
+    ) -> None:
+        self.kol = kol
+        self.subs = {} if subs is None else dict(subs)
+        self.values = {} if values is None else values
+
+    def replace(self, subs: Mapping[str, Any]) -> "EvaluationContext":
+        """
+        A copy of this context with some symbols overridden. Values already worked out are
+        shared with the copy.
+        """
+        if len(subs) == 0:
+            return self
+
+        return EvaluationContext(self.kol, {**self.subs, **subs}, self.values)
+
+    def __getitem__(self, symbol: str) -> Any:
+        if symbol in self.subs:
+            return self.subs[symbol]
+
+        if symbol not in self.values:
+            self.values[symbol] = symbol_getters[symbol](self.kol)
+
+        return self.values[symbol]
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self.subs or symbol in symbol_getters
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(symbol_getters.keys() | self.subs.keys())
+
+    def __len__(self) -> int:
+        return len(symbol_getters.keys() | self.subs.keys())
+
+    def call(self, function: str, arg: str) -> int:
+        """
+        Result of a state function such as ``skill(Impetuous Sauciness)``
+        """
+        key = (function, arg)
+
+        if key not in self.values:
+            self.values[key] = state_functions[function](self.kol, arg)
+
+        return self.values[key]
+
+
+def call_compiled(
+    expression: Expr, compiled: CompiledExpression, context: EvaluationContext
+):
+    unknown = [s for s in compiled.symbols if s not in context]
+    if len(unknown) > 0:
+        raise UnknownError("Unknown symbols {} in {}".format(unknown, expression))
+
+    args = [
+        *[context[s] for s in compiled.symbols],
+        *[context.call(f, arg) for f, arg in compiled.state_calls],
+    ]
+
+    try:
+        return compiled.function(*args)
+    except Exception as e:
+        raise UnknownError("Could not parse {}".format(expression)) from e
+
+
 async def evaluate(
-    kol: "libkol.Session", expression: Expr, subs: Dict[str, int] = {}
+    kol: "libkol.Session",
+    expression: Expr,
+    subs: Optional[Dict[str, int]] = None,
+    context: Optional[EvaluationContext] = None,
 ) -> int:
-    today = koldate.today()
-
-    symbols = {
-        "A": kol.ascensions,
-        "D": kol.inebriety,
-        "G": today.grimace_darkness,
-        "H": 0,  # hobopower
-        "J": 1 if today.jarlsberg else 0,
-        "K": 0,  # smithsness,
-        "L": kol.level,
-        "M": today.moonlight,
-        "N": 0,  # audience
-        "R": await kol.get_reagent_potion_duration(),
-        "W": kol.familiar_weight,
-        "X": 1 if kol.gender == "f" else 0,
-        "Y": kol.fury,
-        "MUS": kol.get_stat(Stat.Muscle, buffed=True),
-        "MYS": kol.get_stat(Stat.Mysticality, buffed=True),
-        "MOX": kol.get_stat(Stat.Moxie, buffed=True),
-        "ML": 0,  # Total +ML Modifier
-        "MCD": 0,  # mind-control
-        "HP": kol.max_hp,
-        "BL": 0,  # basement level
-    }
-
-    for token, impl in state_functions.items():
-        f = Function(token)
-        expression = expression.replace(f, lambda sym: impl(kol, arg_decode(str(sym))))
+    """
+    Evaluate an expression for the session's current state
 
-    try:
-        result = expression.evalf(subs={**symbols, **subs})
-        if isinstance(result, int) or result.is_number:
-            return result
+    :param kol: Session to take the symbol values from
+    :param expression: Expression to evaluate
+    :param subs: Values that override the session's
+    :param context: Context to evaluate against. Defaults to the session's current one.
+    """
+    if not isinstance(expression, Basic):
+        return expression
+
+    if context is None:
+        context = kol.evaluation_context
+
+    return call_compiled(
+        expression, compile_expression(expression), context.replace(subs or {})
+    )
+
+
+async def evaluate_many(
+    kol: "libkol.Session",
+    expressions: List[Optional[Expr]],
+    subs: Optional[Dict[str, Any]] = None,
+    context: Optional[EvaluationContext] = None,
+) -> "numpy.ndarray":
+    """
+    Evaluate a list of expressions against a single snapshot of the session in one pass.
+
+    Any substitution can be a sequence of values rather than a single value to sweep across
+    them. Swept symbols broadcast against each other following the usual NumPy rules, so
+    the result has one row per expression followed by the broadcast shape of the sweeps.
+
+    .. code-block:: python
+
+      # Value of every bonus at familiar weights 1 to 40
+      values = await evaluate_many(kol, [b.expression_value for b in bonuses], {"W": range(1, 41)})
+
+    Expressions that are unknown (None) evaluate to NaN.
+
+    :param kol: Session to take the symbol values from
+    :param expressions: Expressions to evaluate
+    :param subs: Values, or sequences of values, that override the snapshot
+    :param context: Context to evaluate against. Defaults to the session's current one.
+    """
+    if numpy is None:
+        raise ImportError("evaluate_many requires numpy (pip install libkol[numpy])")
+
+    sweeps = {k: numpy.asarray(v) for k, v in (subs or {}).items()}
+    shape = numpy.broadcast(*sweeps.values(), 0).shape
+    if context is None:
+        context = kol.evaluation_context
+
+    context = context.replace(sweeps)
+
+    results = numpy.empty((len(expressions),) + shape)
+
+    for i, expression in enumerate(expressions):
+        if expression is None:
+            results[i] = numpy.nan
+        elif not isinstance(expression, Basic):
+            results[i] = expression
         else:
-            raise UnknownError(
-                "Unknown symbols {} in {}".format(result.free_symbols, expression)
+            results[i] = call_compiled(
+                expression, compile_expression(expression, vectorised=True), context
             )
-    except Exception:
-        raise UnknownError("Could not parse {}".format(expression))
+
+    return results
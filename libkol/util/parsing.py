@@ -1,18 +1,54 @@
 import re
 from copy import copy
-from itertools import groupby
+from itertools import chain, groupby
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
 from bs4 import BeautifulSoup, Tag
+from bs4.builder import builder_registry
 
 import libkol
 
 from .. import types
 from ..Stat import Stat
 
+# lxml builds the same BeautifulSoup tree several times faster than the pure Python parser,
+# so use it when it is installed
+try:
+    import lxml  # noqa: F401
+
+    html_parser = "lxml"
+except ImportError:
+    html_parser = "html.parser"
+
+
+def set_html_parser(name: str) -> None:
+    """
+    Choose the tree builder used by every BeautifulSoup-based parser in libkol
+
+    :param name: Any BeautifulSoup tree builder, e.g. "lxml" or "html.parser"
+    """
+    global html_parser
+
+    if builder_registry.lookup(name) is None:
+        raise ValueError(f"HTML parser `{name}` is not available")
+
+    html_parser = name
+
+
+def soup(html: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    Build a BeautifulSoup tree using the configured HTML parser
+
+    :param html: HTML to parse
+    :param parser: Override the configured HTML parser for this tree only
+    """
+    return BeautifulSoup(html, parser or html_parser)
+
 
 def panel(html: str, title: str = "Results:") -> Optional[Tag]:
+    # lxml closes <p> tags implicitly when a block element opens, which changes the text of
+    # combat and item use messages, so panels are always built with the pure Python parser
     soup = BeautifulSoup(html, "html.parser")
     headers = soup.find_all("b", text=title)
     header = next((h for h in headers), None)
@@ -89,22 +125,69 @@ effect_pattern = re.compile(
     r"<td valign=center class=effect>You acquire an effect: <b>(.*?)</b><br>\(duration: ([0-9,]+) Adventures\)</td>"
 )
 
+resource_patterns = {
+    "single_item": single_item_pattern,
+    "multi_item": multi_item_pattern,
+    "gain_meat": gain_meat_pattern,
+    "lose_meat": lose_meat_pattern,
+    "substat": substat_pattern,
+    "stat": stat_pattern,
+    "level": level_pattern,
+    "hp": hp_pattern,
+    "mp": mp_pattern,
+    "inebriety": inebriety_pattern,
+    "adventures": adventures_pattern,
+    "effect": effect_pattern,
+}
+
+
+def combine_patterns(
+    patterns: Dict[str, Pattern], prefixes: List[str]
+) -> List[Pattern]:
+    """
+    Join patterns into one expression for each of the prefixes, holding a branch, named for
+    it, for each pattern that starts with that prefix. Keeping the prefix outside the branches
+    lets a search skip straight to where one of them might match, which it can't do with a
+    branch for every pattern. The patterns' own named groups are given the branch name as a
+    prefix to keep them apart.
+    """
+    branches = {prefix: [] for prefix in prefixes}  # type: Dict[str, List[str]]
+
+    for name, pattern in patterns.items():
+        prefix = next((p for p in prefixes if pattern.pattern.startswith(p)), None)
+        if prefix is None:
+            raise ValueError(f"{name} doesn't start with any of {prefixes}")
+
+        rest = pattern.pattern[len(prefix) :].replace("(?P<", f"(?P<{name}_")
+        branches[prefix].append(f"(?P<{name}>{rest})")
+
+    return [
+        re.compile("{}(?:{})".format(re.escape(prefix), "|".join(b)))
+        for prefix, b in branches.items()
+    ]
+
+
+# Every resource pattern above in one expression per prefix, so that a page is walked twice
+# rather than once for each. Matches are dispatched on ``lastgroup``. No two of the patterns
+# can match overlapping text, so these find just what they would one at a time.
+combined_resource_patterns = combine_patterns(resource_patterns, ["<td", "You "])
+
 
 async def item(text: str) -> List["types.ItemQuantity"]:
     from .. import Item
 
-    item_quantities = []  # type: List[types.ItemQuantity]
-
-    for match in single_item_pattern.finditer(text):
-        item = await Item.get_or_discover(desc_id=int(match.group(1)))
-        item_quantities += [types.ItemQuantity(item, 1)]
+    found = [
+        (int(match.group(1)), 1) for match in single_item_pattern.finditer(text)
+    ] + [
+        (int(match.group(1)), to_int(match.group(2)))
+        for match in multi_item_pattern.finditer(text)
+    ]
 
-    for match in multi_item_pattern.finditer(text):
-        quantity = to_int(match.group(2))
-        item = await Item.get_or_discover(desc_id=int(match.group(1)))
-        item_quantities += [types.ItemQuantity(item, quantity)]
+    items = await Item.resolve_many(desc_ids=[desc_id for desc_id, _ in found])
 
-    return item_quantities
+    return [
+        types.ItemQuantity(item, quantity) for item, (_, quantity) in zip(items, found)
+    ]
 
 
 def meat(text) -> int:
@@ -216,29 +299,118 @@ class ResourceGain:
     meat: int
 
 
+def scan_resources(html: str) -> Dict[str, Any]:
+    """
+    Walk a page with the combined patterns, collecting everything that ``resource_gain``
+    reports. The items are left as (description id, quantity) pairs so that they can be
+    resolved in one go.
+
+    This gives the same answers as running each of the parsers above in turn, first match
+    winning where they use ``search`` and last match winning where they build a dictionary.
+    """
+    single_items = []  # type: List[Tuple[int, int]]
+    multi_items = []  # type: List[Tuple[int, int]]
+    gained_meat = None  # type: Optional[int]
+    lost_meat = None  # type: Optional[int]
+    result = {
+        "adventures": None,
+        "inebriety": None,
+        "substats": {},
+        "stats": {},
+        "levels": None,
+        "effects": [],
+        "hp": 0,
+        "mp": 0,
+    }  # type: Dict[str, Any]
+
+    matches = chain.from_iterable(p.finditer(html) for p in combined_resource_patterns)
+
+    for m in matches:
+        kind = m.lastgroup
+        # The groups of the pattern that matched, numbered as they are in it
+        g = m.groups()[m.lastindex - 1 : m.lastindex + resource_patterns[kind].groups]
+
+        if kind == "single_item":
+            single_items.append((int(g[1]), 1))
+        elif kind == "multi_item":
+            multi_items.append((int(g[1]), to_int(g[2])))
+        elif kind == "gain_meat":
+            if gained_meat is None:
+                gained_meat = to_int(g[1])
+        elif kind == "lose_meat":
+            if lost_meat is None:
+                lost_meat = to_int(g[1])
+        elif kind == "effect":
+            result["effects"].append({"name": g[1], "turns": to_int(g[2])})
+        elif kind == "substat":
+            stat = (
+                Stat.Muscle
+                if m.group("substat_muscle")
+                else Stat.Mysticality
+                if m.group("substat_mysticality")
+                else Stat.Moxie
+            )
+            sign = 1 if m.group("substat_sign") == "gain" else -1
+            result["substats"][stat] = to_int(m.group("substat_quantity")) * sign
+        elif kind == "stat":
+            sign = 1 if m.group("stat_sign") == "gain" else -1
+            quantity = 1 if m.group("stat_amount") == "a" else 2
+            result["stats"][Stat(m.group("stat_stat").lower())] = quantity * sign
+        elif kind == "level":
+            if result["levels"] is None:
+                result["levels"] = 1 if g[1] == "a" else 2
+        elif kind in ("hp", "mp"):
+            result[kind] += to_int(g[2]) * (1 if g[1] == "gain" else -1)
+        elif result[kind] is None:
+            # Adventures and inebriety
+            result[kind] = to_int(g[1])
+
+    result["items"] = single_items + multi_items
+    result["meat"] = (
+        gained_meat
+        if gained_meat is not None
+        else -lost_meat
+        if lost_meat is not None
+        else 0
+    )
+
+    for key in ("adventures", "inebriety", "levels"):
+        if result[key] is None:
+            result[key] = 0
+
+    return result
+
+
+def fight_cost(html: str) -> int:
+    """
+    Adventures spent on a fight: one once it has been won, unless it was a free fight
+    """
+    if "<!--WINWINWIN-->" in html and "<!--FREEFREEFREE-->" not in html:
+        return 1
+
+    return 0
+
+
 async def resource_gain(
     html: str, session: Optional["libkol.Session"] = None, combat: bool = False
 ) -> ResourceGain:
-    rg = ResourceGain(
-        items=(await item(html)),
-        adventures=adventures(html),
-        inebriety=inebriety(html),
-        substats=substat(html),
-        stats=stats(html),
-        levels=level(html),
-        effects=effects(html),
-        hp=hp(html),
-        mp=mp(html),
-        meat=meat(html),
-    )
+    from .. import Item
+
+    found = scan_resources(html)
+    items = await Item.resolve_many(desc_ids=[desc_id for desc_id, _ in found["items"]])
+    found["items"] = [
+        types.ItemQuantity(item, quantity)
+        for item, (_, quantity) in zip(items, found["items"])
+    ]
 
-    if combat and "<!--WINWINWIN-->" in html:
-        if "<!--FREEFREEFREE-->" not in html:
-            rg.adventures -= 1
+    rg = ResourceGain(**found)
+
+    if combat:
+        rg.adventures -= fight_cost(html)
 
     if session:
         for iq in rg.items:
-            session.state.inventory[iq.item] += iq.quantity
+            session.state.add_item(iq.item, iq.quantity)
         session.state.adventures += rg.adventures
         session.state.inebriety += rg.inebriety
 
@@ -248,11 +420,18 @@ async def resource_gain(
 
         session.state.level += rg.levels
 
-        for effect in rg.effects:
-            session.state.effects[effect["name"]] = (
-                session.state.effects.get(effect["name"], 0) + effect["turns"]
+        if len(rg.effects) > 0:
+            from libkol import Effect
+
+            known = await Effect.resolve_many(
+                names=[effect["name"] for effect in rg.effects]
             )
 
+            for effect, e in zip(rg.effects, known):
+                session.state.add_effect(
+                    effect["name"], effect["turns"], None if e is None else e.id
+                )
+
         session.state.meat += rg.meat
 
         session.state.current_hp += rg.hp
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from dataclasses import replace
+from io import BytesIO
+from typing import Any, DefaultDict, Dict, Set, Tuple
+import pickle
+
+import libkol
+from ..Clan import Clan
+from ..Model import Model
+
+# Bump whenever the layout of a snapshot changes so that old files are ignored
+version = 1
+
+
+class StatePickler(pickle.Pickler):
+    """
+    Pickles a State, storing database models and clans by reference rather than by value.
+    The models that were referenced are collected in ``references`` so that they can all be
+    fetched up front when the snapshot is loaded.
+    """
+
+    def __init__(self, file) -> None:
+        super().__init__(file)
+        self.references = defaultdict(set)  # type: DefaultDict[str, Set[int]]
+
+    def persistent_id(self, obj: Any):
+        if isinstance(obj, Model):
+            name = type(obj).__name__
+            self.references[name].add(obj.id)
+            return ("model", name, obj.id)
+
+        if isinstance(obj, Clan):
+            return ("clan", obj.id, obj.name)
+
+        return None
+
+
+class StateUnpickler(pickle.Unpickler):
+    def __init__(
+        self,
+        file,
+        session: "libkol.Session",
+        models: Dict[Tuple[str, int], "libkol.Model"],
+    ) -> None:
+        super().__init__(file)
+        self.session = session
+        self.models = models
+
+    def persistent_load(self, pid):
+        kind, *key = pid
+
+        if kind == "clan":
+            id, name = key
+            return Clan(self.session, id, name)
+
+        if kind == "model" and tuple(key) in self.models:
+            return self.models[tuple(key)]
+
+        raise pickle.UnpicklingError(f"Cannot find {pid} in the database")
+
+
+def dump(session: "libkol.Session") -> Dict[str, Any]:
+    """
+    Take a snapshot of everything needed to pick up a session without logging in again
+
+    :param session: Session to snapshot
+    """
+    buffer = BytesIO()
+    pickler = StatePickler(buffer)
+    pickler.dump(replace(session.state, evaluation_context=None))
+
+    return {
+        "version": version,
+        "server_url": session.server_url,
+        "cookies": [
+            (cookie.key, cookie.value, cookie["domain"], cookie["path"])
+            for cookie in session.client.cookie_jar
+        ],
+        "references": dict(pickler.references),
+        "state": buffer.getvalue(),
+    }
+
+
+async def load_state(session: "libkol.Session", snapshot: Dict[str, Any]) -> Any:
+    """
+    Rebuild the State stored in a snapshot, fetching every model it refers to with one query
+    per model
+
+    :param session: Session the State will belong to
+    :param snapshot: Snapshot taken by ``dump``
+    """
+    models = {}  # type: Dict[Tuple[str, int], libkol.Model]
+
+    for name, ids in snapshot["references"].items():
+        model = getattr(libkol, name)
+
+        if model is libkol.Item:
+            found = await libkol.Item.resolve_many(ids=list(ids))
+        else:
+            found = await model.filter(id__in=list(ids))
+
+        models.update({(name, m.id): m for m in found})
+
+    return StateUnpickler(BytesIO(snapshot["state"]), session, models).load()
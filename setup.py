@@ -46,10 +46,11 @@ setup(
         "yarl==1.3.0",
         "aiosqlite==0.10.0",
         "tortoise-orm==0.12.2",
-        "PuLP==1.6.10",
+        "PuLP==2.4",
         "sympy==1.4",
         "dill==0.3.0",
     ],
+    extras_require={"lxml": ["lxml"], "numpy": ["numpy"], "orjson": ["orjson"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,56 @@
+"""
+The BeautifulSoup parsing that ``combat.scan`` replaced, kept to check the scanner against
+and to benchmark it with
+"""
+
+from bs4 import Comment, NavigableString, Tag
+from yarl import URL
+
+from libkol.request.combat import CombatPage, combat
+from libkol.util import parsing
+
+
+def get_panel(content: str) -> Tag:
+    """
+    Find the combat panel, without the action interface or the intro
+    """
+    panel = parsing.panel(content, "Combat!")
+
+    # Remove action interface, just intercase. There is none once the fight is over.
+    end = panel.find("a", attrs={"name": "end"})
+    if end is not None:
+        end.parent.extract()
+
+    # Intro
+    intro = panel.find("blockquote")
+    if intro:
+        intro.extract()
+
+    return panel
+
+
+def is_event(line: Tag) -> bool:
+    return (
+        isinstance(line.contents[0], NavigableString) or line.contents[0].name == "font"
+    )
+
+
+def scan_soup(content: str) -> CombatPage:
+    page = CombatPage(turn=combat.get_turn(content))
+
+    panel = get_panel(content)
+    monster_info = panel.table.table
+    page.monster_image = URL(monster_info.find("img", id="monpic")["src"]).parts[-1]
+    page.monster_name = monster_info.find("span", id="monname").text
+
+    # Macros mark the start of each round they play with a comment
+    round = -1
+
+    for e in panel.descendants:
+        if isinstance(e, Comment) and e.strip().startswith("macroaction"):
+            round += 1
+        elif e.name == "p" and is_event(e):
+            page.events.append((max(round, 0), e.get_text()))
+
+    page.source = str(panel)
+    return page
@@ -54,6 +54,13 @@ class MockSession:
             return request
 
         self.request = MagicMock(side_effect=async_return)
+        self.write_behind = MagicMock()
+
+    async def single_flight(self, key, start):
+        return await start()
+
+    async def run_cpu_bound(self, function, *args):
+        return function(*args)
 
 
 class TestCase(unittest.TestCase):
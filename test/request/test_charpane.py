@@ -35,6 +35,8 @@ class CharpaneTestCase(TestCase):
             self.assertEqual(state.stats[Stat.Moxie].buffed, 77)
             self.assertEqual(state.stats[Stat.Mysticality].base, 122)
             self.assertEqual(state.stats[Stat.Mysticality].buffed, 61)
+            self.assertEqual(state.effects["Blood-Rich"], 7)
+            self.assertEqual(state.effect_durations[1353], 7)
 
         self.run_async("basic", run_test)
 
@@ -1,5 +1,10 @@
+from glob import glob
+from os import path
+
 from libkol.request import combat
-from .test_base import TestCase
+from libkol.request.combat import write_panel
+from .combat_soup import scan_soup
+from .test_base import TEST_DATA, TestCase, open_test_data
 
 
 class CombatTestCase(TestCase):
@@ -36,3 +41,41 @@ class CombatTestCase(TestCase):
             self.assertEqual(self.session.state.current_hp, 132)
 
         self.run_async("fumble", run_test)
+
+    def test_combat_scan(self):
+        with open_test_data(self.request, "fumble") as file:
+            scanned = combat.scan(file.read())
+
+        self.assertEqual(scanned.monster_name, "a smut orc jacker")
+        self.assertEqual(scanned.monster_image, "smutorc_jacker.gif")
+        self.assertEqual(len(scanned.events), 1)
+        self.assertTrue(scanned.events[0][1].startswith("FUMBLE! You drop"))
+        self.assertTrue(scanned.events[0][1].endswith("splitting hairs."))
+        self.assertTrue(scanned.source.startswith('<td style="padding: 5px;'))
+
+    def test_combat_scan_macro(self):
+        with open_test_data(self.request, "macro_win") as file:
+            scanned = combat.scan(file.read())
+
+        self.assertEqual(scanned.turn, 3)
+        self.assertEqual([round for round, _ in scanned.events], [0, 1, 1])
+        self.assertEqual(
+            scanned.events[1][1],
+            "You crack your whip and it bites the orc for 15 damage.",
+        )
+        self.assertEqual(len(scanned.macroactions), 2)
+
+    def test_combat_scan_matches_soup(self):
+        files = glob(path.join(TEST_DATA, "{}_*.html".format(self.request)))
+        self.assertGreater(len(files), 0)
+
+        for file in files:
+            with self.subTest(file=path.basename(file)), open(file) as f:
+                content = f.read()
+                scanned = combat.scan(content)
+                souped = scan_soup(content)
+                self.assertEqual(scanned.turn, souped.turn)
+                self.assertEqual(scanned.monster_name, souped.monster_name)
+                self.assertEqual(scanned.monster_image, souped.monster_image)
+                self.assertEqual(scanned.events, souped.events)
+                self.assertEqual(write_panel(scanned.source), souped.source)
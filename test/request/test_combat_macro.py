@@ -0,0 +1,92 @@
+from unittest import TestCase as BaseTestCase
+
+from libkol import CombatMacro, Stat
+from libkol.request import combat_macro
+
+from .test_base import TestCase
+
+
+class CombatMacroTestCase(BaseTestCase):
+    def test_build_macro(self):
+        macro = (
+            CombatMacro()
+            .pick_pocket()
+            .if_("hascombatitem 2")
+            .item(2)
+            .end_if()
+            .skill(3004)
+            .repeat("!times 3")
+            .attack()
+            .repeat()
+        )
+
+        self.assertEqual(
+            str(macro),
+            "pickpocket; if hascombatitem 2; use 2; endif; skill 3004; "
+            "repeat !times 3; attack; repeat;",
+        )
+
+    def test_funksling(self):
+        self.assertEqual(str(CombatMacro().item(2, 3)), "use 2,3;")
+
+
+class CombatMacroRequestTestCase(TestCase):
+    request = "combat"
+
+    def test_combat_macro_win(self):
+        async def run_test(file):
+            meat = self.session.state.meat
+            hp = self.session.state.current_hp
+
+            rounds = await combat_macro.parser(file.read(), session=self.session)
+
+            self.assertEqual(len(rounds), 2)
+            self.assertEqual([r.turn for r in rounds], [2, 3])
+            self.assertEqual([r.damage for r in rounds], [12, 15])
+            self.assertEqual([len(r.events) for r in rounds], [1, 2])
+            self.assertEqual([r.finished for r in rounds], [False, True])
+            self.assertEqual(rounds[0].monster.name, "smut orc jacker")
+            self.assertIs(rounds[0].monster, rounds[1].monster)
+
+            self.assertEqual(rounds[0].resource_gain.hp, -3)
+            self.assertEqual(rounds[0].resource_gain.meat, 0)
+            self.assertEqual(rounds[1].resource_gain.meat, 47)
+            self.assertEqual(rounds[1].resource_gain.substats, {Stat.Muscle: 4})
+            self.assertEqual(rounds[1].resource_gain.adventures, -1)
+
+            self.assertEqual(self.session.state.meat, meat + 47)
+            self.assertEqual(self.session.state.current_hp, hp - 3)
+
+        self.run_async("macro_win", run_test)
+
+    def test_combat_macro_free(self):
+        async def run_test(file):
+            adventures = self.session.state.adventures
+
+            rounds = await combat_macro.parser(file.read(), session=self.session)
+
+            self.assertEqual(len(rounds), 2)
+            self.assertEqual([r.resource_gain.adventures for r in rounds], [0, 0])
+            self.assertEqual(self.session.state.adventures, adventures)
+
+        self.run_async("macro_free", run_test)
+
+    def test_combat_macro_stray_macroaction(self):
+        async def run_test(file):
+            content = file.read()
+            rounds = await combat_macro.parser(content, session=self.session)
+
+            # Only the macroaction comments in the combat panel start a round
+            self.assertEqual(len(rounds), 2)
+            self.assertEqual([r.damage for r in rounds], [12, 15])
+            self.assertEqual(rounds[0].resource_gain.hp, -3)
+            self.assertTrue(rounds[0].source.startswith('<td style="padding: 5px;'))
+            self.assertTrue(rounds[1].source.startswith("<!-- macroaction: attack -->"))
+            self.assertEqual(
+                "".join(r.source for r in rounds),
+                combat_macro.extract(content, None).source,
+            )
+            self.assertIn("12 damage", rounds[0].raw)
+            self.assertNotIn("12 damage", rounds[1].raw)
+
+        self.run_async("macro_stray", run_test)
@@ -0,0 +1,42 @@
+from yarl import URL
+
+from libkol import Stat
+from libkol.request import eat
+
+from .test_base import TestCase
+
+
+class EatTestCase(TestCase):
+    request = "eat"
+
+    def test_eat_hell_ramen(self):
+        async def run_test(file):
+            state = self.session.state
+            adventures = state.adventures
+            hp = state.current_hp
+            mp = state.current_mp
+            blood_rich = state.effect_durations.get(1353, 0)
+
+            result = await eat.parser(
+                file.read(),
+                session=self.session,
+                url=URL("inv_eat.php?which=1&whichitem=2078"),
+            )
+
+            self.assertEqual(result.adventures, 22)
+            self.assertEqual(result.hp, 12)
+            self.assertEqual(result.mp, 8)
+            self.assertEqual(result.inebriety, 0)
+            self.assertEqual(result.meat, 0)
+            self.assertEqual(result.levels, 0)
+            self.assertEqual(result.items, [])
+            self.assertEqual(result.substats, {Stat.Mysticality: 27, Stat.Muscle: 6})
+            self.assertEqual(result.stats, {Stat.Mysticality: 1})
+            self.assertEqual(result.effects, [{"name": "Blood-Rich", "turns": 5}])
+
+            self.assertEqual(state.adventures, adventures + 22)
+            self.assertEqual(state.current_hp, hp + 12)
+            self.assertEqual(state.current_mp, mp + 8)
+            self.assertEqual(state.effect_durations[1353], blood_rich + 5)
+
+        self.run_async("hell_ramen", run_test)
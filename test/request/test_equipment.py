@@ -43,4 +43,16 @@ class EquipmentTestCase(TestCase):
             self.assertEqual(outfit[Slot.Acc3].id, 6956)
             self.assertEqual(outfit[Slot.FamiliarEquipment].id, 4135)
 
+            state = self.session.state
+            self.assertEqual(sum(state.equipment_counts.values()), 9)
+            self.assertEqual(state.equipment_counts[outfit[Slot.Hat]], 1)
+
+            hat = outfit[Slot.Hat]
+            accessory = outfit[Slot.Acc1]
+            state.equip(Slot.Hat, None)
+            self.assertEqual(state.equipment_counts[hat], 0)
+            state.equip(Slot.Acc1, hat)
+            self.assertEqual(state.equipment_counts[hat], 1)
+            self.assertEqual(state.equipment_counts[accessory], 0)
+
         self.run_async("accessories_separate", run_test)
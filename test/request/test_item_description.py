@@ -1,3 +1,4 @@
+from libkol.Error import ItemNotFoundError
 from libkol.request import item_description
 from .test_base import TestCase
 
@@ -37,3 +38,10 @@ class ItemDescriptionTestCase(TestCase):
             self.assertEqual(description["power"], 30)
 
         self.run_async("hat", run_test)
+
+    def test_item_description_missing(self):
+        async def run_test(file):
+            with self.assertRaises(ItemNotFoundError):
+                await item_description.parser(file.read())
+
+        self.run_async("missing", run_test)
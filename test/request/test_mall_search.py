@@ -26,3 +26,13 @@ class MallSearchTestCase(TestCase):
             self.assertEqual(listings[3].limit_reached, False)
 
         self.run_async("limited", run_test)
+
+    def test_mall_search_rows_match_soup(self):
+        async def run_test(file):
+            content = file.read()
+            self.assertEqual(
+                mall_search.parse_rows(content), mall_search.parse_rows_soup(content)
+            )
+
+        self.run_async("lime", run_test)
+        self.run_async("limited", run_test)
@@ -13,4 +13,8 @@ class SkillsTestCase(TestCase):
             self.assertEqual(len(knowledge), 306)
             self.assertIn(await Skill["Blood Bubble"], knowledge)
 
+            blood_bubble = await Skill["Blood Bubble"]
+            self.assertIn(blood_bubble.id, self.session.state.skill_ids)
+            self.assertIn("Blood Bubble", self.session.state.skill_names)
+
         self.run_async("lots", run_test)
@@ -0,0 +1,53 @@
+import json
+
+from libkol.request import status
+from libkol import CharacterClass, Slot, Stat
+
+from .test_base import TestCase
+
+
+class StatusTestCase(TestCase):
+    request = "status"
+
+    def test_status_basic(self):
+        async def run_test(file):
+            result = await status.parser(json.load(file), session=self.session)
+
+            state = self.session.state
+
+            self.assertEqual(result, True)
+            self.assertEqual(state.pwd, "0123456789abcdef0123456789abcdef")
+            self.assertEqual(state.username, "gausie")
+            self.assertEqual(state.user_id, 2434890)
+            self.assertEqual(state.level, 34)
+            self.assertEqual(state.character_class, CharacterClass.Sauceror)
+            self.assertEqual(state.current_hp, 1322)
+            self.assertEqual(state.max_mp, 1820)
+            self.assertEqual(state.meat, 4823179)
+            self.assertEqual(state.adventures, 212)
+            self.assertEqual(state.inebriety, 4)
+            self.assertEqual(state.stats[Stat.Mysticality].buffed, 1476)
+            self.assertEqual(state.stats[Stat.Mysticality].base, 1153)
+            self.assertEqual(state.effects, {"Blood-Rich": 7, "Ode to Booze": 3})
+            self.assertEqual(state.effect_durations, {1353: 7, 71: 3})
+            self.assertEqual(state.equipment[Slot.Hat].id, 2078)
+            self.assertEqual(state.equipment[Slot.Back].id, 5738)
+            self.assertEqual(state.equipment[Slot.Offhand], None)
+            self.assertEqual(state.equipment_counts[state.equipment[Slot.Acc1]], 1)
+            self.assertEqual(state.familiar.id, 1)
+
+        self.run_async("basic", run_test, ext="json")
+
+    def test_status_unknown_class(self):
+        async def run_test(file):
+            content = json.load(file)
+            content["class"] = "11"
+
+            self.session.state.character_class = CharacterClass.Sauceror
+            await status.parser(content, session=self.session)
+
+            self.assertEqual(
+                self.session.state.character_class, CharacterClass.Sauceror
+            )
+
+        self.run_async("basic", run_test, ext="json")
@@ -0,0 +1,144 @@
+import asyncio
+from os import path
+from unittest import TestCase
+
+from libkol import AdventureRunner, CombatMacro, Session
+from libkol.ResponseCache import CachedResponse
+
+TEST_DATA = path.join(path.dirname(path.abspath(__file__)), "request", "test_data")
+
+
+def load(name):
+    with open(path.join(TEST_DATA, name), "rb") as f:
+        return f.read()
+
+
+class FarmingSession(Session):
+    """
+    Every adventure is a fight, which the macro then wins
+    """
+
+    pages = {
+        "adventure.php": ("fight.php", load("combat_fumble.html")),
+        "fight.php": ("fight.php", load("combat_macro_win.html")),
+    }
+
+    def __init__(self, delay=0):
+        super().__init__()
+        self.server_url = "https://www.kingdomofloathing.com"
+        self.requested = []
+        self.delay = delay
+
+    async def request(self, url, **kwargs):
+        self.requested.append(url)
+        redirect, body = self.pages[url]
+        await asyncio.sleep(self.delay)
+        return CachedResponse(f"{self.server_url}/{redirect}", body, "utf-8")
+
+
+class AbortingSession(FarmingSession):
+    """
+    Every adventure is a fight, which the macro gives up on
+    """
+
+    pages = {
+        "adventure.php": ("fight.php", load("combat_fumble.html")),
+        "fight.php": ("fight.php", load("combat_fumble.html")),
+    }
+
+
+class AdventureRunnerTestCase(TestCase):
+    def farm(self, turns, session_class=FarmingSession, **kwargs):
+        seen = []
+
+        async def run():
+            async with session_class() as kol:
+                kol.state.adventures = 3
+                kol.state.current_hp = 100
+                runner = AdventureRunner(
+                    kol,
+                    location_id=331,
+                    macro=CombatMacro().attack().repeat(),
+                    on_turn=lambda turn: seen.append(list(kol.requested)),
+                    **kwargs,
+                )
+                await runner.run(turns)
+                return kol, runner
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            kol, runner = loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+        return kol, runner, seen
+
+    def test_stops_when_out_of_adventures(self):
+        kol, runner, _ = self.farm(10, min_adventures=1)
+
+        self.assertEqual(runner.stop_reason, "adventures")
+        self.assertEqual(len(runner.turns), 2)
+        self.assertEqual(kol.state.adventures, 1)
+        self.assertEqual(kol.state.meat, 94)
+        self.assertEqual(kol.state.current_hp, 90)
+
+        metrics = runner.turns[0].metrics
+        self.assertEqual(metrics.requests, 2)
+        self.assertEqual(metrics.rounds, 3)
+        self.assertGreaterEqual(metrics.elapsed, metrics.waiting + metrics.parsing)
+
+    def test_next_turn_is_sent_before_on_turn(self):
+        kol, runner, seen = self.farm(2)
+
+        self.assertEqual(runner.stop_reason, "turns")
+        self.assertEqual(seen[0], ["adventure.php", "fight.php", "adventure.php"])
+        self.assertEqual(len(kol.requested), 4)
+
+    def test_custom_stop_condition(self):
+        kol, runner, _ = self.farm(
+            10,
+            min_hp=0,
+            stop_conditions=[lambda s, turn: "rich" if s.state.meat > 0 else None],
+        )
+
+        self.assertEqual(runner.stop_reason, "rich")
+        self.assertEqual(len(runner.turns), 1)
+
+    def test_stops_when_a_fight_is_not_finished(self):
+        kol, runner, _ = self.farm(3, session_class=AbortingSession)
+
+        self.assertEqual(runner.stop_reason, "interrupted")
+        self.assertEqual(len(runner.turns), 1)
+        self.assertFalse(runner.turns[0].result.finished)
+        self.assertEqual(kol.requested, ["adventure.php", "fight.php"])
+
+    def test_request_sent_ahead_is_cancelled_on_error(self):
+        def fail(turn):
+            raise RuntimeError("Something went wrong")
+
+        async def run():
+            async with FarmingSession(delay=0.01) as kol:
+                kol.state.adventures = 3
+                kol.state.current_hp = 100
+                runner = AdventureRunner(
+                    kol, location_id=331, macro=CombatMacro().attack(), on_turn=fail
+                )
+
+                with self.assertRaises(RuntimeError):
+                    await runner.run(3)
+
+                await asyncio.sleep(0)
+                return [
+                    t for t in asyncio.all_tasks() if t is not asyncio.current_task()
+                ]
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            tasks = loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+        # Nothing is left running in the background
+        self.assertEqual(tasks, [])
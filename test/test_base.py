@@ -0,0 +1,55 @@
+from tortoise import Tortoise
+from libkol import Effect, Item, Monster, models
+from tempfile import TemporaryDirectory
+from os import path
+import unittest
+import asyncio
+
+
+class TestCase(unittest.TestCase):
+    def run_async(self, coro):
+        """
+        Run a coroutine to completion on a fresh event loop and return its result
+        """
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+
+
+class DatabaseTestCase(TestCase):
+    """
+    Runs each coroutine against a fresh database in a temporary directory, with the identity
+    maps emptied before and after
+    """
+
+    async def populate(self):
+        """
+        Create the rows every test in the case starts with
+        """
+
+    def run_async(self, coro):
+        async def run(directory):
+            db_file = path.join(directory, "libkol.db")
+            await Tortoise.init(
+                db_url=f"sqlite://{db_file}", modules={"models": models}
+            )
+            await Tortoise.generate_schemas()
+            self.clear_caches()
+
+            try:
+                await self.populate()
+                return await coro
+            finally:
+                self.clear_caches()
+                await Tortoise.close_connections()
+
+        with TemporaryDirectory() as directory:
+            return super().run_async(run(directory))
+
+    @staticmethod
+    def clear_caches():
+        for model in (Item, Effect, Monster):
+            model.clear_cache()
@@ -0,0 +1,42 @@
+from tortoise import Tortoise
+from unittest.mock import patch
+from libkol import Effect
+
+from .test_base import DatabaseTestCase
+
+
+class EffectIndexTestCase(DatabaseTestCase):
+    async def populate(self):
+        await Effect.create(id=1, name="Beaten Up", image="", desc_id="abc")
+        await Effect.create(id=2, name="Blood-Rich", image="", desc_id="def")
+
+    def test_preloaded_effects_are_resolved_without_the_database(self):
+        async def test():
+            self.assertEqual(await Effect.preload(), 2)
+
+            await Tortoise.close_connections()
+
+            beaten_up, unknown, blood_rich = await Effect.resolve_many(
+                names=["Beaten Up", "Nope"], desc_ids=["def"]
+            )
+            self.assertEqual(beaten_up.id, 1)
+            self.assertIsNone(unknown)
+            self.assertEqual(blood_rich.id, 2)
+
+        self.run_async(test())
+
+    def test_effects_are_only_looked_up_once(self):
+        async def test():
+            filter = Effect.filter
+
+            with patch.object(Effect, "filter", side_effect=filter) as query:
+                first = await Effect.resolve_many(names=["Beaten Up", "Nope"])
+                self.assertEqual(query.call_count, 1)
+
+                second = await Effect.resolve_many(names=["Beaten Up", "Nope"])
+                self.assertEqual(query.call_count, 1)
+
+            self.assertIs(second[0], first[0])
+            self.assertIsNone(second[1])
+
+        self.run_async(test())
@@ -0,0 +1,107 @@
+from unittest import skipIf
+from libkol.Error import UnknownError
+from libkol.Stat import Stat
+from libkol.util import expression
+
+from .test_base import TestCase
+
+
+class FakeSession:
+    ascensions = 3
+    inebriety = 5
+    level = 11
+    familiar_weight = 17
+    gender = "f"
+    fury = 2
+    max_hp = 150
+    reagent_potion_duration = 5
+    equipment = {}  # type: dict
+
+    def has_skill(self, skill):
+        return skill == "Blood Bubble"
+
+    def get_stat(self, stat, buffed=True):
+        return {Stat.Muscle: 100, Stat.Mysticality: 50, Stat.Moxie: 30}[stat]
+
+    @property
+    def evaluation_context(self):
+        return expression.EvaluationContext(self)
+
+
+class ExpressionTestCase(TestCase):
+    def evaluate(self, expression_string, subs={}):
+        return self.run_async(
+            expression.evaluate(
+                FakeSession(), expression.parse(expression_string), subs
+            )
+        )
+
+    def evaluate_many(self, expression_strings, subs={}):
+        return self.run_async(
+            expression.evaluate_many(
+                FakeSession(), [expression.parse(e) for e in expression_strings], subs
+            )
+        )
+
+    def test_evaluate(self):
+        self.assertEqual(self.evaluate("ceil(min(W,20)/2)+sqrt(MUS)+abs(-L)"), 30)
+        self.assertEqual(self.evaluate("floor(MYS/4)+max(D,3)"), 17)
+        self.assertAlmostEqual(self.evaluate("L^2/3"), 121 / 3)
+
+    def test_evaluate_state_functions(self):
+        self.assertEqual(self.evaluate("skill(Blood Bubble)*3"), 3)
+        self.assertEqual(self.evaluate("skill(Blood Bubble)+skill(Lunge Smack)"), 1)
+
+    def test_evaluate_subs(self):
+        self.assertEqual(self.evaluate("L*2", {"L": 4}), 8)
+
+    def test_compiled_once(self):
+        parsed = expression.parse("W+ML")
+        self.assertIs(
+            expression.compile_expression(parsed),
+            expression.compile_expression(expression.parse("W+ML")),
+        )
+        self.assertEqual(expression.compile_expression(parsed).symbols, ["ML", "W"])
+
+    def test_unknown_symbol(self):
+        with self.assertRaises(UnknownError):
+            self.evaluate("Q+1")
+
+    def test_symbol_errors_propagate(self):
+        kol = FakeSession()
+        kol.get_stat = lambda stat, buffed=True: kol.character.muscle
+        with self.assertRaises(AttributeError):
+            self.run_async(expression.evaluate(kol, expression.parse("MUS+1")))
+
+    @skipIf(expression.numpy is None, "numpy is not installed")
+    def test_evaluate_many(self):
+        values = self.evaluate_many(
+            ["ceil(min(W,20)/2)+sqrt(MUS)", "skill(Blood Bubble)*3", "10", "?"]
+        )
+        self.assertEqual(values[:3].tolist(), [19, 3, 10])
+        self.assertTrue(expression.numpy.isnan(values[3]))
+
+    @skipIf(expression.numpy is None, "numpy is not installed")
+    def test_evaluate_many_sweep(self):
+        strings = ["min(W,20)+max(L,3)", "W*K", "5"]
+        values = self.evaluate_many(strings, {"W": range(1, 41), "K": 2})
+        self.assertEqual(values.shape, (3, 40))
+
+        for w in range(1, 41):
+            for i, s in enumerate(strings):
+                self.assertEqual(values[i, w - 1], self.evaluate(s, {"W": w, "K": 2}))
+
+    def test_context_is_lazy(self):
+        kol = FakeSession()
+        calls = []
+        kol.get_stat = lambda stat, buffed=True: calls.append(stat) or 10
+        context = expression.EvaluationContext(kol)
+
+        for _ in range(3):
+            self.run_async(
+                expression.evaluate(kol, expression.parse("MUS+L"), context=context)
+            )
+
+        self.assertEqual(calls, [Stat.Muscle])
+        self.assertEqual(context.replace({"L": 1})["L"], 1)
+        self.assertEqual(context["L"], 11)
@@ -0,0 +1,21 @@
+import asyncio
+import time
+from libkol.LoopMonitor import LoopMonitor
+
+from .test_base import TestCase
+
+
+class LoopMonitorTestCase(TestCase):
+    def test_records_blocking(self):
+        async def run():
+            async with LoopMonitor(interval=0.001) as monitor:
+                await asyncio.sleep(0.01)
+                time.sleep(0.05)
+                await asyncio.sleep(0.01)
+
+            return monitor
+
+        monitor = self.run_async(run())
+        self.assertGreater(monitor.stats.samples, 1)
+        self.assertGreaterEqual(monitor.stats.max_lag, 0.04)
+        self.assertIsNone(monitor.task)
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from importlib import import_module
+from os import path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from pulp import LpSolver, LpStatusOptimal
+from libkol import Bonus, Item, Maximizer, Modifier
+from libkol.Maximizer import ModifierMatrix
+from libkol.Model import Model
+
+from .test_base import DatabaseTestCase
+
+# The module, which the package's Maximizer class hides
+maximizer_module = import_module("libkol.Maximizer")
+
+
+class StubSolver(LpSolver):
+    """
+    Stands in for a real solver, equipping nothing
+    """
+
+    # The last solver to solve a problem
+    last = None
+
+    def actualSolve(self, lp):
+        StubSolver.last = self
+        self.thread = threading.get_ident()
+
+        for v in lp.variables():
+            v.varValue = 0
+
+        lp.status = LpStatusOptimal
+        return lp.status
+
+
+class StubSession:
+    level = 1
+    evaluation_context = None
+
+    def __init__(self):
+        self.inventory = defaultdict(int)
+
+    def get_equipped_count(self, item):
+        return 0
+
+    def get_stat(self, stat, buffed=False):
+        return 0
+
+
+class MaximizerTestCase(DatabaseTestCase):
+    def setUp(self):
+        Model.kol = self.session = StubSession()
+
+    async def populate(self):
+        await Item.create(id=1, name="Crown of Thrones", desc_id=1, image="", hat=True)
+        await Item.create(id=2, name="Buddy Bjorn", desc_id=2, image="")
+
+        for id, meat in ((3, 10), (4, 25)):
+            hat = await Item.create(
+                id=id, name=f"hat {id}", desc_id=id, image="", hat=True, type="hat"
+            )
+            await Bonus.create(item=hat, modifier=Modifier.MeatDrop, numeric_value=meat)
+            self.session.inventory[hat] = 1
+
+    def test_repeated_solves_skip_the_database(self):
+        async def test():
+            maximizer = Maximizer(self.session, solver=StubSolver())
+            maximizer += Modifier.MeatDrop
+
+            with patch.object(Bonus, "filter", side_effect=Bonus.filter) as query:
+                await maximizer.solve()
+                self.assertGreater(query.call_count, 0)
+
+                query.reset_mock()
+                await maximizer.solve()
+                query.assert_not_called()
+
+            self.assertEqual(len(ModifierMatrix.rows[Modifier.MeatDrop]), 2)
+            self.assertIn(Modifier.Smithsness, ModifierMatrix.item_rows)
+
+            Item.clear_cache()
+            self.assertEqual(ModifierMatrix.rows, {})
+            self.assertEqual(ModifierMatrix.item_rows, {})
+
+        self.run_async(test())
+
+    def test_solver_runs_in_an_executor(self):
+        async def test():
+            maximizer = Maximizer(self.session, solver=StubSolver())
+            maximizer += Modifier.MeatDrop
+            await maximizer.solve()
+
+            self.assertIs(StubSolver.last, maximizer.solver)
+            self.assertNotEqual(StubSolver.last.thread, threading.get_ident())
+
+        self.run_async(test())
+
+    def test_concurrent_solves_take_turns(self):
+        class SlowSolver(StubSolver):
+            active = 0
+            most_active = 0
+
+            def actualSolve(self, lp):
+                SlowSolver.active += 1
+                SlowSolver.most_active = max(SlowSolver.most_active, SlowSolver.active)
+                time.sleep(0.05)
+                SlowSolver.active -= 1
+                return super().actualSolve(lp)
+
+        async def test():
+            maximizer = Maximizer(self.session, solver=SlowSolver(), keep_warm=True)
+            maximizer += Modifier.MeatDrop
+            await asyncio.gather(maximizer.solve(), maximizer.solve())
+
+            self.assertEqual(SlowSolver.most_active, 1)
+
+        self.run_async(test())
+
+    def test_lp_is_only_written_when_asked_for(self):
+        async def test():
+            cwd = os.getcwd()
+
+            with TemporaryDirectory() as directory:
+                os.chdir(directory)
+
+                try:
+                    maximizer = Maximizer(self.session, solver=StubSolver())
+                    maximizer += Modifier.MeatDrop
+                    await maximizer.solve()
+                    self.assertEqual(os.listdir(directory), [])
+
+                    dump_lp = path.join(directory, "meat.lp")
+                    maximizer = Maximizer(
+                        self.session, solver=StubSolver(), dump_lp=dump_lp
+                    )
+                    maximizer += Modifier.MeatDrop
+                    await maximizer.solve()
+                    self.assertEqual(os.listdir(directory), ["meat.lp"])
+                finally:
+                    os.chdir(cwd)
+
+        self.run_async(test())
+
+    def test_solver_options_are_passed_through(self):
+        async def test():
+            def get_solver(name, **kwargs):
+                return StubSolver(**kwargs)
+
+            with patch.object(
+                maximizer_module, "getSolver", side_effect=get_solver
+            ) as named:
+                maximizer = Maximizer(self.session, solver="GLPK_CMD", time_limit=5)
+                maximizer += Modifier.MeatDrop
+                await maximizer.solve()
+
+            named.assert_called_once_with("GLPK_CMD", msg=False, timeLimit=5)
+            self.assertEqual(StubSolver.last.timeLimit, 5)
+
+            with patch.object(
+                maximizer_module, "listSolvers", return_value=[]
+            ), patch.object(maximizer_module, "PULP_CBC_CMD", StubSolver):
+                maximizer = Maximizer(self.session, time_limit=7)
+                maximizer += Modifier.MeatDrop
+                await maximizer.solve()
+
+            self.assertEqual(StubSolver.last.timeLimit, 7)
+            self.assertFalse(StubSolver.last.msg)
+
+        self.run_async(test())
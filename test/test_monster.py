@@ -0,0 +1,61 @@
+import gc
+from tortoise import Tortoise
+from libkol import Monster, MonsterImage
+from libkol.util import expression
+from libkol.util.PickleField import Pickled, PickleField
+
+from .test_base import DatabaseTestCase
+
+
+class MonsterIndexTestCase(DatabaseTestCase):
+    async def create(self, id, name, image, hp):
+        monster = Monster(id=id, name=name)
+        monster._hp = expression.parse(hp)
+        await monster.save()
+        await MonsterImage.create(image=image, monster=monster)
+
+    def test_preloaded_monsters_are_identified_without_the_database(self):
+        async def test():
+            await self.create(1, "smut orc jacker", "jacker.gif", "[10+ML]")
+            await self.create(2, "smut orc nailer", "nailer.gif", "[10+ML]")
+            self.assertEqual(await Monster.preload(), 2)
+
+            await Tortoise.close_connections()
+
+            jacker = await Monster.identify("a smut orc jacker", "jacker.gif")
+            self.assertIs(await Monster.identify("a smut orc jacker"), jacker)
+            nailer = await Monster.identify("a smut orc nailer", "nailer.gif")
+            self.assertEqual(nailer.id, 2)
+
+            # Expressions are unpickled when they are first needed, once per distinct blob
+            self.assertIsInstance(jacker._hp, Pickled)
+            self.assertIs(jacker._hp, nailer._hp)
+            self.assertEqual(str(jacker._hp.value), str(expression.parse("[10+ML]")))
+
+        self.run_async(test())
+
+    def test_preloaded_misses_are_new_monsters(self):
+        async def test():
+            await self.create(1, "smut orc jacker", "jacker.gif", "[10+ML]")
+            await Monster.preload()
+
+            await Tortoise.close_connections()
+
+            pipelayer = await Monster.identify("a smut orc pipelayer", "pipelayer.gif")
+            self.assertIsNone(pipelayer.id)
+            self.assertEqual(pipelayer.name, "smut orc pipelayer")
+            self.assertIs(await Monster.identify("a smut orc pipelayer"), pipelayer)
+            self.assertIs(
+                await Monster.identify("someone else", "pipelayer.gif"), pipelayer
+            )
+
+        self.run_async(test())
+
+    def test_unused_expressions_are_not_kept(self):
+        blob = PickleField.encode(expression.parse("[10+ML]"))
+        pickled = Pickled.of(blob)
+        self.assertIs(Pickled.of(blob), pickled)
+
+        del pickled
+        gc.collect()
+        self.assertNotIn(blob, Pickled._shared)
@@ -0,0 +1,69 @@
+from glob import glob
+from os import path
+from unittest import TestCase
+
+from libkol import Stat
+from libkol.util import parsing
+
+TEST_DATA = path.join(path.dirname(path.abspath(__file__)), "request", "test_data")
+
+
+def each_pattern(html: str):
+    return {
+        "items": [
+            (int(m.group(1)), 1) for m in parsing.single_item_pattern.finditer(html)
+        ]
+        + [
+            (int(m.group(1)), parsing.to_int(m.group(2)))
+            for m in parsing.multi_item_pattern.finditer(html)
+        ],
+        "adventures": parsing.adventures(html),
+        "inebriety": parsing.inebriety(html),
+        "substats": parsing.substat(html),
+        "stats": parsing.stats(html),
+        "levels": parsing.level(html),
+        "effects": parsing.effects(html),
+        "hp": parsing.hp(html),
+        "mp": parsing.mp(html),
+        "meat": parsing.meat(html),
+    }
+
+
+class ParsingTestCase(TestCase):
+    def test_scan_resources_matches_each_pattern(self):
+        files = [
+            file
+            for pattern in ["combat_*.html", "eat_*.html", "mall_purchase_*.html"]
+            for file in glob(path.join(TEST_DATA, pattern))
+        ]
+        self.assertGreater(len(files), 0)
+
+        for file in files:
+            with self.subTest(file=path.basename(file)), open(file) as f:
+                html = f.read()
+                self.assertEqual(parsing.scan_resources(html), each_pattern(html))
+
+    def test_scan_resources(self):
+        html = (
+            '<td><img src="x.gif" alt="a" title="a" onclick="descitem(123)"></td><td>You acquire an item'
+            '<td><img src="x.gif" alt="b" title="b" onclick="descitem(456)"></td><td>You acquire <b>1,200</b>'
+            '<td><img src="meat.gif"></td><td>You gain 50 Meat.</td>'
+            "You lose 20 Meat. You gain 3 Beefiness. You lose 2 Wizardliness. "
+            "You gain a Moxie point. You lose some Muscle points. You gain some levels. "
+            "You gain 10 hit points. You lose 4 hit points. You gain 7 Mana Points. "
+            "You gain 2 Drunkenness. You gain 5 Adventures. You gain 6 Adventures. "
+            "<td valign=center class=effect>You acquire an effect: <b>Beaten Up</b><br>(duration: 3 Adventures)</td>"
+        )
+
+        result = parsing.scan_resources(html)
+        self.assertEqual(result, each_pattern(html))
+        self.assertEqual(result["items"], [(123, 1), (456, 1200)])
+        self.assertEqual(result["meat"], 50)
+        self.assertEqual(result["substats"], {Stat.Muscle: 3, Stat.Mysticality: -2})
+        self.assertEqual(result["stats"], {Stat.Moxie: 1, Stat.Muscle: -2})
+        self.assertEqual(result["levels"], 2)
+        self.assertEqual(result["hp"], 6)
+        self.assertEqual(result["mp"], 7)
+        self.assertEqual(result["inebriety"], 2)
+        self.assertEqual(result["adventures"], 5)
+        self.assertEqual(result["effects"], [{"name": "Beaten Up", "turns": 3}])
@@ -0,0 +1,32 @@
+from libkol.RateLimiter import RateLimiter, TokenBucket
+
+from .test_base import TestCase
+
+
+class RateLimiterTestCase(TestCase):
+    def test_bucket_allows_burst(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+
+    def test_bucket_reserves_in_order(self):
+        bucket = TokenBucket(rate=10, capacity=1)
+        bucket.reserve()
+        first = bucket.reserve()
+        second = bucket.reserve()
+        self.assertAlmostEqual(first, 0.1, places=2)
+        self.assertAlmostEqual(second, 0.2, places=2)
+
+    def test_per_path_buckets(self):
+        limiter = RateLimiter(paths={"mall.php": (100, 1)})
+
+        async def run():
+            for _ in range(3):
+                await limiter.acquire("/mall.php")
+            await limiter.acquire("/api.php")
+
+        self.run_async(run())
+
+        self.assertEqual(limiter.stats["mall.php"].requests, 3)
+        self.assertGreater(limiter.stats["mall.php"].total_wait, 0)
+        self.assertEqual(limiter.stats["api.php"].total_wait, 0)
+        self.assertEqual(limiter.total.requests, 4)
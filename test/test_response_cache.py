@@ -0,0 +1,95 @@
+from os import path
+from tempfile import TemporaryDirectory
+from libkol.ResponseCache import CachedResponse, ResponseCache
+from libkol.request import (
+    cafe_menu,
+    hermit_menu,
+    item_description,
+    player_profile,
+    questlog,
+)
+
+from .test_base import TestCase
+
+
+def response(body: str) -> CachedResponse:
+    return CachedResponse("https://www.kingdomofloathing.com/", body.encode(), "utf-8")
+
+
+class ResponseCacheTestCase(TestCase):
+    def test_hit_and_miss(self):
+        async def run():
+            cache = ResponseCache()
+            self.assertIsNone(await cache.get(player_profile, "a"))
+            await cache.put("a", response("profile"), 60)
+            self.assertEqual((await cache.get(player_profile, "a")).body, b"profile")
+            return cache
+
+        cache = self.run_async(run())
+        self.assertEqual(cache.stats["player_profile"].hits, 1)
+        self.assertEqual(cache.stats["player_profile"].misses, 1)
+        self.assertEqual(cache.total.hit_rate, 0.5)
+
+    def test_expiry(self):
+        async def run():
+            cache = ResponseCache()
+            await cache.put("a", response("profile"), -1)
+            self.assertIsNone(await cache.get(player_profile, "a"))
+            self.assertEqual(len(cache.entries), 0)
+
+        self.run_async(run())
+
+    def test_least_recently_used_is_evicted(self):
+        async def run():
+            cache = ResponseCache(max_entries=2)
+            await cache.put("a", response("a"), 60)
+            await cache.put("b", response("b"), 60)
+            await cache.get(player_profile, "a")
+            await cache.put("c", response("c"), 60)
+            self.assertIsNone(await cache.get(player_profile, "b"))
+            self.assertIsNotNone(await cache.get(player_profile, "a"))
+            self.assertEqual(cache.evictions, 1)
+
+        self.run_async(run())
+
+    def test_ttls(self):
+        cache = ResponseCache(ttls={player_profile: None})
+        self.assertIsNone(cache.get_ttl(player_profile))
+        self.assertEqual(cache.get_ttl(item_description), item_description.cache_ttl)
+
+    def test_pages_that_change_as_you_play_are_not_cached_by_default(self):
+        cache = ResponseCache()
+        self.assertIsNone(cache.get_ttl(questlog))
+        self.assertIsNone(cache.get_ttl(hermit_menu))
+        self.assertIsNone(cache.get_ttl(cafe_menu))
+
+    def test_store(self):
+        async def run(store):
+            cache = ResponseCache(store=store)
+            await cache.put("a", response('{"x": 1}'), 60)
+            cache.close()
+
+            cache = ResponseCache(store=store)
+            cached = await cache.get(item_description, "a")
+            cache.close()
+
+            self.assertEqual(await cached.json(), {"x": 1})
+
+        with TemporaryDirectory() as directory:
+            self.run_async(run(path.join(directory, "responses.db")))
+
+    def test_expired_entries_are_dropped_from_the_store(self):
+        async def run(store):
+            cache = ResponseCache(store=store)
+            await cache.put("a", response("a"), -1)
+            await cache.put("b", response("b"), 60)
+            cache.close()
+
+            cache = ResponseCache(store=store)
+            keys = [row[0] for row in cache.store.execute("SELECT key FROM response")]
+            cache.close()
+
+            self.assertEqual(keys, [repr("b")])
+
+        with TemporaryDirectory() as directory:
+            self.run_async(run(path.join(directory, "responses.db")))
@@ -0,0 +1,265 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+from tempfile import TemporaryDirectory
+from tortoise import Tortoise
+from unittest.mock import patch
+from yarl import URL
+from libkol import Item, Session, Slot
+from libkol.Error import ResumeFailedError
+from libkol.request import clan_log
+from libkol.util import snapshot
+
+from .test_base import TestCase
+
+
+class HydratingSession(Session):
+    def __init__(self):
+        super().__init__()
+        self.is_connected = True
+        self.started = []
+        self.finished = []
+
+    async def step(self, name):
+        self.started.append(name)
+        await asyncio.sleep(0.01)
+        self.finished.append(name)
+
+    async def refresh_state(self):
+        await self.step("status")
+
+    async def refresh_profile(self):
+        await self.step("profile")
+
+    async def refresh_inventory(self):
+        await self.step("inventory")
+
+    async def get_skills(self):
+        await self.step("skills")
+
+
+class ResumingSession(Session):
+    status_checks = 0
+    expired = False
+
+    async def load_status(self):
+        self.status_checks += 1
+        # Nothing may be sent as logged in until the saved session has been checked
+        assert not self.is_connected
+
+        if self.expired:
+            raise RuntimeError("Session has expired")
+
+        return True
+
+
+class HydrateTestCase(TestCase):
+    def hydrate(self, parts):
+        async def run():
+            kol = HydratingSession()
+            try:
+                await kol.hydrate(parts)
+            finally:
+                await kol.client.close()
+            return kol
+
+        return self.run_async(run())
+
+    def test_independent_steps_run_concurrently(self):
+        kol = self.hydrate(["inventory", "skills"])
+        self.assertEqual(set(kol.started[:2]), {"inventory", "status"})
+        self.assertEqual(kol.started[2], "skills")
+
+    def test_dependencies_are_loaded_first(self):
+        kol = self.hydrate(["profile", "inventory"])
+        self.assertEqual(set(kol.finished), {"status", "profile", "inventory"})
+        self.assertLess(kol.finished.index("status"), kol.started.index("profile"))
+
+    def test_failure_cancels_other_steps(self):
+        class FailingSession(HydratingSession):
+            async def refresh_inventory(self):
+                raise RuntimeError("Something went wrong")
+
+        async def run():
+            kol = FailingSession()
+            try:
+                with self.assertRaises(RuntimeError):
+                    await kol.hydrate(["status", "inventory"])
+                await asyncio.sleep(0.02)
+            finally:
+                await kol.client.close()
+            return kol
+
+        kol = self.run_async(run())
+        self.assertEqual(kol.started, ["status"])
+        self.assertEqual(kol.finished, [])
+
+    def test_unknown_step(self):
+        with self.assertRaises(ValueError):
+            self.hydrate(["nonsense"])
+
+
+class ResumeTestCase(TestCase):
+    def run_async(self, coro):
+        async def run():
+            try:
+                return await coro
+            finally:
+                await Tortoise.close_connections()
+
+        return super().run_async(run())
+
+    async def save(self, file):
+        async with ResumingSession() as kol:
+            kol.is_connected = True
+            kol.server_url = "https://www.kingdomofloathing.com"
+            kol.client.cookie_jar.update_cookies(
+                {"PHPSESSID": "abc"}, URL(kol.server_url)
+            )
+            kol.state.add_item(await Item[2078], 3)
+            kol.state.equip(Slot.Back, await Item[5738])
+            kol.state.user_id = 123
+            kol.save(file)
+            kol.is_connected = False
+
+    def test_save_and_resume(self):
+        async def run(file):
+            await self.save(file)
+
+            async with ResumingSession() as kol:
+                self.assertTrue(await kol.resume(file))
+                self.assertTrue(kol.is_connected)
+                self.assertEqual(kol.status_checks, 1)
+                self.assertEqual(kol.user_id, 123)
+                self.assertEqual(kol.inventory[Item._by_id[2078]], 3)
+                self.assertEqual(kol.state.equipment[Slot.Back].id, 5738)
+                self.assertEqual(
+                    [c.value for c in kol.client.cookie_jar if c.key == "PHPSESSID"],
+                    ["abc"],
+                )
+                kol.is_connected = False
+
+        with TemporaryDirectory() as directory:
+            self.run_async(run(path.join(directory, "session.pickle")))
+
+    def test_cookies_are_restored_before_the_state(self):
+        async def run(file):
+            await self.save(file)
+
+            async with ResumingSession() as kol:
+                load_state = snapshot.load_state
+
+                async def checked_load_state(session, saved):
+                    # Items in the state may need discovering as the saved user
+                    self.assertEqual(len(session.client.cookie_jar), 1)
+                    return await load_state(session, saved)
+
+                with patch.object(snapshot, "load_state", checked_load_state):
+                    self.assertTrue(await kol.resume(file))
+
+                kol.is_connected = False
+
+        with TemporaryDirectory() as directory:
+            self.run_async(run(path.join(directory, "session.pickle")))
+
+    def test_resume_expired_session(self):
+        async def run(file):
+            await self.save(file)
+
+            async with ResumingSession() as kol:
+                kol.expired = True
+
+                with self.assertRaises(ResumeFailedError):
+                    await kol.resume(file)
+
+                self.assertFalse(kol.is_connected)
+                self.assertEqual(kol.user_id, 0)
+                self.assertEqual(len(kol.client.cookie_jar), 0)
+
+        with TemporaryDirectory() as directory:
+            self.run_async(run(path.join(directory, "session.pickle")))
+
+    def test_resume_without_saved_session(self):
+        async def run():
+            async with ResumingSession() as kol:
+                self.assertFalse(await kol.resume("does-not-exist.pickle"))
+                self.assertFalse(kol.is_connected)
+                self.assertEqual(kol.status_checks, 0)
+
+        self.run_async(run())
+
+
+class CountingSession(Session):
+    def __init__(self):
+        super().__init__()
+        self.server_url = "https://www.kingdomofloathing.com"
+        self.sent = 0
+
+    async def send(self, method, url, **kwargs):
+        self.sent += 1
+        await asyncio.sleep(0.01)
+        return object()
+
+
+class SingleFlightTestCase(TestCase):
+    def send_twice(self, **kwargs):
+        async def run():
+            kol = CountingSession()
+            try:
+                responses = await asyncio.gather(
+                    kol.request("showplayer.php", data={"who": 1}, **kwargs),
+                    kol.request("showplayer.php", data={"who": 1}, **kwargs),
+                    kol.request("showplayer.php", data={"who": 2}, **kwargs),
+                )
+            finally:
+                await kol.client.close()
+            return kol, responses
+
+        return self.run_async(run())
+
+    def test_identical_requests_are_coalesced(self):
+        kol, responses = self.send_twice(coalesce=True)
+        self.assertEqual(kol.sent, 2)
+        self.assertIs(responses[0], responses[1])
+        self.assertEqual(kol.in_flight, {})
+
+    def test_requests_are_not_coalesced_by_default(self):
+        kol, responses = self.send_twice()
+        self.assertEqual(kol.sent, 3)
+
+
+class ParseExecutorTestCase(TestCase):
+    def test_cpu_bound_work_runs_in_executor(self):
+        async def run(executor):
+            kol = Session(parse_executor=executor)
+            try:
+                return await kol.run_cpu_bound(
+                    clan_log.parse_clan_log,
+                    "10/08/19, 05:32AM: gausie (#1197090) left the clan.",
+                )
+            finally:
+                await kol.client.close()
+
+        with ThreadPoolExecutor() as executor:
+            threaded = self.run_async(run(executor))
+        inline = self.run_async(run(None))
+
+        self.assertEqual(threaded, inline)
+        self.assertEqual(threaded.username, "gausie")
+
+
+class SaveDiscoveriesTestCase(TestCase):
+    def test_discoveries_are_not_saved_by_default(self):
+        async def run():
+            kol = Session()
+            await kol.client.close()
+            return kol
+
+        self.assertIsNone(self.run_async(run()).write_behind)
+
+    def test_shipped_database_is_never_written_to(self):
+        async def run():
+            with self.assertRaises(ValueError):
+                Session(save_discoveries=True)
+
+        self.run_async(run())
@@ -0,0 +1,130 @@
+import asyncio
+from unittest.mock import patch
+from tortoise.exceptions import OperationalError
+from libkol import Item, Monster, MonsterImage
+from libkol.Model import Model
+from libkol.util import WriteBehind as write_behind_module
+from libkol.util.WriteBehind import WriteBehind
+
+from .test_base import DatabaseTestCase
+
+
+class FakeSession:
+    def __init__(self):
+        self.write_behind = WriteBehind(delay=0.01)
+
+
+class WriteBehindTestCase(DatabaseTestCase):
+    def setUp(self):
+        Model.kol = FakeSession()
+
+    def test_models_are_written_in_the_background(self):
+        async def test(write_behind):
+            write_behind.add(Item(id=1, name="seal-clubbing club", desc_id=1, image=""))
+            self.assertEqual(await Item.filter(id=1).count(), 0)
+
+            await asyncio.sleep(0.05)
+            self.assertEqual(await Item.filter(id=1).count(), 1)
+            self.assertEqual(write_behind.written, 1)
+
+        self.run_async(test(Model.kol.write_behind))
+
+    def test_existing_models_are_skipped(self):
+        async def test(write_behind):
+            await Item.create(id=1, name="seal-clubbing club", desc_id=1, image="")
+            write_behind.add(
+                Item(id=1, name="seal-clubbing club", desc_id=1, image=""),
+                Item(id=2, name="seal tooth", desc_id=2, image=""),
+            )
+            await write_behind.close()
+
+            self.assertEqual(write_behind.skipped, 1)
+            self.assertEqual(await Item.all().count(), 2)
+
+        self.run_async(test(Model.kol.write_behind))
+
+    def test_new_monsters_are_saved(self):
+        async def test(write_behind):
+            first = await Monster.identify("a smut orc jacker", "jacker.gif", id=1)
+            second = await Monster.identify("a smut orc jacker", "jacker.gif", id=1)
+            await write_behind.close()
+
+            self.assertIs(first, second)
+            self.assertEqual(first.name, "smut orc jacker")
+            self.assertEqual(await Monster.filter(id=1).count(), 1)
+            self.assertEqual(await MonsterImage.filter(image="jacker.gif").count(), 1)
+
+        self.run_async(test(Model.kol.write_behind))
+
+    def test_full_batches_are_written_straight_away(self):
+        async def test(write_behind):
+            batched = WriteBehind(delay=60, batch_size=2)
+            batched.add(Item(id=1, name="seal-clubbing club", desc_id=1, image=""))
+            await asyncio.sleep(0)
+            batched.add(Item(id=2, name="seal tooth", desc_id=2, image=""))
+
+            await asyncio.wait_for(batched.task, 1)
+            self.assertEqual(await Item.all().count(), 2)
+
+        self.run_async(test(Model.kol.write_behind))
+
+    def test_failed_batches_are_kept(self):
+        async def test(write_behind):
+            write_behind.add(Item(id=1, name="seal-clubbing club", desc_id=1, image=""))
+
+            with patch.object(
+                write_behind_module,
+                "in_transaction",
+                side_effect=OperationalError("database is locked"),
+            ):
+                with self.assertRaises(OperationalError):
+                    await write_behind.flush()
+
+            self.assertEqual(len(write_behind.pending), 1)
+            self.assertEqual(write_behind.written, 0)
+
+            await write_behind.close()
+            self.assertEqual(await Item.filter(id=1).count(), 1)
+            self.assertEqual(write_behind.written, 1)
+
+        self.run_async(test(Model.kol.write_behind))
+
+    def test_batches_breaking_other_constraints_are_dropped(self):
+        async def test(write_behind):
+            unnamed = Item(id=1, name="seal-clubbing club", desc_id=1, image="")
+            unnamed.name = None
+
+            batched = WriteBehind(batch_size=1)
+            batched.add(unnamed, Item(id=2, name="seal tooth", desc_id=2, image=""))
+
+            with self.assertLogs("libkol.util.WriteBehind", "ERROR"):
+                await batched.close()
+
+            self.assertEqual(len(batched.pending), 0)
+            self.assertEqual([[item.id for item in b] for b in batched.failed], [[1]])
+            self.assertEqual(batched.skipped, 0)
+            self.assertEqual(await Item.filter(id=1).count(), 0)
+            self.assertEqual(await Item.filter(id=2).count(), 1)
+
+        self.run_async(test(Model.kol.write_behind))
+
+    def test_background_failures_are_logged(self):
+        async def test(write_behind):
+            with patch.object(
+                write_behind_module,
+                "in_transaction",
+                side_effect=OperationalError("database is locked"),
+            ):
+                with self.assertLogs("libkol.util.WriteBehind", "ERROR"):
+                    write_behind.add(
+                        Item(id=1, name="seal-clubbing club", desc_id=1, image="")
+                    )
+                    await write_behind.task
+
+            self.assertIsNone(write_behind.task.exception())
+            self.assertEqual(len(write_behind.pending), 1)
+
+            await write_behind.close()
+            self.assertEqual(await Item.filter(id=1).count(), 1)
+
+        self.run_async(test(Model.kol.write_behind))